@@ -1,18 +1,22 @@
 # backend/app/api/analytics.py
-from datetime import datetime
+from datetime import date
+from typing import Dict, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from ..db import get_db
 from .. import models, schemas
+from ..report_rollups import GRID_CELL_DEG, grid_cell, rebuild_rollups, resolution_stats
+from ..security import SessionUser, get_current_user
+from ..visit_buffer import visit_buffer
 
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.post("/visits")
-def register_visit(payload: schemas.VisitorPing, db: Session = Depends(get_db)):
+def register_visit(payload: schemas.VisitorPing):
     token = payload.device_token.strip()
     if not token:
         raise HTTPException(
@@ -20,25 +24,104 @@ def register_visit(payload: schemas.VisitorPing, db: Session = Depends(get_db)):
             detail="device_token es requerido",
         )
 
-    visitor = (
-        db.query(models.Visitor)
-        .filter(models.Visitor.device_token == token)
-        .first()
+    # Se escribe en lote desde `visit_buffer` (ver app/visit_buffer.py)
+    return {"is_new": visit_buffer.record(token)}
+
+
+@router.get("/visits/count")
+def get_visit_count(
+    window: Literal["total", "day", "week", "month"] = Query(
+        "total",
+        description="`total`: visitantes históricos. `day`/`week`/`month`: únicos aproximados (HyperLogLog).",
+    ),
+):
+    if window == "total":
+        return {"total": visit_buffer.total_count(), "window": window, "approximate": False}
+    return {"total": visit_buffer.unique_count(window), "window": window, "approximate": True}
+
+
+# ---- Rollups de reportes (ver app/report_rollups.py) ----
+
+@router.get("/reports/status-daily")
+def get_report_status_daily(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Reportes que entraron a cada estado, agrupados por día.
+    """
+    query = db.query(models.ReportStatusDaily)
+    if since:
+        query = query.filter(models.ReportStatusDaily.day >= since)
+    if until:
+        query = query.filter(models.ReportStatusDaily.day <= until)
+
+    days: Dict[date, Dict[str, int]] = {}
+    for row in query.order_by(models.ReportStatusDaily.day):
+        days.setdefault(row.day, {})[row.status] = row.count
+    return [{"day": day, "counts": counts} for day, counts in days.items()]
+
+
+@router.get("/reports/grid")
+def get_report_grid(
+    min_lat: float = Query(-90, ge=-90, le=90),
+    max_lat: float = Query(90, ge=-90, le=90),
+    min_lon: float = Query(-180, ge=-180, le=180),
+    max_lon: float = Query(180, ge=-180, le=180),
+    db: Session = Depends(get_db),
+):
+    """
+    Reportes por celda de la grilla y estado actual, dentro del recuadro dado.
+    """
+    # Mismo cálculo de celda que al registrar los reportes, para coincidir en los bordes
+    min_cell_lat, min_cell_lon = grid_cell(min_lat, min_lon)
+    max_cell_lat, max_cell_lon = grid_cell(max_lat, max_lon)
+    rows = (
+        db.query(models.ReportGridCount)
+        .filter(
+            models.ReportGridCount.count > 0,
+            models.ReportGridCount.cell_lat >= min_cell_lat,
+            models.ReportGridCount.cell_lat <= max_cell_lat,
+            models.ReportGridCount.cell_lon >= min_cell_lon,
+            models.ReportGridCount.cell_lon <= max_cell_lon,
+        )
+        .all()
     )
 
-    now = datetime.utcnow()
-    if visitor:
-        visitor.last_seen_at = now
-        db.commit()
-        return {"is_new": False}
+    cells: Dict[tuple, dict] = {}
+    for row in rows:
+        cell = cells.setdefault(
+            (row.cell_lat, row.cell_lon),
+            {
+                "min_lat": round(row.cell_lat * GRID_CELL_DEG, 6),
+                "min_lon": round(row.cell_lon * GRID_CELL_DEG, 6),
+                "max_lat": round((row.cell_lat + 1) * GRID_CELL_DEG, 6),
+                "max_lon": round((row.cell_lon + 1) * GRID_CELL_DEG, 6),
+                "total": 0,
+                "counts": {},
+            },
+        )
+        cell["counts"][row.status] = row.count
+        cell["total"] += row.count
+    return {"cell_size_deg": GRID_CELL_DEG, "cells": list(cells.values())}
 
-    visitor = models.Visitor(device_token=token, first_seen_at=now, last_seen_at=now)
-    db.add(visitor)
-    db.commit()
-    return {"is_new": True}
 
+@router.get("/reports/resolution-time")
+def get_report_resolution_time(db: Session = Depends(get_db)):
+    """
+    Promedio y percentiles del tiempo entre la creación y la finalización.
+    """
+    return resolution_stats(db)
 
-@router.get("/visits/count")
-def get_visit_count(db: Session = Depends(get_db)):
-    total = db.query(models.Visitor).count()
-    return {"total": total}
+
+@router.post("/reports/rebuild")
+def rebuild_report_rollups(
+    db: Session = Depends(get_db),
+    current_user: SessionUser = Depends(get_current_user),
+):
+    """
+    Recalcula los rollups desde los reportes y sus comentarios.
+    """
+    rebuild_rollups(db)
+    return {"detail": "Rollups recalculados"}
@@ -7,10 +7,14 @@ from sqlalchemy.orm import Session
 
 from ..db import get_db
 from .. import models, schemas
-from ..email_utils import send_otp_email
+from ..email_utils import OTP_TTL_MINUTES, queue_otp_email
+from ..email_outbox import email_worker
 from ..security import (
     verify_password,
     create_session_token,
+    get_current_user,
+    session_cache,
+    SessionUser,
     SESSION_TTL_MINUTES,
 )
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -21,11 +25,11 @@ def request_code(payload: schemas.RequestCodeInput, db: Session = Depends(get_db
     """
     Recibe un email, genera un OTP de 6 dígitos y lo guarda con TTL de 3 minutos.
     Si el email ya existe, se actualiza el código y el TTL.
-    Luego envía el código por correo usando Gmail.
+    El correo con el código queda en la cola de salida y se envía en segundo plano.
     """
     email = payload.email.strip().lower()
     otp_code = f"{random.randint(0, 999999):06d}"
-    expires_at = datetime.utcnow() + timedelta(minutes=3)
+    expires_at = datetime.utcnow() + timedelta(minutes=OTP_TTL_MINUTES)
 
     # Buscar si ya existe registro para ese email
     db_otp = db.query(models.EmailOTP).filter(models.EmailOTP.email == email).first()
@@ -41,17 +45,9 @@ def request_code(payload: schemas.RequestCodeInput, db: Session = Depends(get_db
         )
         db.add(db_otp)
 
+    queue_otp_email(db, email, otp_code)
     db.commit()
-
-    # Enviar correo
-    try:
-        send_otp_email(email, otp_code)
-    except Exception as e:
-        # Aquí podrías hacer logging del error real
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="No se pudo enviar el correo de verificación",
-        )
+    email_worker.notify()
 
     return {"detail": "Código de verificación enviado"}
 
@@ -84,6 +80,9 @@ def login(payload: schemas.UserLoginInput, db: Session = Depends(get_db)):
     now = datetime.utcnow()
     expires_at = now + timedelta(minutes=SESSION_TTL_MINUTES)
 
+    # El token anterior deja de ser válido: sacarlo de la caché de sesiones
+    session_cache.invalidate(user.session_token)
+
     user.session_token = token
     user.session_expires_at = expires_at
     user.last_login_at = now
@@ -91,5 +90,14 @@ def login(payload: schemas.UserLoginInput, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(user)
+    session_cache.put(SessionUser.from_model(user))
 
-    return schemas.UserLoginResponse(access_token=token,username=user.name)
\ No newline at end of file
+    return schemas.UserLoginResponse(access_token=token,username=user.name)
+
+
+@router.get("/session-cache")
+def session_cache_stats(current_user: SessionUser = Depends(get_current_user)):
+    """
+    Contadores de la caché de sesiones (aciertos / fallos) de este proceso.
+    """
+    return session_cache.stats()
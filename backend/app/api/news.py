@@ -1,23 +1,44 @@
-import os
 from datetime import datetime
-from pathlib import Path
 from typing import List, Optional
-from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status, Query
+import json
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from shutil import copyfileobj
 
-from ..db import get_db
+from ..db import get_async_db, get_db, write_turn
 from .. import models, schemas
-from ..security import get_current_user
+from ..security import SessionUser, get_current_user
+from ..blob_store import MediaStore, discard_staged, link_staged, stage_uploads
+from ..media_derivatives import derivative_pipeline
+from ..uploads import ReceivedUpload
+from ..queries import news_query, select_news
+from ..news_feed import active_news_filter, news_feed_cache, next_boundary
+from ..conditional import (
+    cache_headers,
+    content_etag,
+    entity_etag,
+    is_not_modified,
+    not_modified_response,
+)
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/news", tags=["news"])
 
-BASE_DIR = Path(__file__).resolve().parents[1]
-MEDIA_NEWS_DIR = BASE_DIR / "media-news"
-MEDIA_NEWS_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
     if not value:
@@ -54,6 +75,56 @@ def _ensure_content(description: Optional[str], has_media: bool) -> None:
         )
 
 
+def _link_news_media(
+    db: Session,
+    news: models.News,
+    staged: List[ReceivedUpload],
+    existing_order: int,
+) -> List[models.NewsMedia]:
+    """
+    Registra los blobs de los archivos recibidos y los agrega a la media de
+    la noticia, después de `existing_order`. No hace commit. Retorna las
+    filas de media agregadas.
+    """
+    added = []
+    for idx, received in enumerate(staged, start=1):
+        blob = link_staged(db, MediaStore.NEWS, received)
+        news_media = models.NewsMedia(
+            file_name=blob.file_name,
+            media_type=blob.media_type,
+            order=existing_order + idx,
+        )
+        news.media.append(news_media)
+        added.append(news_media)
+    return added
+
+
+def _update_news_row(
+    db: Session,
+    news: models.News,
+    fields: dict,
+    staged: List[ReceivedUpload],
+) -> List[models.NewsMedia]:
+    """
+    Aplica los cambios de `update_news` y agrega la media recibida al final.
+    No hace commit. Retorna las filas de media agregadas.
+    """
+    for name, value in fields.items():
+        setattr(news, name, value)
+    existing_order = max((media.order for media in news.media), default=0)
+    added = _link_news_media(db, news, staged, existing_order)
+    news.updated_at = datetime.utcnow()
+    return added
+
+
+async def _load_news(db: AsyncSession, news_id: int) -> models.News:
+    # Recarga la noticia con su media (en AsyncSession no hay carga perezosa)
+    result = await db.execute(
+        select_news().where(models.News.id == news_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
 @router.post(
     "/",
     response_model=schemas.NewsOut,
@@ -65,8 +136,8 @@ async def create_news(
     start_date: Optional[str] = Form(None),
     end_date: Optional[str] = Form(None),
     files: Optional[List[UploadFile]] = File(default=None),
-    db: Session = Depends(get_db),
-    current_user: models.SystemUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(get_current_user),
 ):
     """
     Crea una noticia/blog con información opcional de temporalidad e imágenes/videos.
@@ -90,6 +161,9 @@ async def create_news(
 
     _ensure_content(description_clean, bool(files))
 
+    # Los archivos se reciben antes de abrir la transacción
+    staged = await stage_uploads(files or [], MediaStore.NEWS)
+
     news = models.News(
         title=title_clean,
         description=description_clean,
@@ -97,79 +171,110 @@ async def create_news(
         end_date=end_dt,
     )
     db.add(news)
-    db.commit()
-    db.refresh(news)
-
-    if files:
-        existing_order = 0
-        for idx, upload in enumerate(files, start=1):
-            _, ext = os.path.splitext(upload.filename or "")
-            ext = ext or ""
-            unique_id = uuid4().hex
-            file_name = f"news_{news.id}_{unique_id}_{idx}{ext}"
-            dest_path = MEDIA_NEWS_DIR / file_name
-
-            with dest_path.open("wb") as buffer:
-                copyfileobj(upload.file, buffer)
-
-            media_type = "image"
-            if upload.content_type and upload.content_type.startswith("video/"):
-                media_type = "video"
-
-            news_media = models.NewsMedia(
-                news_id=news.id,
-                file_name=file_name,
-                media_type=media_type,
-                order=existing_order + idx,
-            )
-            news.media.append(news_media)
-
-        news.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(news)
-
-    return news
+    async with write_turn(db):
+        try:
+            saved_media = await db.run_sync(_link_news_media, news, staged, 0)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            await db.run_sync(discard_staged, MediaStore.NEWS, staged)
+            raise
+
+    derivative_pipeline.schedule(MediaStore.NEWS, saved_media)
+    news_feed_cache.clear()
+    return await _load_news(db, news.id)
+
+
+def _conditional_page(
+    request: Request,
+    response: Response,
+    page: dict,
+    etag: str,
+):
+    # Sin Last-Modified: que una noticia salga de vigencia o se borre no
+    # cambia ninguna `updated_at`, solo el contenido (y con él el ETag)
+    headers = cache_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    return page
 
 
-@router.get("/", response_model=List[schemas.NewsOut])
+@router.get("/", response_model=schemas.NewsPage)
 def list_news(
+    request: Request,
+    response: Response,
     only_active: bool = Query(True, description="Si es True solo retorna noticias vigentes."),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado en `next_cursor`"),
     db: Session = Depends(get_db),
 ):
     """
-    Lista las noticias ordenadas de la más reciente a la más antigua.
-    Si `only_active` es verdadero, solo retorna aquellas cuya temporalidad aplica a la fecha actual.
+    Lista las noticias paginadas, de la más reciente a la más antigua.
+    Si `only_active` es verdadero, solo retorna aquellas cuya temporalidad aplica a la fecha actual
+    (el feed vigente se sirve desde caché).
     """
-    news_items = (
-        db.query(models.News)
-        .order_by(models.News.created_at.desc())
-        .all()
-    )
-
-    if not only_active:
-        return news_items
-
     now = datetime.utcnow()
-    return [item for item in news_items if _news_is_active(item, now)]
+    cache_key = (limit, cursor)
+    if only_active:
+        cached = news_feed_cache.get(cache_key, now)
+        if cached is not None:
+            return _conditional_page(request, response, *cached)
+        generation = news_feed_cache.generation
+
+    query = news_query(db)
+    if only_active:
+        query = query.filter(active_news_filter(now))
+    if cursor:
+        created_at, news_id = decode_cursor(cursor)
+        query = query.filter(tuple_(models.News.created_at, models.News.id) < tuple_(created_at, news_id))
+
+    rows = query.order_by(models.News.created_at.desc(), models.News.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    # Se guarda ya serializado: el caché no retiene objetos de la sesión
+    items = [schemas.NewsOut.model_validate(item, from_attributes=True) for item in rows]
+    page = {"items": items, "next_cursor": next_cursor}
+    # El ETag cubre el contenido completo (incluye derivados de media recién generados)
+    etag = content_etag(json.dumps(jsonable_encoder(page), sort_keys=True).encode())
+    if only_active:
+        news_feed_cache.put(cache_key, (page, etag), now, next_boundary(db, now), generation)
+    return _conditional_page(request, response, page, etag)
 
 
 @router.get("/{news_id}", response_model=schemas.NewsOut)
 def get_news(
     news_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     only_active: bool = Query(True, description="Restringe el acceso a noticias dentro de la temporalidad"),
 ):
     """
     Obtiene una noticia por id, opcionalmente validando su temporalidad.
+    Responde 304 si el cliente ya tiene la versión actual.
     """
-    news = db.query(models.News).filter(models.News.id == news_id).first()
-    if not news:
+    current = (
+        db.query(models.News.id, models.News.start_date, models.News.end_date, models.News.updated_at)
+        .filter(models.News.id == news_id)
+        .first()
+    )
+    if not current:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
 
-    if only_active and not _news_is_active(news, datetime.utcnow()):
+    if only_active and not _news_is_active(current, datetime.utcnow()):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no disponible")
 
-    return news
+    etag = entity_etag("news", current.id, current.updated_at)
+    headers = cache_headers(etag, current.updated_at)
+    if is_not_modified(request, etag, current.updated_at):
+        return not_modified_response(headers)
+
+    response.headers.update(headers)
+    return news_query(db).filter(models.News.id == news_id).one()
 
 
 @router.put("/{news_id}", response_model=schemas.NewsOut)
@@ -180,13 +285,13 @@ async def update_news(
     start_date: Optional[str] = Form(None),
     end_date: Optional[str] = Form(None),
     files: Optional[List[UploadFile]] = File(default=None),
-    db: Session = Depends(get_db),
-    current_user: models.SystemUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(get_current_user),
 ):
     """
     Actualiza una noticia existente. Permite agregar nuevos archivos y ajustar la temporalidad.
     """
-    news = db.query(models.News).filter(models.News.id == news_id).first()
+    news = (await db.execute(select_news().where(models.News.id == news_id))).scalar_one_or_none()
     if not news:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Noticia no encontrada")
 
@@ -207,40 +312,26 @@ async def update_news(
             detail="La fecha de fin debe ser mayor o igual a la fecha de inicio.",
         )
 
-    news.title = title_clean
-    news.description = description_clean if description is not None else news.description
-    news.start_date = start_dt
-    news.end_date = end_dt
-
-    existing_order = max((media.order for media in news.media), default=0)
-    if files:
-        for idx, upload in enumerate(files, start=1):
-            _, ext = os.path.splitext(upload.filename or "")
-            ext = ext or ""
-            unique_id = uuid4().hex
-            file_name = f"news_{news.id}_{unique_id}_{existing_order + idx}{ext}"
-            dest_path = MEDIA_NEWS_DIR / file_name
-
-            with dest_path.open("wb") as buffer:
-                copyfileobj(upload.file, buffer)
-
-            media_type = "image"
-            if upload.content_type and upload.content_type.startswith("video/"):
-                media_type = "video"
-
-            news_media = models.NewsMedia(
-                news_id=news.id,
-                file_name=file_name,
-                media_type=media_type,
-                order=existing_order + idx,
-            )
-            news.media.append(news_media)
-
-    _ensure_content(news.description, bool(news.media))
-
-    news.updated_at = datetime.utcnow()
-    db.add(news)
-    db.commit()
-    db.refresh(news)
-
-    return news
+    fields = {"title": title_clean, "start_date": start_dt, "end_date": end_dt}
+    if description is not None:
+        fields["description"] = description_clean
+    _ensure_content(fields.get("description", news.description), bool(news.media) or bool(files))
+    # Libera la conexión mientras se reciben los archivos
+    await db.rollback()
+
+    # Los archivos se reciben antes de abrir la transacción de escritura
+    staged = await stage_uploads(files or [], MediaStore.NEWS)
+    async with write_turn(db):
+        try:
+            added_media = await db.run_sync(_update_news_row, news, fields, staged)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            await db.run_sync(discard_staged, MediaStore.NEWS, staged)
+            raise
+
+    news_feed_cache.clear()
+    # Solo la media de esta petición; la anterior ya tiene sus derivados
+    derivative_pipeline.schedule(MediaStore.NEWS, added_media)
+
+    return await _load_news(db, news.id)
@@ -1,14 +1,43 @@
 # backend/app/api/reports.py
-import os
-from pathlib import Path
-from typing import List, Optional, Tuple
+import base64
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 from datetime import datetime
-from math import radians, sin, cos, sqrt, atan2
-from ..db import get_db
+from ..db import SessionLocal, get_async_db, get_db, write_turn
 from .. import models, schemas
-from ..security import get_current_user
-from ..email_utils import send_status_change_email, send_comment_notification_email
+from ..security import SessionUser, get_current_user
+from ..spatial import reports_within_radius
+from ..search import search_report_ids
+from ..conditional import cache_headers, entity_etag, is_not_modified, not_modified_response
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from ..map_tiles import MAX_ZOOM, get_tile, tile_cache
+from ..report_rollups import record_report_created, record_status_change
+from ..change_feed import (
+    CHANGE_PAGE_SIZE,
+    MAX_CHANGE_PAGE_SIZE,
+    changes_since,
+    decode_change_token,
+    encode_change_token,
+    record_change,
+)
+from ..report_export import MEDIA_TYPES, ExportFormat, export_reports
+from ..realtime import ALL_REPORTS_CHANNEL, report_channel, report_events, status_channel
+from ..queries import (
+    report_detail_query,
+    report_summary_query,
+    select_comment,
+)
+from ..blob_store import (
+    MediaStore,
+    StoredBlob,
+    discard_staged,
+    link_staged,
+    stage_uploads,
+)
+from ..uploads import ReceivedUpload
+from ..media_derivatives import derivative_pipeline
+from ..email_utils import queue_status_change_email, queue_comment_notification_email
+from ..email_outbox import email_worker
 from sqlalchemy.orm import Session
 
 
@@ -19,44 +48,56 @@ from fastapi import (
     UploadFile,
     File,
     Form,
+    Path,
     Query,
+    Request,
+    Response,
     status,
 )
-from sqlalchemy.orm import Session
-from shutil import copyfileobj
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as OrmQuery, Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ..db import get_db
 from .. import models, schemas
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
-# Carpeta donde se guardan imágenes/videos
-BASE_DIR = Path(__file__).resolve().parents[1]  # backend/app
-MEDIA_DIR = BASE_DIR / "media"
-MEDIA_DIR.mkdir(parents=True, exist_ok=True)
-# 👇 carpeta para evidencias de operarios
-OPERATOR_MEDIA_DIR = BASE_DIR / "media_operator"
-OPERATOR_MEDIA_DIR.mkdir(parents=True, exist_ok=True)
-
-def _haversine_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+def _paginate_reports(
+    query: OrmQuery,
+    status_filter: Optional[models.ReportStatus],
+    limit: int,
+    cursor: Optional[str],
+) -> Tuple[List[models.Report], Optional[str]]:
     """
-    Calcula distancia entre dos coordenadas usando la fórmula de Haversine.
-    Retorna la distancia en kilómetros.
+    Paginación por llave (keyset) sobre (created_at, id), del más reciente al más antiguo.
+    Retorna la página y el cursor de la siguiente (None si no hay más).
     """
-    R = 6371.0
-    d_lat = radians(lat2 - lat1)
-    d_lon = radians(lon2 - lon1)
+    if status_filter:
+        query = query.filter(models.Report.status == status_filter)
+    if cursor:
+        created_at, report_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(models.Report.created_at, models.Report.id) < tuple_(created_at, report_id)
+        )
 
-    a = (
-        sin(d_lat / 2) ** 2
-        + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
+    rows = (
+        query.order_by(models.Report.created_at.desc(), models.Report.id.desc())
+        .limit(limit + 1)
+        .all()
     )
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, None
 
-def validate_email_otp(db: Session, email: str, otp_code: str) -> None:
+def check_email_otp(db: Session, email: str, otp_code: str) -> models.EmailOTP:
     """
     Valida que exista un OTP para el email, que no esté vencido y que el código coincida.
+    Solo lee: no consume el código.
     """
     email_normalized = email.strip().lower()
     otp = db.query(models.EmailOTP).filter(models.EmailOTP.email == email_normalized).first()
@@ -79,10 +120,82 @@ def validate_email_otp(db: Session, email: str, otp_code: str) -> None:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El código de verificación es incorrecto.",
         )
+    return otp
+
+
+def validate_email_otp(db: Session, email: str, otp_code: str) -> None:
+    """
+    Valida el OTP como `check_email_otp` y lo consume. El código es de un solo
+    uso: se borra sin hacer commit, dentro de la transacción de quien llama.
+    """
+    db.delete(check_email_otp(db, email, otp_code))
+
+
+def _insert_media(db: Session, model, owner_field: str, owner_id: int, stored: List[StoredBlob]) -> list:
+    """
+    Inserta las filas de media con un único executemany y las retorna
+    cargadas con un SELECT. Sin RETURNING: para recuperar los ids, el ORM las
+    insertaría de a una en SQLite.
+    """
+    if not stored:
+        return []
+    db.execute(
+        insert(model),
+        [
+            {owner_field: owner_id, "file_name": blob.file_name, "media_type": blob.media_type, "order": idx}
+            for idx, blob in enumerate(stored, start=1)
+        ],
+    )
+    return db.query(model).filter(getattr(model, owner_field) == owner_id).order_by(model.order).all()
+
+
+def _insert_report(
+    db: Session,
+    email: str,
+    otp_code: str,
+    fields: dict,
+    staged: List[ReceivedUpload],
+    stored: List[StoredBlob],
+) -> models.Report:
+    """
+    Consume el OTP, registra los blobs e inserta el reporte con su media en
+    un solo flush. No hace commit. Los blobs registrados se agregan a
+    `stored`, para encolar sus derivados después del commit.
+    """
+    validate_email_otp(db, email, otp_code)
+
+    for received in staged:
+        stored.append(link_staged(db, MediaStore.REPORTS, received))
+
+    report = models.Report(
+        public_id=uuid4().hex,
+        citizen_email=email,
+        status=models.ReportStatus.NUEVO,
+        **fields,
+    )
+    db.add(report)
+    record_change(db, report, models.ReportChangeType.CREADO)
+    db.flush()
+    record_report_created(db, report)
+    set_committed_value(
+        report, "media", _insert_media(db, models.ReportMedia, "report_id", report.id, stored)
+    )
+
+    # Se responde sin recargar: un reporte nuevo no tiene comentarios y solo
+    # los blobs reutilizados pueden tener derivados ya generados
+    set_committed_value(report, "comments", [])
+    reused = [blob.file_name for blob in stored if not blob.created]
+    variants: Dict[str, List[models.MediaVariant]] = {}
+    if reused:
+        for variant in db.query(models.MediaVariant).filter(
+            models.MediaVariant.store == MediaStore.REPORTS.value,
+            models.MediaVariant.source_file_name.in_(reused),
+        ):
+            variants.setdefault(variant.source_file_name, []).append(variant)
+    for media in report.media:
+        set_committed_value(media, "variants", variants.get(media.file_name, []))
+    return report
 
-    # Si quisieras que el código sea de un solo uso, podrías borrarlo aquí:
-    db.delete(otp)
-    db.commit()
 
 @router.post(
     "/",
@@ -99,60 +212,53 @@ async def create_report(
     otp_code: str = Form(...),
 
     files: Optional[List[UploadFile]] = File(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Crea un nuevo reporte validando previamente el email + código OTP.
+    Los archivos se reciben antes de abrir la transacción; el consumo del OTP,
+    el reporte y su media se confirman en un único commit.
     """
     email_normalized = email.strip().lower()
 
-    # 1. Validar OTP
-    validate_email_otp(db, email_normalized, otp_code)
-
-    # 2. Generar hash público para el reporte
-    public_id = uuid4().hex
-
-    # 3. Crear el reporte base (incluyendo email)
-    report = models.Report(
-        public_id=public_id,
-        citizen_email=email_normalized,
-        latitude=latitude,
-        longitude=longitude,
-        description=description,
-        status=models.ReportStatus.NUEVO,
-    )
-    db.add(report)
-    db.commit()
-    db.refresh(report)
-
-    # 4. Guardar archivos (igual que antes)
-    saved_media = []
-    if files:
-        for idx, upload in enumerate(files, start=1):
-            _, ext = os.path.splitext(upload.filename or "")
-            ext = ext or ""
-            file_name = f"{public_id}_{idx}{ext}"
-            dest_path = MEDIA_DIR / file_name
-
-            with dest_path.open("wb") as buffer:
-                copyfileobj(upload.file, buffer)
-
-            media_type = "image"
-            if upload.content_type and upload.content_type.startswith("video/"):
-                media_type = "video"
-
-            media = models.ReportMedia(
-                report_id=report.id,
-                file_name=file_name,
-                media_type=media_type,
-                order=idx,
+    # 1. Sin un código válido no se recibe ningún archivo
+    await db.run_sync(check_email_otp, email_normalized, otp_code)
+    # Libera la conexión mientras se reciben los archivos
+    await db.rollback()
+
+    # 2. Recibir los archivos en temporales (sin tocar la BD)
+    staged = await stage_uploads(files or [], MediaStore.REPORTS)
+
+    # 3. OTP + reporte + media en una sola transacción
+    stored: List[StoredBlob] = []
+    async with write_turn(db):
+        try:
+            report = await db.run_sync(
+                _insert_report,
+                email_normalized,
+                otp_code,
+                {"latitude": latitude, "longitude": longitude, "description": description},
+                staged,
+                stored,
             )
-            db.add(media)
-            saved_media.append(media)
-
-        db.commit()
-        db.refresh(report)
-
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            await db.run_sync(discard_staged, MediaStore.REPORTS, staged)
+            raise
+
+    tile_cache.invalidate_point(report.latitude, report.longitude)
+    derivative_pipeline.schedule(MediaStore.REPORTS, stored)
+    report_events.publish(
+        "report_created",
+        report,
+        {
+            "latitude": report.latitude,
+            "longitude": report.longitude,
+            "description": report.description,
+            "created_at": report.created_at,
+        },
+    )
     return report
 
 
@@ -168,38 +274,259 @@ def list_nearby_reports(
         le=50,
         description="Radio de búsqueda en kilómetros",
     ),
+    limit: Optional[int] = Query(
+        None,
+        gt=0,
+        le=500,
+        description="Máximo de reportes a retornar (los más cercanos)",
+    ),
     db: Session = Depends(get_db),
 ):
     """
-    Retorna los reportes que están dentro del radio especificado desde la ubicación del usuario.
+    Retorna los reportes que están dentro del radio especificado desde la ubicación del usuario,
+    del más cercano al más lejano.
     """
     print("nearby reports:", lat, lng, radius_km)
-    reports = db.query(models.Report).all()
-    nearby: List[Tuple[float, models.Report]] = []
+    nearest = reports_within_radius(db, lat, lng, radius_km, limit=limit)
+    if not nearest:
+        return []
+
+    ids = [report_id for report_id, _ in nearest]
+    reports_by_id = {
+        report.id: report
+        for report in report_detail_query(db).filter(models.Report.id.in_(ids))
+    }
+    return [reports_by_id[report_id] for report_id in ids if report_id in reports_by_id]
+
+
+@router.get("/search", response_model=schemas.ReportSummaryPage)
+def search_reports(
+    q: str = Query(..., min_length=1, description="Texto a buscar en descripciones y comentarios"),
+    status_filter: Optional[models.ReportStatus] = None,
+    lat: Optional[float] = Query(None, description="Latitud del centro (junto con `lng`)"),
+    lng: Optional[float] = Query(None, description="Longitud del centro (junto con `lat`)"),
+    radius_km: float = Query(5.0, gt=0, le=50, description="Radio en km cuando se envían `lat`/`lng`"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado en `next_cursor`"),
+    db: Session = Depends(get_db),
+):
+    """
+    Busca reportes por texto (descripción y comentarios), ordenados por relevancia.
+    Se puede combinar con filtro de estado y de radio.
+    """
+    if (lat is None) != (lng is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Para filtrar por radio se deben enviar `lat` y `lng`.",
+        )
+    offset = 0
+    if cursor:
+        try:
+            offset = int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido",
+            )
+
+    near = (lat, lng, radius_km) if lat is not None else None
+    ids = search_report_ids(db, q, status=status_filter, near=near, offset=offset, limit=limit + 1)
+
+    next_cursor = None
+    if len(ids) > limit:
+        ids = ids[:limit]
+        next_cursor = base64.urlsafe_b64encode(str(offset + limit).encode()).decode()
+
+    reports_by_id = {
+        report.id: report
+        for report in report_summary_query(db).filter(models.Report.id.in_(ids))
+    }
+    items = [reports_by_id[report_id] for report_id in ids if report_id in reports_by_id]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/tiles/{z}/{x}/{y}", response_model=schemas.TileOut)
+def get_report_tile(
+    z: int = Path(..., ge=0, le=MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Clusters de reportes del tile `z/x/y` (XYZ), para dibujar el mapa sin
+    descargar cada reporte.
+    """
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Coordenadas de tile fuera de rango para el zoom indicado.",
+        )
+    return get_tile(db, z, x, y)
+
+
+@router.get("/summary", response_model=schemas.ReportSummaryPage)
+def list_report_summaries(
+    status_filter: Optional[models.ReportStatus] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado en `next_cursor`"),
+    db: Session = Depends(get_db),
+):
+    """
+    Igual que el listado de reportes, pero sin comentarios (para tablas y listados).
+    """
+    items, next_cursor = _paginate_reports(report_summary_query(db), status_filter, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/changes", response_model=schemas.ReportChangePage)
+def list_report_changes(
+    since: Optional[str] = Query(None, description="`next_token` de la consulta anterior (vacío = desde el inicio)"),
+    limit: int = Query(CHANGE_PAGE_SIZE, gt=0, le=MAX_CHANGE_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """
+    Cambios de reportes (creación, comentarios, estado) posteriores a `since`,
+    en el orden en que ocurrieron.
+    """
+    since_id = decode_change_token(since)
+    changes, has_more = changes_since(db, since_id, limit)
+    items = []
+    for change in changes:
+        item = {
+            "change_id": change.id,
+            "type": change.change_type.value,
+            "public_id": change.report.public_id,
+            "status": change.status,
+            "changed_at": change.changed_at,
+            "comment": change.comment,
+        }
+        if change.change_type == models.ReportChangeType.CREADO:
+            item.update(
+                latitude=change.report.latitude,
+                longitude=change.report.longitude,
+                description=change.report.description,
+            )
+        items.append(item)
+
+    last_id = changes[-1].id if changes else since_id
+    return {"items": items, "next_token": encode_change_token(last_id), "has_more": has_more}
+
+
+@router.get("/export")
+def export_reports_file(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    status_filter: Optional[models.ReportStatus] = None,
+    created_from: Optional[datetime] = Query(None, description="Desde (inclusive), por fecha de creación"),
+    created_to: Optional[datetime] = Query(None, description="Hasta (exclusive), por fecha de creación"),
+    current_user: SessionUser = Depends(get_current_user),
+):
+    """
+    Exporta todos los reportes (con comentarios) que cumplan los filtros, en
+    NDJSON (un reporte por línea) o CSV. La respuesta se genera en streaming.
+    """
+    file_name = f"reportes-{datetime.utcnow():%Y%m%d}.{export_format.value}"
+    return StreamingResponse(
+        export_reports(export_format, status_filter, created_from, created_to),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
+
+
+def _comment_out(comment: models.ReportComment) -> schemas.ReportCommentOut:
+    return schemas.ReportCommentOut.model_validate(comment, from_attributes=True)
+
+
+def _event_stream(channel: str) -> StreamingResponse:
+    return StreamingResponse(
+        report_events.stream(channel),
+        media_type="text/event-stream",
+        # Sin buffer en proxies (nginx) para que cada evento salga de inmediato
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _report_exists(public_id: str) -> bool:
+    # Sesión propia y corta: la de la dependencia quedaría abierta mientras dure el stream
+    with SessionLocal() as db:
+        return (
+            db.query(models.Report.id).filter(models.Report.public_id == public_id).first()
+            is not None
+        )
 
-    for report in reports:
-        distance = _haversine_distance_km(lat, lng, report.latitude, report.longitude)
-        if distance <= radius_km:
-            nearby.append((distance, report))
 
-    nearby.sort(key=lambda item: item[0])
-    return [report for _, report in nearby]
+@router.get("/events")
+async def stream_reports_events(
+    status_filter: Optional[models.ReportStatus] = Query(
+        None, description="Solo eventos de reportes en este estado (o que salen de él)"
+    ),
+):
+    """
+    Stream SSE de eventos de todos los reportes, opcionalmente de un estado.
+    """
+    return _event_stream(status_channel(status_filter) if status_filter else ALL_REPORTS_CHANNEL)
+
+
+@router.get("/{public_id}/events")
+async def stream_report_events(public_id: str):
+    """
+    Stream SSE de eventos (comentarios, cambios de estado) de un reporte.
+    """
+    if not await run_in_threadpool(_report_exists, public_id):
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    return _event_stream(report_channel(public_id))
 
 
 @router.get("/{public_id}", response_model=schemas.ReportOut)
-def get_report(public_id: str, db: Session = Depends(get_db)):
+def get_report(public_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Obtiene un reporte por su public_id (hash) con media y comentarios.
+    Responde 304 si el cliente ya tiene la versión actual (If-None-Match / If-Modified-Since).
     """
-    report = (
-        db.query(models.Report)
+    current = (
+        db.query(models.Report.id, models.Report.updated_at)
         .filter(models.Report.public_id == public_id)
         .first()
     )
-    if not report:
+    if not current:
         raise HTTPException(status_code=404, detail="Reporte no encontrado")
 
+    etag = entity_etag("report", current.id, current.updated_at)
+    headers = cache_headers(etag, current.updated_at)
+    if is_not_modified(request, etag, current.updated_at):
+        return not_modified_response(headers)
+
+    report = report_detail_query(db).filter(models.Report.id == current.id).one()
+    response.headers.update(headers)
     return report
+
+def _insert_comment(
+    db: Session,
+    report: models.Report,
+    author: str,
+    content: str,
+    staged: List[ReceivedUpload],
+) -> models.ReportComment:
+    """
+    Registra los blobs de las evidencias e inserta el comentario con su media,
+    el cambio en el registro y el correo al ciudadano. No hace commit.
+    """
+    # Las evidencias repetidas (mismos bytes) comparten un único archivo
+    stored = [link_staged(db, MediaStore.OPERATOR, received) for received in staged]
+
+    comment = models.ReportComment(report_id=report.id, author=author, content=content)
+    db.add(comment)
+    # actualizar updated_at del reporte (ETag) en la misma transacción que la media
+    report.updated_at = datetime.utcnow()
+    record_change(db, report, models.ReportChangeType.COMENTARIO, comment, report.updated_at)
+    db.flush()
+    _insert_media(db, models.ReportCommentMedia, "comment_id", comment.id, stored)
+    # Notificación al ciudadano (se envía en segundo plano desde la cola de correos)
+    queue_comment_notification_email(db, report=report, comment=comment, to_email=report.citizen_email)
+    return comment
+
+
 @router.post(
     "/{public_id}/comments",
     response_model=schemas.ReportCommentOut,
@@ -209,93 +536,70 @@ async def add_comment(
     public_id: str,
     content: str = Form(...),
     evidences: Optional[List[UploadFile]] = File(default=None),
-    db: Session = Depends(get_db),
-    current_user: models.SystemUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(get_current_user),
 ):
     """
     Agrega un comentario a un reporte.
 
     Además, opcionalmente permite adjuntar archivos como evidencias
     (subidos por el operario), que se guardan en una carpeta separada.
+    Las evidencias se reciben antes de abrir la transacción; el comentario,
+    su media y el cambio del registro se confirman en un único commit.
     """
     report = (
-        db.query(models.Report)
-        .filter(models.Report.public_id == public_id)
-        .first()
-    )
+        await db.execute(select(models.Report).where(models.Report.public_id == public_id))
+    ).scalar_one_or_none()
     if not report:
         raise HTTPException(status_code=404, detail="Reporte no encontrado")
-
-    author_value = current_user.username
-
-    # 1. Crear comentario
-    comment = models.ReportComment(
-        report_id=report.id,
-        author=author_value,
-        content=content,
+    # Libera la conexión mientras se reciben las evidencias
+    await db.rollback()
+
+    # 1. Recibir las evidencias en temporales (sin tocar la BD)
+    staged = await stage_uploads(evidences or [], MediaStore.OPERATOR)
+
+    # 2. Comentario + evidencias + cambio + correo en una sola transacción
+    async with write_turn(db):
+        try:
+            comment = await db.run_sync(_insert_comment, report, current_user.username, content, staged)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            await db.run_sync(discard_staged, MediaStore.OPERATOR, staged)
+            raise
+
+    comment = (
+        await db.execute(
+            select_comment()
+            .where(models.ReportComment.id == comment.id)
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one()
+    derivative_pipeline.schedule(MediaStore.OPERATOR, comment.media)
+    report_events.publish(
+        "comment_added",
+        report,
+        {"comment": _comment_out(comment), "updated_at": report.updated_at},
     )
-    db.add(comment)
-    # actualizar updated_at del reporte
-    report.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(comment)
-
-    # 2. Guardar evidencias si vienen
-    if evidences:
-        for idx, upload in enumerate(evidences, start=1):
-            _, ext = os.path.splitext(upload.filename or "")
-            ext = ext or ""
-
-            # Nombre de archivo indicando que es evidencia de comentario:
-            # p.ej. HASH_c10_1.jpg (reporte HASH, comment id 10, evid. #1)
-            file_name = f"{report.public_id}_c{comment.id}_{idx}{ext}"
-            dest_path = OPERATOR_MEDIA_DIR / file_name
-
-            with dest_path.open("wb") as buffer:
-                copyfileobj(upload.file, buffer)
-
-            media_type = "image"
-            if upload.content_type and upload.content_type.startswith("video/"):
-                media_type = "video"
-
-            comment_media = models.ReportCommentMedia(
-                comment_id=comment.id,
-                file_name=file_name,
-                media_type=media_type,
-                order=idx,
-            )
-            db.add(comment_media)
-
-        
-        db.commit()
-        db.refresh(comment)
 
-    try:
-        send_comment_notification_email(
-            report=report,
-            comment=comment,
-            to_email=report.citizen_email,
-        )
-    except Exception:
-        pass
+    email_worker.notify()
 
     return comment
 
 
-@router.get("/", response_model=List[schemas.ReportOut])
+@router.get("/", response_model=schemas.ReportPage)
 def list_reports(
     status_filter: Optional[models.ReportStatus] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado en `next_cursor`"),
     db: Session = Depends(get_db),
 ):
     """
-    Lista reportes, opcionalmente filtrando por estado.
+    Lista reportes completos (con media y comentarios), paginados del más reciente
+    al más antiguo y opcionalmente filtrando por estado.
     """
-    query = db.query(models.Report)
-    if status_filter:
-        query = query.filter(models.Report.status == status_filter)
-
-    # Si luego hay muchos, aquí puedes paginar
-    return query.order_by(models.Report.created_at.desc()).all()
+    items, next_cursor = _paginate_reports(report_detail_query(db), status_filter, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
 
 
 # ...
@@ -305,11 +609,11 @@ def update_report_status(
     public_id: str,
     status_in: schemas.ReportStatusUpdate,
     db: Session = Depends(get_db),
-    current_user: models.SystemUser = Depends(get_current_user),
+    current_user: SessionUser = Depends(get_current_user),
 
 ):
     report = (
-        db.query(models.Report)
+        report_detail_query(db)
         .filter(models.Report.public_id == public_id)
         .first()
     )
@@ -348,18 +652,33 @@ def update_report_status(
         content=f"{mensaje}"#\n{transicion}",
     )
     db.add(change_comment)
+    record_status_change(db, report, old_status, new_status, changed_at=report.updated_at)
+    record_change(
+        db, report, models.ReportChangeType.ESTADO, change_comment, changed_at=report.updated_at
+    )
 
+    queue_status_change_email(
+        db,
+        report=report,
+        old_status=old_status.value,
+        new_status=new_status.value,
+        to_email=report.citizen_email,
+    )
     db.commit()
-    db.refresh(report)
-
-    try:
-        send_status_change_email(
-            report=report,
-            old_status=old_status.value,
-            new_status=new_status.value,
-            to_email=report.citizen_email,
-        )
-    except Exception:
-        pass
+    tile_cache.invalidate_point(report.latitude, report.longitude)
+    # Recargar con media y comentarios (incluido el nuevo) en SELECTs fijos
+    report = report_detail_query(db).filter(models.Report.id == report.id).one()
+    report_events.publish(
+        "status_changed",
+        report,
+        {
+            "old_status": old_status,
+            "comment": _comment_out(change_comment),
+            "updated_at": report.updated_at,
+        },
+        old_status=old_status,
+    )
+
+    email_worker.notify()
 
     return report
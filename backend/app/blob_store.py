@@ -0,0 +1,255 @@
+# backend/app/blob_store.py
+"""
+Almacén de media direccionado por contenido.
+
+Cada archivo subido se guarda como `<sha256><ext>` en la carpeta de su
+`MediaStore`; si esos mismos bytes ya existían en la carpeta, se reutiliza
+el archivo y solo se incrementa `MediaBlob.ref_count`. Como el nombre
+depende únicamente del contenido, la URL de cada blob es inmutable.
+"""
+import os
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import delete, event, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .uploads import ReceivedUpload, receive_upload
+
+BASE_DIR = Path(__file__).resolve().parent  # backend/app
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class MediaStore(str, Enum):
+    # El valor es el nombre de la carpeta dentro de backend/app
+    REPORTS = "media"
+    OPERATOR = "media_operator"
+    NEWS = "media-news"
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    file_name: str
+    media_type: str
+    sha256: str
+    # True si el archivo se escribió con esta subida (el blob no existía)
+    created: bool = False
+
+
+def store_dir(store: MediaStore) -> Path:
+    path = BASE_DIR / store.value
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _find_blob(db: Session, store: MediaStore, sha256: str) -> Optional[models.MediaBlob]:
+    return (
+        db.query(models.MediaBlob)
+        .filter(models.MediaBlob.store == store.value, models.MediaBlob.sha256 == sha256)
+        .first()
+    )
+
+
+def _add_reference(db: Session, blob: Optional[models.MediaBlob]) -> bool:
+    """
+    Suma una referencia al blob. Retorna False si `collect_garbage` lo borró
+    entre la lectura y esta actualización.
+    """
+    if blob is None:
+        return False
+    result = db.execute(
+        update(models.MediaBlob)
+        .where(models.MediaBlob.id == blob.id)
+        .values(ref_count=models.MediaBlob.ref_count + 1)
+    )
+    return result.rowcount == 1
+
+
+def _lock_blob(db: Session, store: MediaStore, sha256: str) -> Optional[models.MediaBlob]:
+    """
+    Lee el blob con su fila bloqueada hasta el fin de la transacción. La
+    actualización sin cambios toma el lock de la fila en PostgreSQL y el de
+    escritura en SQLite (que ignora FOR UPDATE), así que espera a quien esté
+    registrando o liberando el mismo contenido.
+    """
+    db.execute(
+        update(models.MediaBlob)
+        .where(models.MediaBlob.store == store.value, models.MediaBlob.sha256 == sha256)
+        .values(ref_count=models.MediaBlob.ref_count)
+    )
+    return (
+        db.query(models.MediaBlob)
+        .filter(models.MediaBlob.store == store.value, models.MediaBlob.sha256 == sha256)
+        .populate_existing()
+        .first()
+    )
+
+
+def link_staged(db: Session, store: MediaStore, received: ReceivedUpload) -> StoredBlob:
+    """
+    Registra (o reutiliza) el blob de un archivo ya recibido. No hace commit.
+    Operaciones síncronas de BD y disco: en async se ejecuta vía `AsyncSession.run_sync`.
+    """
+
+    def stored(file_name: str, created: bool = False) -> StoredBlob:
+        return StoredBlob(
+            file_name=file_name,
+            media_type=received.media_type,
+            sha256=received.sha256,
+            created=created,
+        )
+
+    blob = _find_blob(db, store, received.sha256)
+    if not _add_reference(db, blob):
+        file_name = f"{received.sha256}{received.extension}"
+        # La fila va antes que el archivo: mientras la transacción siga
+        # abierta, `discard_staged` y `collect_garbage` esperan su lock
+        if _insert_blob(db, store, received, file_name):
+            os.replace(received.tmp_path, store_dir(store) / file_name)
+            return stored(file_name, created=True)
+        # Otra petición registró el mismo contenido al mismo tiempo
+        blob = _find_blob(db, store, received.sha256)
+        _add_reference(db, blob)
+
+    received.tmp_path.unlink(missing_ok=True)
+    return stored(blob.file_name)
+
+
+def _insert_blob(db: Session, store: MediaStore, received: ReceivedUpload, file_name: str) -> bool:
+    """
+    Inserta la fila del blob. Retorna False si ya existía (mismo store y sha256).
+    """
+    values = {
+        "store": store.value,
+        "sha256": received.sha256,
+        "file_name": file_name,
+        "size_bytes": received.size,
+        "ref_count": 1,
+    }
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is not None:
+        # Sin SAVEPOINT: en pysqlite un SAVEPOINT abierto antes de cualquier
+        # escritura inicia la transacción y su RELEASE la confirma
+        result = db.execute(
+            insert(models.MediaBlob).values(**values).on_conflict_do_nothing(index_elements=["store", "sha256"])
+        )
+        return result.rowcount == 1
+
+    try:
+        with db.begin_nested():
+            db.add(models.MediaBlob(**values))
+    except IntegrityError:
+        return False
+    return True
+
+
+async def stage_uploads(uploads: Iterable[UploadFile], store: MediaStore) -> List[ReceivedUpload]:
+    """
+    Recibe los archivos en temporales del almacén, antes de abrir la
+    transacción que los registra con `link_staged`. Si uno falla, descarta
+    los ya recibidos.
+    """
+    staged: List[ReceivedUpload] = []
+    try:
+        for upload in uploads:
+            staged.append(await receive_upload(upload, store_dir(store)))
+    except BaseException:
+        for received in staged:
+            received.tmp_path.unlink(missing_ok=True)
+        raise
+    return staged
+
+
+def discard_staged(db: Session, store: MediaStore, staged: Iterable[ReceivedUpload]) -> None:
+    """
+    Limpia los archivos de una transacción revertida: los temporales y los
+    que alcanzaron a moverse a su nombre definitivo sin que su blob quedara
+    registrado. Otra petición pudo registrar el mismo contenido mientras
+    tanto: con la fila bloqueada se vuelve a leer `ref_count` y, si el blob
+    tiene referencias (o queda para `collect_garbage`), el archivo se
+    conserva. Hace commit para soltar el lock.
+    """
+    for received in staged:
+        received.tmp_path.unlink(missing_ok=True)
+        file_name = f"{received.sha256}{received.extension}"
+        blob = _lock_blob(db, store, received.sha256)
+        if blob is None or blob.file_name != file_name:
+            (store_dir(store) / file_name).unlink(missing_ok=True)
+    db.commit()
+
+
+def _release(connection: Connection, store: MediaStore, file_name: str) -> None:
+    connection.execute(
+        update(models.MediaBlob)
+        .where(
+            models.MediaBlob.store == store.value,
+            models.MediaBlob.file_name == file_name,
+            models.MediaBlob.ref_count > 0,
+        )
+        .values(ref_count=models.MediaBlob.ref_count - 1)
+    )
+
+
+@event.listens_for(models.ReportMedia, "after_delete")
+def _report_media_deleted(mapper, connection: Connection, target: models.ReportMedia) -> None:
+    _release(connection, MediaStore.REPORTS, target.file_name)
+
+
+@event.listens_for(models.ReportCommentMedia, "after_delete")
+def _comment_media_deleted(mapper, connection: Connection, target: models.ReportCommentMedia) -> None:
+    _release(connection, MediaStore.OPERATOR, target.file_name)
+
+
+@event.listens_for(models.NewsMedia, "after_delete")
+def _news_media_deleted(mapper, connection: Connection, target: models.NewsMedia) -> None:
+    _release(connection, MediaStore.NEWS, target.file_name)
+
+
+def _delete_variants(db: Session, store: MediaStore, file_name: str) -> None:
+    """
+    Borra los derivados de un blob: sus filas y sus archivos
+    (`<sha256>_<variante>.webp`, también los que aún no se registraron).
+    """
+    directory = store_dir(store)
+    variants = db.query(models.MediaVariant).filter(
+        models.MediaVariant.store == store.value,
+        models.MediaVariant.source_file_name == file_name,
+    )
+    paths = {directory / variant.file_name for variant in variants}
+    paths.update(directory.glob(f"{Path(file_name).stem}_*.webp"))
+    for path in paths:
+        path.unlink(missing_ok=True)
+    variants.delete(synchronize_session=False)
+
+
+def collect_garbage(db: Session) -> int:
+    """
+    Elimina los blobs sin referencias (fila, archivo y derivados). Retorna
+    cuántos borró.
+    """
+    orphans = db.query(models.MediaBlob.id, models.MediaBlob.store, models.MediaBlob.file_name).filter(
+        models.MediaBlob.ref_count <= 0
+    ).all()
+    removed = 0
+    for blob_id, store_name, file_name in orphans:
+        # Se vuelve a comprobar `ref_count` al borrar: una subida pudo
+        # reutilizar el blob después de la consulta
+        deleted = db.execute(
+            delete(models.MediaBlob).where(models.MediaBlob.id == blob_id, models.MediaBlob.ref_count <= 0)
+        ).rowcount
+        if not deleted:
+            continue
+        store = MediaStore(store_name)
+        _delete_variants(db, store, file_name)
+        (store_dir(store) / file_name).unlink(missing_ok=True)
+        removed += 1
+    db.commit()
+    return removed
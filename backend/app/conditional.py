@@ -0,0 +1,70 @@
+# backend/app/conditional.py
+"""
+GET condicional (ETag / Last-Modified) para los endpoints de lectura.
+
+El ETag de un reporte o noticia se deriva de su id y `updated_at`, que se
+obtienen con una consulta por índice; si coincide con `If-None-Match` se
+responde 304 sin cargar relaciones ni serializar. `Cache-Control: no-cache`
+obliga al navegador a revalidar siempre, así que los cambios se ven de
+inmediato.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+REVALIDATE_CACHE = "no-cache"
+
+
+def entity_etag(kind: str, entity_id: int, updated_at: datetime) -> str:
+    # Débil: el mismo estado puede serializarse con bytes distintos
+    return f'W/"{kind}-{entity_id}-{updated_at.strftime("%Y%m%d%H%M%S%f")}"'
+
+
+def content_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Las fechas de la BD son UTC sin zona horaria
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _weak_match(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evalúa If-None-Match (prioritario) o If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _weak_match(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            # Con zona `-0000` parsedate_to_datetime retorna una fecha sin zona
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified tiene precisión de segundos
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,211 @@
+# backend/app/email_outbox.py
+"""
+Worker de la cola de correos salientes (`models.EmailOutbox`).
+
+Corre en un hilo aparte del servidor: reclama lotes de correos pendientes,
+los envía reutilizando una sola conexión SMTP autenticada y, si un envío
+falla, lo reprograma con backoff exponencial hasta `MAX_ATTEMPTS`.
+La conexión se cierra tras `SMTP_IDLE_SECONDS` sin actividad.
+"""
+import logging
+import os
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import uuid4
+
+from sqlalchemy import or_
+
+from . import models
+from .db import SessionLocal
+from .email_utils import build_message, open_smtp_connection
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 60 * 30
+# Tiempo que un lote queda reservado para este worker
+CLAIM_LEASE_SECONDS = 120
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+class EmailOutboxWorker:
+    def __init__(self) -> None:
+        self._worker_id = uuid4().hex
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used: Optional[datetime] = None
+
+    # ---- ciclo de vida ----
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._close_smtp()
+
+    def notify(self) -> None:
+        """
+        Despierta al worker (p. ej. justo después de encolar un correo).
+        """
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                sent_batch = self.process_batch()
+            except Exception:
+                logger.exception("Error procesando la cola de correos")
+                sent_batch = 0
+
+            if sent_batch:
+                continue
+
+            self._close_idle_smtp()
+            self._wakeup.wait(POLL_SECONDS)
+            self._wakeup.clear()
+
+    # ---- conexión SMTP persistente ----
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    self._last_used = datetime.utcnow()
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                # Conexión caída (p. ej. socket cerrado por el servidor): se reabre
+                pass
+            self._close_smtp()
+
+        self._smtp = open_smtp_connection()
+        # Cuenta como actividad aunque el envío falle: así también se cierra por inactividad
+        self._last_used = datetime.utcnow()
+        return self._smtp
+
+    def _close_smtp(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+    def _close_idle_smtp(self) -> None:
+        if self._smtp is None or self._last_used is None:
+            return
+        if datetime.utcnow() - self._last_used > timedelta(seconds=SMTP_IDLE_SECONDS):
+            self._close_smtp()
+
+    # ---- procesamiento ----
+
+    def _claim_batch(self, db) -> List[models.EmailOutbox]:
+        now = datetime.utcnow()
+        due_ids = [
+            row_id
+            for (row_id,) in db.query(models.EmailOutbox.id)
+            .filter(
+                models.EmailOutbox.status == models.EmailOutboxStatus.PENDIENTE,
+                models.EmailOutbox.next_attempt_at <= now,
+                or_(
+                    models.EmailOutbox.locked_until.is_(None),
+                    models.EmailOutbox.locked_until < now,
+                ),
+            )
+            .order_by(models.EmailOutbox.id)
+            .limit(BATCH_SIZE)
+        ]
+        if not due_ids:
+            return []
+
+        # El UPDATE condicional asegura que dos workers no reclamen el mismo correo
+        db.query(models.EmailOutbox).filter(
+            models.EmailOutbox.id.in_(due_ids),
+            or_(
+                models.EmailOutbox.locked_until.is_(None),
+                models.EmailOutbox.locked_until < now,
+            ),
+        ).update(
+            {
+                models.EmailOutbox.claimed_by: self._worker_id,
+                models.EmailOutbox.locked_until: now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+
+        return (
+            db.query(models.EmailOutbox)
+            .filter(
+                models.EmailOutbox.id.in_(due_ids),
+                models.EmailOutbox.claimed_by == self._worker_id,
+            )
+            .order_by(models.EmailOutbox.id)
+            .all()
+        )
+
+    def process_batch(self) -> int:
+        """
+        Envía un lote de correos pendientes. Retorna cuántos se procesaron.
+        """
+        db = SessionLocal()
+        try:
+            batch = self._claim_batch(db)
+            for item in batch:
+                self._deliver(item)
+                item.locked_until = None
+                db.commit()
+            return len(batch)
+        finally:
+            db.close()
+
+    def _deliver(self, item: models.EmailOutbox) -> None:
+        now = datetime.utcnow()
+        if item.expires_at and item.expires_at < now:
+            item.status = models.EmailOutboxStatus.EXPIRADO
+            return
+
+        try:
+            self._get_smtp().send_message(build_message(item))
+        except Exception as exc:
+            # Cualquier error cuenta como intento (p. ej. un mensaje que no se
+            # puede construir), para que el correo termine en FALLIDO y no
+            # bloquee al resto del lote
+            if isinstance(exc, (smtplib.SMTPException, OSError)):
+                # La conexión puede haber quedado inutilizable: se reabre en el siguiente envío
+                self._close_smtp()
+            item.attempts += 1
+            item.last_error = str(exc)
+            if item.attempts >= MAX_ATTEMPTS:
+                item.status = models.EmailOutboxStatus.FALLIDO
+                logger.error("Correo %s descartado tras %s intentos: %s", item.id, item.attempts, exc)
+            else:
+                item.next_attempt_at = now + _backoff(item.attempts)
+                logger.warning("Fallo enviando correo %s (intento %s): %s", item.id, item.attempts, exc)
+            return
+
+        item.status = models.EmailOutboxStatus.ENVIADO
+        item.sent_at = now
+        item.attempts += 1
+
+
+email_worker = EmailOutboxWorker()
@@ -2,12 +2,17 @@
 import os
 import smtplib
 import ssl
-from datetime import datetime
+from datetime import datetime, timedelta
 from email.message import EmailMessage
 from typing import Optional
 
+from sqlalchemy.orm import Session
+
 from . import models
 
+# TTL del código OTP (el correo no se envía si ya venció)
+OTP_TTL_MINUTES = 3
+
 
 def _get_sender_address(default_user: str) -> str:
     """
@@ -18,31 +23,81 @@ def _get_sender_address(default_user: str) -> str:
     return os.getenv("GMAIL_SENDER") or default_user
 
 
-def send_otp_email(to_email: str, otp_code: str) -> None:
+def open_smtp_connection() -> smtplib.SMTP:
+    """
+    Abre y autentica una conexión SMTP.
+
+    Por defecto usa Gmail (SMTP_SSL en el puerto 465). Para pruebas locales
+    (p. ej. `aiosmtpd`) se puede apuntar a otro servidor con SMTP_HOST,
+    SMTP_PORT y SMTP_SECURITY=ssl|starttls|none; si no hay GMAIL_USER /
+    GMAIL_APP_PASSWORD no se hace login.
+    """
+    host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    port = int(os.getenv("SMTP_PORT", "465"))
+    security = os.getenv("SMTP_SECURITY", "ssl").lower()
     smtp_user = os.getenv("GMAIL_USER")
     smtp_pass = os.getenv("GMAIL_APP_PASSWORD")
 
-    if not smtp_user or not smtp_pass:
-        raise RuntimeError("Faltan GMAIL_USER o GMAIL_APP_PASSWORD en las variables de entorno")
+    if security == "ssl":
+        if not smtp_user or not smtp_pass:
+            raise RuntimeError("Faltan GMAIL_USER o GMAIL_APP_PASSWORD en las variables de entorno")
+        server = smtplib.SMTP_SSL(host, port, context=ssl.create_default_context())
+    else:
+        server = smtplib.SMTP(host, port)
+        if security == "starttls":
+            server.starttls(context=ssl.create_default_context())
+
+    if smtp_user and smtp_pass:
+        server.login(smtp_user, smtp_pass)
+    return server
+
 
+def build_message(item: models.EmailOutbox) -> EmailMessage:
     msg = EmailMessage()
-    msg["Subject"] = "Código de verificación para tu reporte"
-    msg["From"] = _get_sender_address(smtp_user)
-    msg["To"] = to_email
-
-    msg.set_content(
-        f"Tu código de verificación es: {otp_code}\n\n"
-        "Este código es válido por 3 minutos. "
-        "Utilízalo en la aplicación para confirmar tu reporte."
+    msg["Subject"] = item.subject
+    msg["From"] = _get_sender_address(os.getenv("GMAIL_USER") or "no-reply@localhost")
+    msg["To"] = item.to_email
+    msg.set_content(item.body)
+    return msg
+
+
+def _enqueue(
+    db: Session,
+    to_email: str,
+    subject: str,
+    body: str,
+    expires_at: Optional[datetime] = None,
+) -> models.EmailOutbox:
+    """
+    Agrega el correo a la cola de salida. No hace commit: el correo queda
+    persistido en la misma transacción del cambio que lo origina.
+    """
+    item = models.EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        expires_at=expires_at,
+    )
+    db.add(item)
+    return item
+
+
+def queue_otp_email(db: Session, to_email: str, otp_code: str) -> None:
+    _enqueue(
+        db,
+        to_email=to_email,
+        subject="Código de verificación para tu reporte",
+        body=(
+            f"Tu código de verificación es: {otp_code}\n\n"
+            "Este código es válido por 3 minutos. "
+            "Utilízalo en la aplicación para confirmar tu reporte."
+        ),
+        expires_at=datetime.utcnow() + timedelta(minutes=OTP_TTL_MINUTES),
     )
-
-    context = ssl.create_default_context()
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
 
 
-def send_status_change_email(
+def queue_status_change_email(
+    db: Session,
     report: models.Report,
     old_status: str,
     new_status: str,
@@ -50,59 +105,43 @@ def send_status_change_email(
 ) -> None:
     if not to_email:
         return
-    smtp_user = os.getenv("GMAIL_USER")
-    smtp_pass = os.getenv("GMAIL_APP_PASSWORD")
-    if not smtp_user or not smtp_pass:
-        raise RuntimeError("Faltan GMAIL_USER o GMAIL_APP_PASSWORD en las variables de entorno")
 
-    msg = EmailMessage()
-    msg["Subject"] = f"Actualización del reporte #{report.id}"
-    msg["From"] = _get_sender_address(smtp_user)
-    msg["To"] = to_email
-
-    msg.set_content(
-        "Hola,\n\n"
-        f"Tu reporte {report.public_id} cambió de '{old_status}' a '{new_status}'.\n"
-        f"Descripción: {report.description}\n"
-        f"Fecha: {datetime.utcnow():%Y-%m-%d %H:%M UTC}\n\n"
-        "Puedes consultar el detalle en la plataforma para ver comentarios y evidencias agregadas.\n\n"
-        "— Equipo de Reportes Ciudadanos"
+    _enqueue(
+        db,
+        to_email=to_email,
+        subject=f"Actualización del reporte #{report.id}",
+        body=(
+            "Hola,\n\n"
+            f"Tu reporte {report.public_id} cambió de '{old_status}' a '{new_status}'.\n"
+            f"Descripción: {report.description}\n"
+            f"Fecha: {datetime.utcnow():%Y-%m-%d %H:%M UTC}\n\n"
+            "Puedes consultar el detalle en la plataforma para ver comentarios y evidencias agregadas.\n\n"
+            "— Equipo de Reportes Ciudadanos"
+        ),
     )
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
-
 
-def send_comment_notification_email(
+def queue_comment_notification_email(
+    db: Session,
     report: models.Report,
     comment: models.ReportComment,
     to_email: Optional[str] = None,
 ) -> None:
     if not to_email:
         return
-    smtp_user = os.getenv("GMAIL_USER")
-    smtp_pass = os.getenv("GMAIL_APP_PASSWORD")
-    if not smtp_user or not smtp_pass:
-        raise RuntimeError("Faltan GMAIL_USER o GMAIL_APP_PASSWORD en las variables de entorno")
 
-    msg = EmailMessage()
-    msg["Subject"] = f"Nuevo comentario en tu reporte #{report.id}"
-    msg["From"] = _get_sender_address(smtp_user)
-    msg["To"] = to_email
-
-    msg.set_content(
-        "Hola,\n\n"
-        f"Se agregó un nuevo comentario a tu reporte {report.public_id}.\n"
-        f"Autor: {comment.author or 'Operario'}\n"
-        f"Contenido: {comment.content}\n"
-        f"Fecha: {comment.created_at:%Y-%m-%d %H:%M UTC}\n\n"
-        "Ingresa a la plataforma para revisar los detalles, evidencias y cambios de estado.\n\n"
-        "— Equipo de Reportes Ciudadanos"
+    created_at = comment.created_at or datetime.utcnow()
+    _enqueue(
+        db,
+        to_email=to_email,
+        subject=f"Nuevo comentario en tu reporte #{report.id}",
+        body=(
+            "Hola,\n\n"
+            f"Se agregó un nuevo comentario a tu reporte {report.public_id}.\n"
+            f"Autor: {comment.author or 'Operario'}\n"
+            f"Contenido: {comment.content}\n"
+            f"Fecha: {created_at:%Y-%m-%d %H:%M UTC}\n\n"
+            "Ingresa a la plataforma para revisar los detalles, evidencias y cambios de estado.\n\n"
+            "— Equipo de Reportes Ciudadanos"
+        ),
     )
-
-    context = ssl.create_default_context()
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
@@ -1,21 +1,51 @@
 # backend/app/main.py
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import Base, engine
-from . import models
-from .api import reports,auth, analytics, news 
-
 from dotenv import load_dotenv  # 👈 nuevo
-# 👇 Cargar variables del archivo .env (busca hacia arriba hasta encontrarlo)
+# 👇 Cargar variables del archivo .env antes de importar los módulos que las leen
 BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
 load_dotenv(BASE_DIR / ".env")
+
+from .db import Base, SessionLocal, engine
+from . import models
+from .migrations import run_migrations
+from .spatial import ensure_spatial_index
+from .search import ensure_search_index
+from .report_rollups import ensure_rollups
+from .email_outbox import email_worker
+from .visit_buffer import visit_buffer
+from .media_derivatives import derivative_pipeline
+from .realtime import report_events
+from .media_files import MediaFiles
+from .uploads import UploadSizeLimitMiddleware
+from .api import reports,auth, analytics, news 
 # Crear tablas
 Base.metadata.create_all(bind=engine)
+# Cambios sobre tablas existentes (índices, etc.), versionados en schema_version
+run_migrations(engine)
+ensure_spatial_index(engine)
+ensure_search_index(engine)
+with SessionLocal() as _db:
+    ensure_rollups(_db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker que envía en segundo plano la cola de correos
+    email_worker.start()
+    # Escritura en lote de las visitas; el último flush ocurre al apagar
+    visit_buffer.start()
+    yield
+    visit_buffer.stop()
+    email_worker.stop()
+    derivative_pipeline.shutdown()
+    await report_events.broker.close()
 
-app = FastAPI(title="API Reportes Geográficos")
+
+app = FastAPI(title="API Reportes Geográficos", lifespan=lifespan)
 
 # CORS (para el frontend en local; luego puedes ajustar dominios)
 origins = [
@@ -32,6 +62,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tope del cuerpo de las peticiones mientras se recibe (antes de volcar el multipart a disco)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Rutas
 app.include_router(auth.router, prefix="/api")     # 👈 /api/auth/...
 app.include_router(reports.router, prefix="/api")
@@ -41,14 +74,14 @@ app.include_router(analytics.router, prefix="/api")
 # ---- Servir media de ciudadanos ----
 MEDIA_DIR = Path(__file__).resolve().parent / "media"
 MEDIA_DIR.mkdir(exist_ok=True)
-app.mount("/media", StaticFiles(directory=MEDIA_DIR), name="media")
+app.mount("/media", MediaFiles(directory=MEDIA_DIR), name="media")
 
 # ---- Servir media de operarios (evidencias de comentarios) ----
 OPERATOR_MEDIA_DIR = Path(__file__).resolve().parent / "media_operator"
 OPERATOR_MEDIA_DIR.mkdir(exist_ok=True)
-app.mount("/media-operator", StaticFiles(directory=OPERATOR_MEDIA_DIR), name="media_operator")
+app.mount("/media-operator", MediaFiles(directory=OPERATOR_MEDIA_DIR), name="media_operator")
 
 # ---- Servir media de noticias ----
 NEWS_MEDIA_DIR = Path(__file__).resolve().parent / "media-news"
 NEWS_MEDIA_DIR.mkdir(exist_ok=True)
-app.mount("/media-news", StaticFiles(directory=NEWS_MEDIA_DIR), name="media_news")
+app.mount("/media-news", MediaFiles(directory=NEWS_MEDIA_DIR), name="media_news")
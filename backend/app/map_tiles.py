@@ -0,0 +1,219 @@
+# backend/app/map_tiles.py
+"""
+Clusters de reportes por tile de mapa (esquema XYZ / Web Mercator).
+
+Cada tile `z/x/y` se divide en `TILE_GRID` × `TILE_GRID` celdas; los
+reportes de cada celda se resumen en un cluster con cantidad, centroide y
+desglose por estado. Los reportes del tile se obtienen con
+`spatial.reports_in_box` (R*Tree en SQLite), así que el costo depende de
+los reportes del tile y no del total.
+
+Hasta `ROLLUP_MAX_ZOOM` un tile puede abarcar todos los reportes, así que
+los clusters se arman con el rollup `ReportGridCount` (celdas de
+`GRID_CELL_DEG`): el costo depende de las celdas ocupadas y no de la
+cantidad de reportes. El centroide se aproxima con el centro de cada celda
+del rollup y esos clusters no enlazan a un reporte (`public_id`).
+
+Las latitudes fuera del límite de Web Mercator (±85.05°) se cuentan en la
+primera o la última fila de tiles, y la consulta de esas filas se extiende
+hasta ±90°.
+
+Los tiles calculados se guardan en `tile_cache`. Al crear un reporte o
+cambiar su estado se invalidan los tiles que contienen su punto en todos
+los zooms; `TILE_CACHE_TTL_SECONDS` acota lo desactualizado que puede
+quedar el caché de otro proceso del servidor.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .report_rollups import GRID_CELL_DEG, grid_cell
+from .spatial import BoundingBox, reports_in_box
+
+MAX_ZOOM = 20
+TILE_GRID = 8
+# Con zoom 10 una celda de cluster (~0.044°) abarca al menos 4 celdas del rollup
+ROLLUP_MAX_ZOOM = 10
+TILE_CACHE_MAX_ENTRIES = int(os.getenv("TILE_CACHE_MAX_ENTRIES", "2048"))
+TILE_CACHE_TTL_SECONDS = float(os.getenv("TILE_CACHE_TTL_SECONDS", "300"))
+
+# Límite de latitud de Web Mercator
+MAX_MERCATOR_LAT = 85.05112878
+
+TileKey = Tuple[int, int, int]
+
+
+def _tile_fraction(z: int, lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Coordenadas de tile (con decimales) de un punto en el zoom `z`.
+    """
+    n = 2**z
+    lat = max(min(lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    lat_rad = math.radians(lat)
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_for_point(z: int, lat: float, lon: float) -> TileKey:
+    n = 2**z
+    x, y = _tile_fraction(z, lat, lon)
+    return z, min(int(x), n - 1), min(int(y), n - 1)
+
+
+def tile_bounds(z: int, x: int, y: int) -> BoundingBox:
+    """
+    Caja del tile para consultar sus reportes. En la primera y la última fila
+    llega hasta ±90°, porque ahí se cuentan los puntos fuera de Web Mercator.
+    """
+    n = 2**z
+
+    def tile_lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return BoundingBox(
+        min_lat=-90.0 if y == n - 1 else tile_lat(y + 1),
+        max_lat=90.0 if y == 0 else tile_lat(y),
+        min_lon=x / n * 360.0 - 180.0,
+        max_lon=(x + 1) / n * 360.0 - 180.0,
+    )
+
+
+def _offset_in_tile(z: int, x: int, y: int, lat: float, lon: float) -> Optional[Tuple[float, float]]:
+    """
+    Posición (0 a 1) del punto dentro del tile, o None si cae en otro.
+    """
+    fx, fy = _tile_fraction(z, lat, lon)
+    # Fuera de ±85.05° y en lon = ±180 el punto se lleva a la primera o última fila/columna, como en `tile_for_point`
+    edge = math.nextafter(2**z, 0)
+    fx, fy = min(max(fx, 0.0), edge) - x, min(max(fy, 0.0), edge) - y
+    # Los bordes compartidos entran en la caja de dos tiles: se cuentan en uno
+    if not (0.0 <= fx < 1.0 and 0.0 <= fy < 1.0):
+        return None
+    return fx, fy
+
+
+def _tile_points(db: Session, z: int, box: BoundingBox) -> Iterator[Tuple[Optional[str], float, float, str, int]]:
+    """
+    Puntos del tile como (public_id, lat, lon, estado, cantidad): un reporte
+    por punto o, hasta ROLLUP_MAX_ZOOM, una celda del rollup por estado.
+    """
+    if z <= ROLLUP_MAX_ZOOM:
+        min_cell = grid_cell(box.min_lat, box.min_lon)
+        max_cell = grid_cell(box.max_lat, box.max_lon)
+        rows = db.query(models.ReportGridCount).filter(
+            models.ReportGridCount.cell_lat.between(min_cell[0], max_cell[0]),
+            models.ReportGridCount.cell_lon.between(min_cell[1], max_cell[1]),
+            models.ReportGridCount.count > 0,
+        )
+        for row in rows:
+            yield (
+                None,
+                (row.cell_lat + 0.5) * GRID_CELL_DEG,
+                (row.cell_lon + 0.5) * GRID_CELL_DEG,
+                row.status,
+                row.count,
+            )
+        return
+
+    rows = reports_in_box(db, box).with_entities(
+        models.Report.public_id,
+        models.Report.latitude,
+        models.Report.longitude,
+        models.Report.status,
+    )
+    for public_id, lat, lon, status in rows:
+        yield public_id, lat, lon, status.value if isinstance(status, models.ReportStatus) else status, 1
+
+
+def build_tile(db: Session, z: int, x: int, y: int) -> dict:
+    cells: Dict[Tuple[int, int], dict] = {}
+    total = 0
+    for public_id, lat, lon, status_value, count in _tile_points(db, z, tile_bounds(z, x, y)):
+        offset = _offset_in_tile(z, x, y, lat, lon)
+        if offset is None:
+            continue
+
+        fx, fy = offset
+        cell = cells.setdefault(
+            (int(fx * TILE_GRID), int(fy * TILE_GRID)),
+            {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "status_counts": {}, "public_id": public_id},
+        )
+        cell["count"] += count
+        cell["lat_sum"] += lat * count
+        cell["lon_sum"] += lon * count
+        cell["status_counts"][status_value] = cell["status_counts"].get(status_value, 0) + count
+        total += count
+
+    clusters = [
+        {
+            "latitude": cell["lat_sum"] / cell["count"],
+            "longitude": cell["lon_sum"] / cell["count"],
+            "count": cell["count"],
+            "status_counts": cell["status_counts"],
+            # Con un solo reporte el cliente puede enlazar directo al detalle
+            "public_id": cell["public_id"] if cell["count"] == 1 else None,
+        }
+        for cell in cells.values()
+    ]
+    return {"z": z, "x": x, "y": y, "total": total, "clusters": clusters}
+
+
+class TileCache:
+    def __init__(self, max_entries: int = TILE_CACHE_MAX_ENTRIES, ttl_seconds: float = TILE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[TileKey, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Aumenta con cada invalidación: un tile calculado antes no se guarda
+        self.generation = 0
+
+    def get(self, key: TileKey) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, tile = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return tile
+
+    def put(self, key: TileKey, tile: dict, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_point(self, lat: float, lon: float) -> None:
+        """
+        Descarta los tiles (de todos los zooms) que contienen el punto.
+        """
+        keys = [tile_for_point(z, lat, lon) for z in range(MAX_ZOOM + 1)]
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+tile_cache = TileCache()
+
+
+def get_tile(db: Session, z: int, x: int, y: int) -> dict:
+    key = (z, x, y)
+    tile = tile_cache.get(key)
+    if tile is None:
+        generation = tile_cache.generation
+        tile = build_tile(db, z, x, y)
+        tile_cache.put(key, tile, generation)
+    return tile
@@ -0,0 +1,207 @@
+# backend/app/media_derivatives.py
+"""
+Generación de derivados de imágenes subidas.
+
+Después del commit de una subida, las imágenes se envían a un pool de
+procesos que genera una miniatura, una versión mediana y una copia WebP del
+original. Al terminar, los nombres y dimensiones se guardan en
+`models.MediaVariant` y quedan expuestos en los esquemas `*MediaOut`.
+Como los blobs son direccionados por contenido, cada imagen se procesa una
+sola vez aunque esté referenciada por varias filas de media; mientras un
+blob tiene un trabajo en curso no se encola otro.
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+from sqlalchemy.orm import Session
+
+from . import models
+from .blob_store import MediaStore, store_dir
+from .db import SessionLocal
+from .news_feed import news_feed_cache
+
+logger = logging.getLogger(__name__)
+
+# variante -> lado mayor máximo en píxeles (None = tamaño original)
+VARIANT_SIZES: Dict[str, Optional[int]] = {
+    "thumb": 320,
+    "medium": 1280,
+    "webp": None,
+}
+WEBP_QUALITY = 80
+MAX_WORKERS = int(os.getenv("MEDIA_DERIVATIVE_WORKERS", "2"))
+
+
+def generate_variants(src_path: str, dest_dir: str, stem: str) -> List[dict]:
+    """
+    Genera los derivados de una imagen. Corre en un proceso del pool, así que
+    solo recibe y retorna datos simples. Los derivados que ya existen en disco
+    no se regeneran.
+    """
+    results = []
+    with Image.open(src_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        for variant, max_side in VARIANT_SIZES.items():
+            file_name = f"{stem}_{variant}.webp"
+            dest_path = Path(dest_dir) / file_name
+
+            if dest_path.exists():
+                with Image.open(dest_path) as existing:
+                    width, height = existing.size
+            else:
+                derived = image.copy()
+                if max_side is not None:
+                    derived.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+                # Nombre temporal único: otro proceso puede estar generando el mismo derivado
+                fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=f".{file_name}.", suffix=".part")
+                try:
+                    with os.fdopen(fd, "wb") as target:
+                        derived.save(target, format="WEBP", quality=WEBP_QUALITY)
+                    os.replace(tmp_path, dest_path)
+                except BaseException:
+                    Path(tmp_path).unlink(missing_ok=True)
+                    raise
+                width, height = derived.size
+
+            results.append(
+                {
+                    "variant": variant,
+                    "file_name": file_name,
+                    "width": width,
+                    "height": height,
+                }
+            )
+    return results
+
+
+def _touch_owners(db: Session, store: MediaStore, source_file_name: str) -> None:
+    """
+    Actualiza `updated_at` de los reportes o noticias que usan la imagen:
+    sus respuestas ahora incluyen los derivados y el ETag debe cambiar.
+    """
+    now = datetime.utcnow()
+    if store == MediaStore.NEWS:
+        owners = db.query(models.NewsMedia.news_id).filter(models.NewsMedia.file_name == source_file_name)
+        db.query(models.News).filter(models.News.id.in_(owners.scalar_subquery())).update(
+            {models.News.updated_at: now}, synchronize_session=False
+        )
+        return
+
+    if store == MediaStore.REPORTS:
+        owners = db.query(models.ReportMedia.report_id).filter(models.ReportMedia.file_name == source_file_name)
+    else:
+        owners = (
+            db.query(models.ReportComment.report_id)
+            .join(models.ReportCommentMedia, models.ReportCommentMedia.comment_id == models.ReportComment.id)
+            .filter(models.ReportCommentMedia.file_name == source_file_name)
+        )
+    db.query(models.Report).filter(models.Report.id.in_(owners.scalar_subquery())).update(
+        {models.Report.updated_at: now}, synchronize_session=False
+    )
+
+
+class DerivativePipeline:
+    def __init__(self) -> None:
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # (store, file_name) con un trabajo encolado o en ejecución
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" evita heredar hilos y conexiones abiertas del servidor
+            self._executor = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def schedule(self, store: MediaStore, media: Iterable) -> None:
+        """
+        Encola la generación de derivados para las filas de media de imagen.
+        Debe llamarse después del commit de la subida. Los blobs que ya tienen
+        un trabajo en curso se omiten.
+        """
+        directory = store_dir(store)
+        file_names = sorted({item.file_name for item in media if item.media_type == "image"})
+        with self._lock:
+            file_names = [name for name in file_names if (store.value, name) not in self._in_flight]
+            self._in_flight.update((store.value, name) for name in file_names)
+        for file_name in file_names:
+            stem, _ = os.path.splitext(file_name)
+            try:
+                future = self._get_executor().submit(
+                    generate_variants, str(directory / file_name), str(directory), stem
+                )
+            except Exception:
+                with self._lock:
+                    self._in_flight.discard((store.value, file_name))
+                raise
+            future.add_done_callback(
+                lambda fut, name=file_name: self._save_variants(store, name, fut)
+            )
+
+    def _save_variants(self, store: MediaStore, source_file_name: str, future: Future) -> None:
+        try:
+            self._register_variants(store, source_file_name, future)
+        finally:
+            with self._lock:
+                self._in_flight.discard((store.value, source_file_name))
+
+    def _register_variants(self, store: MediaStore, source_file_name: str, future: Future) -> None:
+        if future.cancelled():
+            return
+        try:
+            variants = future.result()
+        except Exception:
+            logger.exception("No se pudieron generar derivados de %s/%s", store.value, source_file_name)
+            return
+
+        db = SessionLocal()
+        try:
+            existing = {
+                variant
+                for (variant,) in db.query(models.MediaVariant.variant).filter(
+                    models.MediaVariant.store == store.value,
+                    models.MediaVariant.source_file_name == source_file_name,
+                )
+            }
+            for data in variants:
+                if data["variant"] in existing:
+                    continue
+                db.add(
+                    models.MediaVariant(
+                        store=store.value,
+                        source_file_name=source_file_name,
+                        **data,
+                    )
+                )
+            _touch_owners(db, store, source_file_name)
+            db.commit()
+            if store == MediaStore.NEWS:
+                # El feed en caché se sirvió sin estos derivados
+                news_feed_cache.clear()
+        except Exception:
+            db.rollback()
+            logger.exception("No se pudieron registrar derivados de %s/%s", store.value, source_file_name)
+        finally:
+            db.close()
+
+
+derivative_pipeline = DerivativePipeline()
@@ -0,0 +1,135 @@
+# backend/app/media_files.py
+"""
+Servidor de archivos de media con caché HTTP.
+
+`MediaFiles` reemplaza a `StaticFiles` en los montajes de media:
+
+- ETag fuerte: para los blobs direccionados por contenido es el propio
+  SHA-256 del nombre; para archivos antiguos se deriva de mtime y tamaño.
+- `Cache-Control: immutable` (un año) para archivos cuyo nombre es un hash,
+  que nunca cambian de contenido; el resto se revalida con `no-cache`.
+- Respuestas 304 con If-None-Match / If-Modified-Since.
+- Rangos de bytes para video (buscar en el video sin bajarlo completo) y
+  envío zero-copy (`http.response.zerocopysend`) cuando el servidor ASGI lo
+  soporta; si no, se delega en `FileResponse`.
+"""
+import os
+import re
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# <sha256>.<ext> o <sha256>_<variante>.webp
+HASHED_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?P<suffix>_[a-z]+)?(\.[A-Za-z0-9]+)?$")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+_SINGLE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _single_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un Range de un solo tramo ("bytes=a-b", "bytes=a-", "bytes=-n").
+    Retorna (inicio, fin inclusivo) o None si no es un rango simple y válido.
+    """
+    match = _SINGLE_RANGE.match(range_header.strip())
+    if not match or size == 0:
+        return None
+    start_text, end_text = match.groups()
+    if not start_text:
+        if not end_text:
+            return None
+        length = min(int(end_text), size)
+        return (size - length, size - 1) if length else None
+    start = int(start_text)
+    end = min(int(end_text), size - 1) if end_text else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+class MediaFileResponse(FileResponse):
+    """
+    `FileResponse` que usa envío zero-copy cuando el servidor lo permite.
+    Los casos que no cubre (varios rangos, If-Range, HEAD) quedan en manos
+    de `FileResponse`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        if (
+            ZEROCOPY_EXTENSION not in scope.get("extensions", {})
+            or scope.get("method") == "HEAD"
+            or "if-range" in request_headers
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        size = self.stat_result.st_size
+        status_code = self.status_code
+        offset, count = 0, size
+        headers = self.headers
+
+        range_header = request_headers.get("range")
+        if range_header:
+            byte_range = _single_range(range_header, size)
+            if byte_range is None:
+                await super().__call__(scope, receive, send)
+                return
+            start, end = byte_range
+            offset, count = start, end - start + 1
+            status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            headers["content-length"] = str(count)
+
+        await send({"type": "http.response.start", "status": status_code, "headers": self.raw_headers})
+        with open(self.path, "rb") as file:
+            await send(
+                {
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": offset,
+                    "count": count,
+                    "more_body": False,
+                }
+            )
+
+
+class MediaFiles(StaticFiles):
+    def _cache_headers(self, full_path: str, stat_result: os.stat_result) -> dict:
+        match = HASHED_NAME.match(os.path.basename(full_path))
+        if match:
+            etag = f'"{match.group("digest")}{match.group("suffix") or ""}"'
+            cache_control = IMMUTABLE_CACHE
+        else:
+            etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+            cache_control = REVALIDATE_CACHE
+        return {
+            "etag": etag,
+            "cache-control": cache_control,
+            "accept-ranges": "bytes",
+        }
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+
+        response = MediaFileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers=self._cache_headers(str(full_path), stat_result),
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
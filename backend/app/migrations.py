@@ -0,0 +1,127 @@
+# backend/app/migrations.py
+"""
+Migraciones versionadas del esquema.
+
+`Base.metadata.create_all` crea las tablas (y sus índices) que no existen,
+pero no toca las que ya están en un `app.db` existente. Los cambios sobre
+tablas existentes se registran aquí como migraciones numeradas; la tabla
+`schema_version` guarda cuáles se aplicaron y `run_migrations` ejecuta las
+pendientes, en orden y cada una en su propia transacción.
+
+Las migraciones deben ser idempotentes (p. ej. `CREATE INDEX IF NOT
+EXISTS`), porque en una base nueva `create_all` ya creó lo que declaran
+los modelos.
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "schema_version"
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _execute(*statements: str) -> Callable[[Connection], None]:
+    def upgrade(conn: Connection) -> None:
+        for statement in statements:
+            conn.execute(text(statement))
+
+    return upgrade
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Índices compuestos para listados, relaciones y cola de correos",
+        _execute(
+            "CREATE INDEX IF NOT EXISTS ix_reports_status_created_at_id "
+            "ON reports (status, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_reports_created_at_id ON reports (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_report_media_report_id ON report_media (report_id)",
+            "CREATE INDEX IF NOT EXISTS ix_report_comments_report_id_created_at "
+            "ON report_comments (report_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_report_comment_media_comment_id "
+            "ON report_comment_media (comment_id)",
+            "CREATE INDEX IF NOT EXISTS ix_news_start_date_end_date ON news (start_date, end_date)",
+            "CREATE INDEX IF NOT EXISTS ix_news_created_at ON news (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_news_media_news_id ON news_media (news_id)",
+            "CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt_at "
+            "ON email_outbox (status, next_attempt_at)",
+        ),
+    ),
+    Migration(
+        2,
+        "Registro de cambios inicial con la creación de los reportes existentes",
+        _execute(
+            # Solo si el registro está vacío (tabla recién creada sobre una base existente)
+            "INSERT INTO report_changes (report_id, comment_id, change_type, status, changed_at) "
+            "SELECT id, NULL, 'CREADO', status, created_at FROM reports "
+            "WHERE NOT EXISTS (SELECT 1 FROM report_changes) "
+            "ORDER BY created_at, id",
+        ),
+    ),
+    Migration(
+        3,
+        "Índices de noticias que sí usan las consultas de vigencia",
+        _execute(
+            # El filtro de vigencia (OR ... IS NULL) no puede usar el índice compuesto
+            "DROP INDEX IF EXISTS ix_news_start_date_end_date",
+            "CREATE INDEX IF NOT EXISTS ix_news_start_date ON news (start_date)",
+            "CREATE INDEX IF NOT EXISTS ix_news_end_date ON news (end_date)",
+        ),
+    ),
+]
+
+
+def _applied_versions(conn: Connection) -> set:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        )
+    )
+    return {version for (version,) in conn.execute(text(f"SELECT version FROM {VERSION_TABLE}"))}
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Aplica las migraciones pendientes y retorna las versiones aplicadas.
+    """
+    with engine.begin() as conn:
+        applied = _applied_versions(conn)
+
+    done = []
+    for migration in sorted(MIGRATIONS, key=lambda item: item.version):
+        if migration.version in applied:
+            continue
+        try:
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(
+                    text(
+                        f"INSERT INTO {VERSION_TABLE} (version, description, applied_at) "
+                        "VALUES (:version, :description, :applied_at)"
+                    ),
+                    {
+                        "version": migration.version,
+                        "description": migration.description,
+                        "applied_at": datetime.utcnow(),
+                    },
+                )
+        except IntegrityError:
+            # Otro proceso del servidor la aplicó al mismo tiempo
+            continue
+        logger.info("Migración %s aplicada: %s", migration.version, migration.description)
+        done.append(migration.version)
+    return done
+
@@ -3,12 +3,16 @@ from datetime import datetime
 from enum import Enum
 from sqlalchemy import (
     Column,
+    Date,
     Integer,
+    LargeBinary,
     String,
     Float,
     DateTime,
     ForeignKey,
+    Index,
     Text,
+    UniqueConstraint,
     Enum as SQLEnum,
 )
 from sqlalchemy.orm import relationship
@@ -25,6 +29,11 @@ class ReportStatus(str, Enum):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        # Listados: filtro por estado + orden (created_at, id) con cursor
+        Index("ix_reports_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_reports_created_at_id", "created_at", "id"),
+    )
 
     # ID numérico (consecutivo)
     id = Column(Integer, primary_key=True, index=True)
@@ -55,6 +64,7 @@ class Report(Base):
 
 class ReportMedia(Base):
     __tablename__ = "report_media"
+    __table_args__ = (Index("ix_report_media_report_id", "report_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
@@ -69,10 +79,18 @@ class ReportMedia(Base):
     order = Column(Integer, nullable=False, default=1)
 
     report = relationship("Report", back_populates="media")
+    # Derivados (miniatura, mediana, webp) generados en segundo plano
+    variants = relationship(
+        "MediaVariant",
+        primaryjoin="and_(foreign(MediaVariant.source_file_name) == ReportMedia.file_name, "
+        "MediaVariant.store == 'media')",
+        viewonly=True,
+    )
 
 
 class ReportComment(Base):
     __tablename__ = "report_comments"
+    __table_args__ = (Index("ix_report_comments_report_id_created_at", "report_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
@@ -93,6 +111,7 @@ class ReportComment(Base):
 
 class ReportCommentMedia(Base):
     __tablename__ = "report_comment_media"
+    __table_args__ = (Index("ix_report_comment_media_comment_id", "comment_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     comment_id = Column(Integer, ForeignKey("report_comments.id", ondelete="CASCADE"), nullable=False)
@@ -102,6 +121,12 @@ class ReportCommentMedia(Base):
     order = Column(Integer, nullable=False, default=1)
 
     comment = relationship("ReportComment", back_populates="media")
+    variants = relationship(
+        "MediaVariant",
+        primaryjoin="and_(foreign(MediaVariant.source_file_name) == ReportCommentMedia.file_name, "
+        "MediaVariant.store == 'media_operator')",
+        viewonly=True,
+    )
 
 class EmailOTP(Base):
     """
@@ -158,8 +183,87 @@ class Visitor(Base):
     last_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class VisitorDailySketch(Base):
+    """
+    Registros HyperLogLog de los visitantes únicos de un día (UTC).
+    """
+    __tablename__ = "visitor_daily_sketches"
+
+    day = Column(Date, primary_key=True)
+    precision = Column(Integer, nullable=False)
+    registers = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ReportStatusDaily(Base):
+    """
+    Rollup: reportes que entraron a cada estado, por día (UTC).
+    """
+    __tablename__ = "report_status_daily"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+
+class ReportGridCount(Base):
+    """
+    Rollup: reportes por celda de la grilla y estado actual.
+    """
+    __tablename__ = "report_grid_counts"
+
+    cell_lat = Column(Integer, primary_key=True)
+    cell_lon = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+
+class ReportResolutionBucket(Base):
+    """
+    Rollup: histograma del tiempo entre la creación y la finalización.
+    """
+    __tablename__ = "report_resolution_buckets"
+
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    total_seconds = Column(Float, default=0, nullable=False)
+
+
+class ReportChangeType(str, Enum):
+    CREADO = "report_created"
+    COMENTARIO = "comment_added"
+    ESTADO = "status_changed"
+
+
+class ReportChange(Base):
+    """
+    Registro de cambios de reportes para la sincronización incremental
+    (`/api/reports/changes`). El id es creciente y nunca se reutiliza.
+    """
+    __tablename__ = "report_changes"
+    __table_args__ = ({"sqlite_autoincrement": True},)
+
+    id = Column(Integer, primary_key=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False, index=True)
+    comment_id = Column(Integer, ForeignKey("report_comments.id", ondelete="CASCADE"), nullable=True)
+    change_type = Column(SQLEnum(ReportChangeType), nullable=False)
+    # Estado del reporte después del cambio
+    status = Column(SQLEnum(ReportStatus), nullable=False)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    report = relationship("Report")
+    comment = relationship("ReportComment")
+
+
 class News(Base):
     __tablename__ = "news"
+    __table_args__ = (
+        # Orden del listado: el feed vigente recorre este índice y filtra la vigencia
+        Index("ix_news_created_at", "created_at"),
+        # Próximo límite de vigencia (MIN(start_date) / MIN(end_date) en `next_boundary`)
+        Index("ix_news_start_date", "start_date"),
+        Index("ix_news_end_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -174,6 +278,7 @@ class News(Base):
 
 class NewsMedia(Base):
     __tablename__ = "news_media"
+    __table_args__ = (Index("ix_news_media_news_id", "news_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     news_id = Column(Integer, ForeignKey("news.id", ondelete="CASCADE"), nullable=False)
@@ -182,3 +287,105 @@ class NewsMedia(Base):
     order = Column(Integer, nullable=False, default=1)
 
     news = relationship("News", back_populates="media")
+    variants = relationship(
+        "MediaVariant",
+        primaryjoin="and_(foreign(MediaVariant.source_file_name) == NewsMedia.file_name, "
+        "MediaVariant.store == 'media-news')",
+        viewonly=True,
+    )
+
+
+class MediaBlob(Base):
+    """
+    Archivo multimedia direccionado por contenido (SHA-256) dentro de una
+    carpeta de media (`store`). El `file_name` de ReportMedia,
+    ReportCommentMedia y NewsMedia apunta al `file_name` del blob, de modo que
+    los mismos bytes se guardan una sola vez; `ref_count` cuenta cuántas filas
+    de media lo usan.
+    """
+    __tablename__ = "media_blobs"
+    __table_args__ = (UniqueConstraint("store", "sha256", name="uq_media_blobs_store_sha256"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    store = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    file_name = Column(String, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class MediaVariant(Base):
+    """
+    Derivado de una imagen (miniatura, mediana o webp del original), guardado
+    en la misma carpeta de media que su archivo de origen.
+    """
+    __tablename__ = "media_variants"
+    __table_args__ = (
+        UniqueConstraint("store", "source_file_name", "variant", name="uq_media_variants_source"),
+    )
+
+    # Prefijo de URL con el que main.py sirve cada carpeta de media
+    URL_PREFIXES = {
+        "media": "/media",
+        "media_operator": "/media-operator",
+        "media-news": "/media-news",
+    }
+
+    id = Column(Integer, primary_key=True, index=True)
+    store = Column(String, nullable=False)
+    source_file_name = Column(String, nullable=False)
+    variant = Column(String, nullable=False)  # thumb / medium / webp
+    file_name = Column(String, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def url(self) -> str:
+        return f"{self.URL_PREFIXES[self.store]}/{self.file_name}"
+
+
+class EmailOutboxStatus(str, Enum):
+    PENDIENTE = "pendiente"
+    ENVIADO = "enviado"
+    FALLIDO = "fallido"
+    EXPIRADO = "expirado"
+
+
+class EmailOutbox(Base):
+    """
+    Cola persistente de correos salientes. Los endpoints solo insertan aquí
+    (en la misma transacción del cambio que notifican) y el worker de
+    `email_outbox.py` los envía en lotes con reintentos.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Lote del worker: pendientes cuyo próximo intento ya venció
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+
+    status = Column(
+        SQLEnum(EmailOutboxStatus),
+        default=EmailOutboxStatus.PENDIENTE,
+        nullable=False,
+        index=True,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    # Próximo intento (backoff) y vencimiento opcional (p. ej. OTP con TTL)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+
+    # Reclamo del mensaje por un worker (evita envíos duplicados entre procesos)
+    claimed_by = Column(String, nullable=True, index=True)
+    locked_until = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
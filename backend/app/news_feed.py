@@ -0,0 +1,90 @@
+# backend/app/news_feed.py
+"""
+Feed público de noticias vigentes.
+
+La vigencia (`start_date` / `end_date`) se filtra en SQL con
+`active_news_filter`. Las páginas del feed ya serializadas se guardan en
+`news_feed_cache` hasta el próximo límite de vigencia (la primera
+`start_date` o `end_date` futura), de modo que una noticia aparece o
+desaparece a tiempo sin consultar la base en cada petición. `create_news`
+y `update_news` vacían el caché; `NEWS_FEED_CACHE_SECONDS` acota cuánto
+puede tardar otro proceso del servidor en ver el cambio.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from . import models
+
+NEWS_FEED_CACHE_SECONDS = float(os.getenv("NEWS_FEED_CACHE_SECONDS", "60"))
+NEWS_FEED_CACHE_MAX_ENTRIES = 256
+
+
+def active_news_filter(now: datetime):
+    return and_(
+        or_(models.News.start_date.is_(None), models.News.start_date <= now),
+        or_(models.News.end_date.is_(None), models.News.end_date >= now),
+    )
+
+
+def next_boundary(db: Session, now: datetime) -> Optional[datetime]:
+    """
+    Próximo instante en que alguna noticia entra o sale de vigencia.
+    """
+    next_start = db.query(func.min(models.News.start_date)).filter(models.News.start_date > now).scalar()
+    next_end = db.query(func.min(models.News.end_date)).filter(models.News.end_date >= now).scalar()
+    if next_end is not None:
+        # Una noticia sigue vigente en su `end_date` y deja de estarlo justo después
+        next_end += timedelta(microseconds=1)
+    candidates = [value for value in (next_start, next_end) if value is not None]
+    return min(candidates) if candidates else None
+
+
+class NewsFeedCache:
+    def __init__(self, max_age_seconds: float = NEWS_FEED_CACHE_SECONDS) -> None:
+        self.max_age = timedelta(seconds=max_age_seconds)
+        self._entries: Dict[Hashable, Tuple[datetime, Any]] = {}
+        self._lock = threading.Lock()
+        # Aumenta con cada invalidación: una página calculada antes no se guarda
+        self.generation = 0
+
+    def get(self, key: Hashable, now: datetime) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, page = entry
+            if now >= expires_at:
+                del self._entries[key]
+                return None
+            return page
+
+    def put(
+        self,
+        key: Hashable,
+        page: Any,
+        now: datetime,
+        boundary: Optional[datetime],
+        generation: int,
+    ) -> None:
+        expires_at = now + self.max_age
+        if boundary is not None:
+            expires_at = min(expires_at, boundary)
+        with self._lock:
+            if generation != self.generation:
+                return
+            if len(self._entries) >= NEWS_FEED_CACHE_MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[key] = (expires_at, page)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+news_feed_cache = NewsFeedCache()
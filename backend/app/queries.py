@@ -0,0 +1,96 @@
+# backend/app/queries.py
+"""
+Queries base para los endpoints de reportes y noticias.
+
+Las relaciones de `models.py` son perezosas (lazy), así que serializar un
+`ReportOut` dispara un SELECT por la media de cada reporte, otro por sus
+comentarios y otro por la media de cada comentario. Aquí se definen las
+cadenas de `selectinload` según lo que serializa cada endpoint, para que la
+cantidad de SELECTs sea fija sin importar cuántos reportes se retornen.
+
+Cada cadena existe como `*_query(db)` (Session síncrona) y como `select_*()`
+(para `AsyncSession`, donde la carga perezosa no está permitida).
+"""
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Query, Session, selectinload
+
+from . import models
+
+
+def _report_detail_options():
+    return (
+        selectinload(models.Report.media).selectinload(models.ReportMedia.variants),
+        selectinload(models.Report.comments)
+        .selectinload(models.ReportComment.media)
+        .selectinload(models.ReportCommentMedia.variants),
+    )
+
+
+def _report_summary_options():
+    return (selectinload(models.Report.media).selectinload(models.ReportMedia.variants),)
+
+
+def _report_export_options():
+    # Sin derivados: la exportación solo lista los archivos originales
+    return (
+        selectinload(models.Report.media),
+        selectinload(models.Report.comments).selectinload(models.ReportComment.media),
+    )
+
+
+def _comment_options():
+    return (
+        selectinload(models.ReportComment.media).selectinload(models.ReportCommentMedia.variants),
+    )
+
+
+def _news_options():
+    return (selectinload(models.News.media).selectinload(models.NewsMedia.variants),)
+
+
+def report_detail_query(db: Session) -> Query:
+    """
+    Reportes con media, comentarios y media de comentarios (para `ReportOut`).
+    """
+    return db.query(models.Report).options(*_report_detail_options())
+
+
+def report_summary_query(db: Session) -> Query:
+    """
+    Reportes solo con su media (para `ReportSummaryOut`).
+    """
+    return db.query(models.Report).options(*_report_summary_options())
+
+
+def report_export_query(db: Session) -> Query:
+    """
+    Reportes con media y comentarios (con su media) para la exportación.
+    Compatible con `yield_per`: cada lote carga sus relaciones con SELECTs propios.
+    """
+    return db.query(models.Report).options(*_report_export_options())
+
+
+def comment_query(db: Session) -> Query:
+    """
+    Comentarios con su media (para `ReportCommentOut`).
+    """
+    return db.query(models.ReportComment).options(*_comment_options())
+
+
+def news_query(db: Session) -> Query:
+    """
+    Noticias con su media (para `NewsOut`).
+    """
+    return db.query(models.News).options(*_news_options())
+
+
+def select_report_detail() -> Select:
+    return select(models.Report).options(*_report_detail_options())
+
+
+def select_comment() -> Select:
+    return select(models.ReportComment).options(*_comment_options())
+
+
+def select_news() -> Select:
+    return select(models.News).options(*_news_options())
@@ -0,0 +1,209 @@
+# backend/app/realtime.py
+"""
+Eventos de reportes en tiempo real (Server-Sent Events).
+
+`create_report`, `add_comment` y `update_report_status` publican, después
+del commit, un evento pequeño (solo lo que cambió, no el `ReportOut`
+completo) en tres canales: el del reporte (`report:<public_id>`), el de su
+estado (`status:<estado>`) y el general (`reports`). Los clientes se
+suscriben con `EventSource` a `/api/reports/{public_id}/events` o a
+`/api/reports/events?status_filter=...`.
+
+El reparto lo hace un broker intercambiable: `InProcessBroker` entrega los
+eventos dentro del proceso (un solo worker, o pruebas locales) y
+`RedisBroker` usa el pub/sub de Redis para que los suscriptores de
+cualquier worker de uvicorn reciban los eventos publicados por los demás.
+Se usa Redis si se define `REALTIME_REDIS_URL` (requiere el paquete `redis`).
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+REALTIME_REDIS_URL = os.getenv("REALTIME_REDIS_URL")
+# Eventos pendientes por suscriptor; si un cliente lento lo llena se descartan los más viejos
+SUBSCRIBER_QUEUE_SIZE = 100
+# Comentario SSE periódico para que proxies y navegador no cierren la conexión
+HEARTBEAT_SECONDS = 15.0
+
+ALL_REPORTS_CHANNEL = "reports"
+
+
+def report_channel(public_id: str) -> str:
+    return f"report:{public_id}"
+
+
+def status_channel(status: models.ReportStatus) -> str:
+    return f"status:{status.value}"
+
+
+def _offer(pending: asyncio.Queue, message: str) -> None:
+    if pending.full():
+        pending.get_nowait()
+    pending.put_nowait(message)
+
+
+class InProcessBroker:
+    """
+    Reparte los mensajes entre los suscriptores del mismo proceso.
+    `publish` se puede llamar desde el event loop o desde el threadpool.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, pending in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, pending, message)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerró
+                continue
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(entry)
+        try:
+            while True:
+                yield await entry[1].get()
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisBroker:
+    """
+    Pub/sub de Redis compartido por todos los workers. Las publicaciones se
+    envían desde un hilo propio para no bloquear el event loop ni la
+    petición que las origina.
+    """
+
+    def __init__(self, url: str) -> None:
+        import redis
+        import redis.asyncio
+
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+        self._outgoing: "queue.SimpleQueue[Optional[Tuple[str, str]]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="realtime-redis", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._outgoing.get()
+            if item is None:
+                return
+            try:
+                self._client.publish(*item)
+            except Exception:
+                logger.exception("No se pudo publicar el evento en %s", item[0])
+
+    def publish(self, channel: str, message: str) -> None:
+        self._outgoing.put((channel, message))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                data = message["data"]
+                yield data.decode() if isinstance(data, bytes) else data
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        self._outgoing.put(None)
+        self._thread.join(timeout=5)
+        self._client.close()
+        await self._async_client.aclose()
+
+
+def _make_broker():
+    if REALTIME_REDIS_URL:
+        return RedisBroker(REALTIME_REDIS_URL)
+    return InProcessBroker()
+
+
+class ReportEvents:
+    def __init__(self, broker) -> None:
+        self.broker = broker
+
+    def publish(
+        self,
+        event_type: str,
+        report: models.Report,
+        data: dict,
+        old_status: Optional[models.ReportStatus] = None,
+    ) -> None:
+        """
+        Publica un evento del reporte. Debe llamarse después del commit.
+        """
+        message = json.dumps(
+            jsonable_encoder(
+                {
+                    "type": event_type,
+                    "public_id": report.public_id,
+                    "status": report.status,
+                    "at": datetime.utcnow(),
+                    "data": data,
+                }
+            )
+        )
+        channels = [report_channel(report.public_id), status_channel(report.status), ALL_REPORTS_CHANNEL]
+        if old_status is not None and old_status != report.status:
+            # Quien sigue el estado anterior se entera de que el reporte salió de él
+            channels.append(status_channel(old_status))
+        for channel in channels:
+            self.broker.publish(channel, message)
+
+    async def stream(self, channel: str) -> AsyncIterator[str]:
+        """
+        Mensajes del canal en formato SSE, con un comentario de latido cada
+        `HEARTBEAT_SECONDS`. Termina cuando el cliente se desconecta.
+        """
+        subscription = self.broker.subscribe(channel)
+        next_message = asyncio.ensure_future(subscription.__anext__())
+        # Deja que la suscripción se registre antes de confirmar la conexión
+        await asyncio.sleep(0)
+        try:
+            yield ": conectado\n\n"
+            while True:
+                done, _ = await asyncio.wait({next_message}, timeout=HEARTBEAT_SECONDS)
+                if not done:
+                    yield ": ping\n\n"
+                    continue
+                message = next_message.result()
+                event_type = json.loads(message)["type"]
+                yield f"event: {event_type}\ndata: {message}\n\n"
+                next_message = asyncio.ensure_future(subscription.__anext__())
+        finally:
+            next_message.cancel()
+            await asyncio.gather(next_message, return_exceptions=True)
+            await subscription.aclose()
+
+
+report_events = ReportEvents(_make_broker())
@@ -0,0 +1,178 @@
+# backend/app/report_export.py
+"""
+Exportación masiva de reportes con sus comentarios (NDJSON o CSV).
+
+Los reportes se leen con `yield_per` (cursor del servidor en PostgreSQL,
+lectura incremental en SQLite) y cada lote carga sus relaciones con
+SELECTs propios; las filas se serializan a texto a medida que llegan y se
+envían en bloques de `EXPORT_CHUNK_BYTES`. La memoria usada depende del
+tamaño del lote, no de la cantidad de reportes exportados.
+
+Los generadores abren su propia sesión porque se consumen después de que
+el endpoint retorna el `StreamingResponse`.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+from .queries import report_export_query
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+CSV_COLUMNS = [
+    "id",
+    "public_id",
+    "created_at",
+    "updated_at",
+    "status",
+    "latitude",
+    "longitude",
+    "description",
+    "citizen_email",
+    "media",
+    "comments_count",
+    "comments",
+]
+
+
+# Prefijos que una hoja de cálculo interpreta como fórmula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _iter_reports(
+    db: Session,
+    status: Optional[models.ReportStatus],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+) -> Iterator[models.Report]:
+    query = report_export_query(db)
+    if status:
+        query = query.filter(models.Report.status == status)
+    if created_from:
+        query = query.filter(models.Report.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Report.created_at < created_to)
+    return query.order_by(models.Report.created_at, models.Report.id).yield_per(EXPORT_BATCH_SIZE)
+
+
+def _report_record(report: models.Report) -> dict:
+    return {
+        "id": report.id,
+        "public_id": report.public_id,
+        "created_at": _iso(report.created_at),
+        "updated_at": _iso(report.updated_at),
+        "status": report.status.value,
+        "latitude": report.latitude,
+        "longitude": report.longitude,
+        "description": report.description,
+        "citizen_email": report.citizen_email,
+        "media": [media.file_name for media in sorted(report.media, key=lambda item: item.order)],
+        "comments": [
+            {
+                "author": comment.author,
+                "content": comment.content,
+                "created_at": _iso(comment.created_at),
+                "media": [media.file_name for media in comment.media],
+            }
+            for comment in sorted(report.comments, key=lambda item: (item.created_at, item.id))
+        ],
+    }
+
+
+def _ndjson_line(report: models.Report) -> str:
+    return json.dumps(_report_record(report), ensure_ascii=False) + "\n"
+
+
+def _csv_cell(value):
+    """
+    Neutraliza texto del ciudadano u operario que empieza como una fórmula
+    (`=`, `+`, `-`, `@`, tabulador o retorno de carro): se antepone `'` para
+    que la hoja de cálculo lo muestre como texto.
+    """
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_row(writer, buffer: io.StringIO, report: models.Report) -> str:
+    record = _report_record(report)
+    comments = record.pop("comments")
+    record["media"] = " ".join(record["media"])
+    record["comments_count"] = len(comments)
+    # Un comentario por línea dentro de la celda
+    record["comments"] = "\n".join(
+        f"{comment['created_at']} - {comment['author'] or 'Operario'}: {comment['content']}"
+        for comment in comments
+    )
+    writer.writerow([_csv_cell(record[column]) for column in CSV_COLUMNS])
+    row = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return row
+
+
+def export_reports(
+    export_format: ExportFormat,
+    status: Optional[models.ReportStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Iterator[bytes]:
+    """
+    Genera el archivo de exportación en bloques de bytes.
+    """
+    db = SessionLocal()
+    try:
+        pending = []
+        pending_size = 0
+
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(CSV_COLUMNS)
+            # BOM para que Excel abra el archivo como UTF-8
+            pending.append("\ufeff" + buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
+            def serialize(report: models.Report) -> str:
+                return _csv_row(writer, buffer, report)
+
+        else:
+            serialize = _ndjson_line
+
+        for report in _iter_reports(db, status, created_from, created_to):
+            line = serialize(report)
+            pending.append(line)
+            pending_size += len(line)
+            if pending_size >= EXPORT_CHUNK_BYTES:
+                yield "".join(pending).encode()
+                pending = []
+                pending_size = 0
+
+        if pending:
+            yield "".join(pending).encode()
+    finally:
+        db.close()
@@ -0,0 +1,345 @@
+# backend/app/report_rollups.py
+"""
+Rollups incrementales de reportes para los endpoints `/api/analytics/reports/*`.
+
+Se actualizan dentro de la misma transacción que crea el reporte o cambia
+su estado, así que los dashboards leen buckets precalculados en vez de
+recorrer la tabla `reports`:
+
+- `ReportStatusDaily`: reportes que entraron a cada estado, por día.
+- `ReportGridCount`: reportes por celda de `GRID_CELL_DEG` grados y estado actual.
+- `ReportResolutionBucket`: histograma logarítmico del tiempo de NUEVO a
+  FINALIZADO; la suma exacta de segundos permite calcular el promedio.
+
+`rebuild_rollups` los recalcula desde cero (p. ej. tras una importación
+masiva o para tablas creadas sobre una base existente).
+"""
+import math
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+# ~1.1 km de latitud por celda
+GRID_CELL_DEG = 0.01
+
+# Bucket 0: menos de un minuto; bucket i: [60·2^(i-1), 60·2^i) segundos.
+# El último bucket (~2 años en adelante) no tiene límite superior.
+RESOLUTION_BUCKETS = 21
+_FIRST_BUCKET_SECONDS = 60
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Contenido de los comentarios automáticos de `update_report_status`
+_STATUS_COMMENTS = {
+    "Se ha iniciado el procesamiento del reporte.": models.ReportStatus.EN_PROGRESO,
+    "El reporte ha sido reasignado a otro operario.": models.ReportStatus.REASIGNADO,
+    "El reporte ha sido finalizado.": models.ReportStatus.FINALIZADO,
+}
+
+
+def grid_cell(latitude: float, longitude: float) -> Tuple[int, int]:
+    return math.floor(latitude / GRID_CELL_DEG), math.floor(longitude / GRID_CELL_DEG)
+
+
+def resolution_bucket(seconds: float) -> int:
+    if seconds < _FIRST_BUCKET_SECONDS:
+        return 0
+    return min(int(math.log2(seconds / _FIRST_BUCKET_SECONDS)) + 1, RESOLUTION_BUCKETS - 1)
+
+
+def bucket_bounds(bucket: int) -> Tuple[float, Optional[float]]:
+    lower = 0.0 if bucket == 0 else float(_FIRST_BUCKET_SECONDS * 2 ** (bucket - 1))
+    upper = None if bucket == RESOLUTION_BUCKETS - 1 else float(_FIRST_BUCKET_SECONDS * 2**bucket)
+    return lower, upper
+
+
+def _increment(db: Session, model, keys: dict, deltas: dict) -> None:
+    """
+    Suma `deltas` a la fila identificada por `keys`, creándola si no existe.
+    """
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(model).values(**keys, **deltas)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={name: getattr(model, name) + stmt.excluded[name] for name in deltas},
+            )
+        )
+        return
+
+    filters = [getattr(model, name) == value for name, value in keys.items()]
+    result = db.execute(
+        update(model)
+        .where(*filters)
+        .values({name: getattr(model, name) + value for name, value in deltas.items()})
+    )
+    if result.rowcount == 0:
+        db.add(model(**keys, **deltas))
+        db.flush()
+
+
+def _increment_many(db: Session, model, key_names: List[str], rows: List[dict]) -> None:
+    """
+    Como `_increment`, para muchas filas: un solo upsert ejecutado en lote.
+    Cada fila trae las llaves (`key_names`) y los deltas de las demás columnas.
+    """
+    if not rows:
+        return
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            _increment(
+                db,
+                model,
+                {name: row[name] for name in key_names},
+                {name: value for name, value in row.items() if name not in key_names},
+            )
+        return
+
+    stmt = insert(model)
+    delta_names = [name for name in rows[0] if name not in key_names]
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=key_names,
+            set_={name: getattr(model, name) + stmt.excluded[name] for name in delta_names},
+        ),
+        rows,
+    )
+
+
+def _status_value(value) -> str:
+    return value.value if isinstance(value, models.ReportStatus) else str(value)
+
+
+def _count_status_day(db: Session, day: date, status, delta: int = 1) -> None:
+    _increment(db, models.ReportStatusDaily, {"day": day, "status": _status_value(status)}, {"count": delta})
+
+
+def _count_grid(db: Session, latitude: float, longitude: float, status, delta: int) -> None:
+    cell_lat, cell_lon = grid_cell(latitude, longitude)
+    _increment(
+        db,
+        models.ReportGridCount,
+        {"cell_lat": cell_lat, "cell_lon": cell_lon, "status": _status_value(status)},
+        {"count": delta},
+    )
+
+
+def _count_resolution(db: Session, seconds: float) -> None:
+    seconds = max(seconds, 0.0)
+    _increment(
+        db,
+        models.ReportResolutionBucket,
+        {"bucket": resolution_bucket(seconds)},
+        {"count": 1, "total_seconds": seconds},
+    )
+
+
+def record_report_created(db: Session, report: models.Report) -> None:
+    """
+    Registra un reporte nuevo. No hace commit.
+    """
+    created_at = report.created_at or datetime.utcnow()
+    status = report.status or models.ReportStatus.NUEVO
+    _count_status_day(db, created_at.date(), status)
+    _count_grid(db, report.latitude, report.longitude, status, 1)
+
+
+def record_status_change(
+    db: Session,
+    report: models.Report,
+    old_status: models.ReportStatus,
+    new_status: models.ReportStatus,
+    changed_at: Optional[datetime] = None,
+) -> None:
+    """
+    Registra un cambio de estado. No hace commit.
+    """
+    changed_at = changed_at or datetime.utcnow()
+    _count_status_day(db, changed_at.date(), new_status)
+    _count_grid(db, report.latitude, report.longitude, old_status, -1)
+    _count_grid(db, report.latitude, report.longitude, new_status, 1)
+    if new_status == models.ReportStatus.FINALIZADO:
+        _count_resolution(db, (changed_at - report.created_at).total_seconds())
+
+
+def record_imported_reports(db: Session, rows: Iterable[dict]) -> None:
+    """
+    Registra un lote de reportes insertados sin ORM (importación), sumando
+    por bucket en vez de por fila. Cada reporte entra como NUEVO en su
+    `created_at` y, si su estado es otro, pasa directo a él en `updated_at`.
+    No hace commit.
+    """
+    daily: Dict[Tuple[date, str], int] = {}
+    grid: Dict[Tuple[int, int, str], int] = {}
+    resolution: Dict[int, List[float]] = {}
+    for row in rows:
+        status = _status_value(row["status"])
+        key = (row["created_at"].date(), models.ReportStatus.NUEVO.value)
+        daily[key] = daily.get(key, 0) + 1
+        if status != models.ReportStatus.NUEVO.value:
+            key = (row["updated_at"].date(), status)
+            daily[key] = daily.get(key, 0) + 1
+        cell = (*grid_cell(row["latitude"], row["longitude"]), status)
+        grid[cell] = grid.get(cell, 0) + 1
+        if status == models.ReportStatus.FINALIZADO.value:
+            seconds = max((row["updated_at"] - row["created_at"]).total_seconds(), 0.0)
+            resolution.setdefault(resolution_bucket(seconds), []).append(seconds)
+
+    _increment_many(
+        db,
+        models.ReportStatusDaily,
+        ["day", "status"],
+        [{"day": day, "status": status, "count": count} for (day, status), count in daily.items()],
+    )
+    _increment_many(
+        db,
+        models.ReportGridCount,
+        ["cell_lat", "cell_lon", "status"],
+        [
+            {"cell_lat": cell_lat, "cell_lon": cell_lon, "status": status, "count": count}
+            for (cell_lat, cell_lon, status), count in grid.items()
+        ],
+    )
+    _increment_many(
+        db,
+        models.ReportResolutionBucket,
+        ["bucket"],
+        [
+            {"bucket": bucket, "count": len(values), "total_seconds": sum(values)}
+            for bucket, values in resolution.items()
+        ],
+    )
+
+
+def rebuild_rollups(db: Session) -> None:
+    """
+    Recalcula todos los rollups desde `reports` y sus comentarios de cambio
+    de estado. Las transiciones sin comentario reconocible (p. ej. de
+    REASIGNADO a EN_PROGRESO) no se pueden recuperar del histórico; el
+    estado actual de cada reporte sí queda exacto en la grilla.
+    """
+    db.query(models.ReportStatusDaily).delete()
+    db.query(models.ReportGridCount).delete()
+    db.query(models.ReportResolutionBucket).delete()
+
+    daily: Dict[Tuple[date, str], int] = {}
+    grid: Dict[Tuple[int, int, str], int] = {}
+    resolution: Dict[int, List[float]] = {}
+
+    reports = db.query(
+        models.Report.id,
+        models.Report.latitude,
+        models.Report.longitude,
+        models.Report.status,
+        models.Report.created_at,
+        models.Report.updated_at,
+    )
+    created = {}
+    for report_id, latitude, longitude, status, created_at, updated_at in reports.yield_per(1000):
+        created[report_id] = (created_at, updated_at, status)
+        key = (created_at.date(), models.ReportStatus.NUEVO.value)
+        daily[key] = daily.get(key, 0) + 1
+        key = (*grid_cell(latitude, longitude), _status_value(status))
+        grid[key] = grid.get(key, 0) + 1
+
+    finalized = {}
+    comments = db.query(
+        models.ReportComment.report_id,
+        models.ReportComment.content,
+        models.ReportComment.created_at,
+    ).filter(models.ReportComment.content.in_(list(_STATUS_COMMENTS)))
+    for report_id, content, created_at in comments.yield_per(1000):
+        status = _STATUS_COMMENTS[content]
+        key = (created_at.date(), status.value)
+        daily[key] = daily.get(key, 0) + 1
+        if status == models.ReportStatus.FINALIZADO:
+            finalized.setdefault(report_id, []).append(created_at)
+
+    for report_id, (created_at, updated_at, status) in created.items():
+        finished = finalized.get(report_id)
+        if not finished and status == models.ReportStatus.FINALIZADO:
+            finished = [updated_at]
+        for finished_at in finished or []:
+            seconds = max((finished_at - created_at).total_seconds(), 0.0)
+            resolution.setdefault(resolution_bucket(seconds), []).append(seconds)
+
+    db.bulk_insert_mappings(
+        models.ReportStatusDaily,
+        [{"day": day, "status": status, "count": count} for (day, status), count in daily.items()],
+    )
+    db.bulk_insert_mappings(
+        models.ReportGridCount,
+        [
+            {"cell_lat": cell_lat, "cell_lon": cell_lon, "status": status, "count": count}
+            for (cell_lat, cell_lon, status), count in grid.items()
+        ],
+    )
+    db.bulk_insert_mappings(
+        models.ReportResolutionBucket,
+        [
+            {"bucket": bucket, "count": len(values), "total_seconds": sum(values)}
+            for bucket, values in resolution.items()
+        ],
+    )
+    db.commit()
+
+
+def ensure_rollups(db: Session) -> None:
+    """
+    Construye los rollups si están vacíos pero ya hay reportes (tablas
+    recién creadas sobre una base existente).
+    """
+    if db.query(models.ReportGridCount).first() is None and db.query(models.Report).first() is not None:
+        rebuild_rollups(db)
+
+
+def resolution_stats(db: Session, percentiles=(50, 90, 95)) -> dict:
+    """
+    Promedio y percentiles (interpolados dentro de cada bucket) del tiempo
+    de resolución, en horas.
+    """
+    rows = (
+        db.query(models.ReportResolutionBucket)
+        .filter(models.ReportResolutionBucket.count > 0)
+        .order_by(models.ReportResolutionBucket.bucket)
+        .all()
+    )
+    total = sum(row.count for row in rows)
+    buckets = []
+    for row in rows:
+        lower, upper = bucket_bounds(row.bucket)
+        buckets.append({"min_seconds": lower, "max_seconds": upper, "count": row.count})
+
+    if not total:
+        return {"count": 0, "mean_hours": None, "percentiles_hours": {}, "buckets": buckets}
+
+    result = {}
+    for percentile in percentiles:
+        target = total * percentile / 100
+        seen = 0
+        for row in rows:
+            if seen + row.count >= target:
+                lower, upper = bucket_bounds(row.bucket)
+                if upper is None:
+                    # Bucket abierto: el promedio del bucket es la mejor estimación
+                    value = row.total_seconds / row.count
+                else:
+                    value = lower + (upper - lower) * (target - seen) / row.count
+                result[str(percentile)] = round(value / 3600, 2)
+                break
+            seen += row.count
+
+    mean_seconds = sum(row.total_seconds for row in rows) / total
+    return {
+        "count": total,
+        "mean_hours": round(mean_seconds / 3600, 2),
+        "percentiles_hours": result,
+        "buckets": buckets,
+    }
@@ -1,15 +1,27 @@
 # backend/app/schemas.py
 from datetime import datetime
 from pydantic import BaseModel, EmailStr,Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .models import ReportStatus
 
 
+class MediaVariantOut(BaseModel):
+    variant: str  # thumb / medium / webp
+    file_name: str
+    url: str
+    width: int
+    height: int
+
+    class Config:
+        orm_mode = True
+
+
 class ReportMediaOut(BaseModel):
     id: int
     file_name: str
     media_type: str
     order: int
+    variants: List[MediaVariantOut] = Field(default_factory=list)
 
     class Config:
         orm_mode = True
@@ -19,6 +31,7 @@ class ReportCommentMediaOut(BaseModel):
     file_name: str
     media_type: str
     order: int
+    variants: List[MediaVariantOut] = Field(default_factory=list)
 
     class Config:
         orm_mode = True
@@ -65,6 +78,75 @@ class ReportOut(BaseModel):
         orm_mode = True
 
 
+class ReportSummaryOut(BaseModel):
+    """
+    Versión liviana de ReportOut para listados: sin comentarios.
+    """
+    id: int
+    public_id: str
+    latitude: float
+    longitude: float
+    description: str
+    status: ReportStatus
+    created_at: datetime
+    updated_at: datetime
+
+    media: List[ReportMediaOut] = Field(default_factory=list)
+
+    class Config:
+        orm_mode = True
+
+
+class ReportPage(BaseModel):
+    items: List[ReportOut] = Field(default_factory=list)
+    # Cursor opaco para pedir la siguiente página (None si no hay más)
+    next_cursor: Optional[str] = None
+
+
+class ReportSummaryPage(BaseModel):
+    items: List[ReportSummaryOut] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class ReportChangeOut(BaseModel):
+    """
+    Delta del feed de cambios. La ubicación y descripción vienen solo en
+    `report_created` (no cambian después); `comment` en los demás tipos.
+    """
+    change_id: int
+    type: str
+    public_id: str
+    status: ReportStatus
+    changed_at: datetime
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    description: Optional[str] = None
+    comment: Optional[ReportCommentOut] = None
+
+
+class ReportChangePage(BaseModel):
+    items: List[ReportChangeOut] = Field(default_factory=list)
+    # Token para la siguiente consulta; se retorna aunque no haya cambios
+    next_token: str
+    has_more: bool = False
+
+
+class TileClusterOut(BaseModel):
+    latitude: float  # centroide
+    longitude: float
+    count: int
+    status_counts: Dict[str, int]
+    public_id: Optional[str] = None  # solo si el cluster tiene un único reporte
+
+
+class TileOut(BaseModel):
+    z: int
+    x: int
+    y: int
+    total: int
+    clusters: List[TileClusterOut] = Field(default_factory=list)
+
+
 class ReportStatusUpdate(BaseModel):
     status: ReportStatus
 
@@ -91,6 +173,7 @@ class NewsMediaOut(BaseModel):
     file_name: str
     media_type: str
     order: int
+    variants: List[MediaVariantOut] = Field(default_factory=list)
 
     class Config:
         orm_mode = True
@@ -108,3 +191,8 @@ class NewsOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class NewsPage(BaseModel):
+    items: List[NewsOut] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
@@ -0,0 +1,211 @@
+# backend/app/search.py
+"""
+Búsqueda de texto completo sobre reportes y comentarios.
+
+En SQLite se usa una tabla virtual FTS5 (`report_search`) con una fila por
+descripción de reporte y otra por cada comentario (incluidos los que crea
+`update_report_status`). Se alimenta con eventos `after_insert` de `Report` y
+`ReportComment`, así que cualquier endpoint que los cree la mantiene al día.
+El ranking de un reporte es el mejor `bm25` entre sus filas.
+
+En otros motores se recurre a `LIKE` sobre descripción y comentarios,
+ordenando por fecha.
+"""
+import re
+from itertools import islice
+from math import radians
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, Integer, column, event, inspect, or_, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from . import models
+from .spatial import bounding_box, haversine_km, reports_in_box
+
+SEARCH_TABLE = "report_search"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_CHUNK_SIZE = 500
+
+
+def _uses_fts(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Crea la tabla FTS5 si no existe y, en ese caso, indexa los reportes y
+    comentarios que ya estaban en la base.
+    """
+    if not _uses_fts(engine):
+        return
+
+    if inspect(engine).has_table(SEARCH_TABLE):
+        return
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                "content, report_id UNINDEXED, comment_id UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        )
+        conn.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE} (content, report_id, comment_id) "
+                "SELECT description, id, NULL FROM reports"
+            )
+        )
+        conn.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE} (content, report_id, comment_id) "
+                "SELECT content, report_id, id FROM report_comments WHERE content <> ''"
+            )
+        )
+
+
+def _index_text(connection: Connection, content: str, report_id: int, comment_id: Optional[int]) -> None:
+    if not content:
+        return
+    connection.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE} (content, report_id, comment_id) "
+            "VALUES (:content, :report_id, :comment_id)"
+        ),
+        {"content": content, "report_id": report_id, "comment_id": comment_id},
+    )
+
+
+def index_report_texts(connection: Connection, rows: Iterable[dict]) -> None:
+    """
+    Indexa descripciones de reportes insertados sin pasar por el ORM (p. ej.
+    `bulk_insert_mappings`). Cada fila necesita `id` y `description`.
+    """
+    params = [
+        {"content": row["description"], "report_id": row["id"], "comment_id": None}
+        for row in rows
+        if row["description"]
+    ]
+    if not params or not _uses_fts(connection):
+        return
+    connection.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE} (content, report_id, comment_id) "
+            "VALUES (:content, :report_id, :comment_id)"
+        ),
+        params,
+    )
+
+
+@event.listens_for(models.Report, "after_insert")
+def _report_inserted(mapper, connection: Connection, target: models.Report) -> None:
+    if _uses_fts(connection):
+        _index_text(connection, target.description, target.id, None)
+
+
+@event.listens_for(models.ReportComment, "after_insert")
+def _comment_inserted(mapper, connection: Connection, target: models.ReportComment) -> None:
+    if _uses_fts(connection):
+        _index_text(connection, target.content, target.report_id, target.id)
+
+
+@event.listens_for(models.Report, "after_delete")
+def _report_deleted(mapper, connection: Connection, target: models.Report) -> None:
+    if _uses_fts(connection):
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE report_id = :report_id"),
+            {"report_id": target.id},
+        )
+
+
+def fts_query(raw: str) -> Optional[str]:
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada palabra
+    entre comillas y como prefijo, todas requeridas.
+    """
+    tokens = _TOKEN.findall(raw)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_report_ids(
+    db: Session,
+    q: str,
+    status: Optional[models.ReportStatus] = None,
+    near: Optional[Tuple[float, float, float]] = None,
+    offset: int = 0,
+    limit: int = 50,
+) -> List[int]:
+    """
+    Ids de los reportes que coinciden con `q`, del más relevante al menos,
+    opcionalmente filtrados por estado y por radio (`near` = lat, lng, km).
+    Retorna hasta `limit` ids a partir de `offset`.
+    """
+    match = fts_query(q)
+    if match is None:
+        return []
+
+    box = bounding_box(*near) if near else None
+    query = reports_in_box(db, box) if box else db.query(models.Report)
+
+    if _uses_fts(db.get_bind()):
+        matches = (
+            text(
+                # `rank` es bm25() (menor = más relevante); bm25() no se puede
+                # llamar directamente dentro de un agregado
+                f"SELECT report_id, min(rank) AS score FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH :match GROUP BY report_id"
+            )
+            .bindparams(match=match)
+            .columns(column("report_id", Integer), column("score", Float))
+            .subquery("matches")
+        )
+        query = query.join(matches, models.Report.id == matches.c.report_id).order_by(
+            matches.c.score, models.Report.id
+        )
+    else:
+        patterns = [f"%{token}%" for token in _TOKEN.findall(q)]
+        for pattern in patterns:
+            query = query.filter(
+                or_(
+                    models.Report.description.ilike(pattern),
+                    models.Report.comments.any(models.ReportComment.content.ilike(pattern)),
+                )
+            )
+        query = query.order_by(models.Report.created_at.desc(), models.Report.id.desc())
+
+    if status:
+        query = query.filter(models.Report.status == status)
+
+    if not near:
+        return [report_id for (report_id,) in query.with_entities(models.Report.id).offset(offset).limit(limit)]
+
+    # Con radio: la caja ya filtró en SQL; aquí se descartan las esquinas
+    lat, lng, radius_km = near
+    rows = iter(
+        query.with_entities(models.Report.id, models.Report.latitude, models.Report.longitude).yield_per(
+            _CHUNK_SIZE
+        )
+    )
+    ids: List[int] = []
+    skipped = 0
+    while len(ids) < limit:
+        chunk = list(islice(rows, _CHUNK_SIZE))
+        if not chunk:
+            break
+        data = np.array([(row_lat, row_lon) for _, row_lat, row_lon in chunk], dtype=np.float64)
+        distances = haversine_km(radians(lat), radians(lng), np.radians(data[:, 0]), np.radians(data[:, 1]))
+        for (report_id, _, _), distance in zip(chunk, distances):
+            if distance > radius_km:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            ids.append(report_id)
+            if len(ids) == limit:
+                break
+    return ids
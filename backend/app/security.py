@@ -1,5 +1,10 @@
 # backend/app/security.py
-from datetime import datetime
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
 from uuid import uuid4
 
 from fastapi import Depends, HTTPException, Header, status
@@ -15,6 +20,93 @@ pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 SESSION_TTL_MINUTES = 60 * 8  # 8 horas
 
 
+# Caché en memoria de sesiones válidas (por proceso)
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "1024"))
+
+
+@dataclass(frozen=True)
+class SessionUser:
+    """
+    Foto inmutable del usuario autenticado, independiente de la sesión de BD.
+    """
+    id: int
+    name: str
+    username: str
+    session_token: str
+    session_expires_at: datetime
+
+    @classmethod
+    def from_model(cls, user: models.SystemUser) -> "SessionUser":
+        return cls(
+            id=user.id,
+            name=user.name,
+            username=user.username,
+            session_token=user.session_token,
+            session_expires_at=user.session_expires_at,
+        )
+
+
+class SessionCache:
+    """
+    Caché LRU con TTL de sesiones, indexada por session_token.
+
+    Una entrada vive como máximo SESSION_CACHE_TTL_SECONDS (o hasta que vence
+    la sesión, lo que ocurra primero). `auth.login` invalida el token anterior
+    al rotarlo; en despliegues con varios procesos, un token rotado en otro
+    proceso puede seguir aceptándose aquí hasta que venza su TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self._max_entries = max_entries
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[SessionUser]:
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                user, cached_until = entry
+                if cached_until > now and user.session_expires_at > now:
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return user
+                del self._entries[token]
+            self.misses += 1
+            return None
+
+    def put(self, user: SessionUser) -> None:
+        cached_until = min(datetime.utcnow() + self._ttl, user.session_expires_at)
+        with self._lock:
+            self._entries[user.session_token] = (user, cached_until)
+            self._entries.move_to_end(user.session_token)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: Optional[str]) -> None:
+        if not token:
+            return
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": int(self._ttl.total_seconds()),
+            }
+
+
+session_cache = SessionCache(SESSION_CACHE_MAX_ENTRIES, SESSION_CACHE_TTL_SECONDS)
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -30,10 +122,12 @@ def create_session_token() -> str:
 def get_current_user(
     db: Session = Depends(get_db),
     authorization: str = Header(None, alias="Authorization"),
-) -> models.SystemUser:
+) -> SessionUser:
     """
     Lee el header Authorization: Bearer <session_token>
     y devuelve el usuario si la sesión es válida.
+    Las sesiones válidas se guardan en `session_cache` para no consultar la BD
+    en cada petición.
     """
     if not authorization:
         raise HTTPException(
@@ -48,6 +142,10 @@ def get_current_user(
             detail="Formato de Authorization inválido. Use: Bearer <token>",
         )
 
+    cached = session_cache.get(token)
+    if cached:
+        return cached
+
     user = (
         db.query(models.SystemUser)
         .filter(models.SystemUser.session_token == token)
@@ -67,4 +165,6 @@ def get_current_user(
             detail="Sesión expirada",
         )
 
-    return user
+    snapshot = SessionUser.from_model(user)
+    session_cache.put(snapshot)
+    return snapshot
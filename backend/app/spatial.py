@@ -0,0 +1,186 @@
+# backend/app/spatial.py
+"""
+Índice espacial para las consultas geográficas de reportes.
+
+En SQLite se usa una tabla virtual R*Tree (`reports_rtree`) con una caja
+degenerada (min = max) por reporte. La tabla se mantiene al insertar un
+`Report` y permite resolver en SQL el prefiltro por caja envolvente, de modo
+que solo los candidatos dentro de la caja pasan al cálculo exacto de Haversine.
+En otros motores se filtra directamente por `latitude`/`longitude`.
+
+`reports_within_radius` calcula Haversine sobre los candidatos en una sola
+pasada de NumPy (arreglos float64) y, con límite, elige los k más cercanos
+con `argpartition`. No se guarda estado en memoria: el costo depende de los
+reportes dentro de la caja, no del total.
+"""
+from math import cos, degrees, radians
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from sqlalchemy import Integer, column, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query, Session
+
+from . import models
+
+EARTH_RADIUS_KM = 6371.0
+
+RTREE_TABLE = "reports_rtree"
+
+
+class BoundingBox(NamedTuple):
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> BoundingBox:
+    """
+    Caja envolvente (en grados) que contiene el círculo de `radius_km` alrededor
+    del punto. Es conservadora: puede incluir puntos fuera del radio, nunca excluye
+    puntos dentro de él.
+    """
+    d_lat = degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(lat - d_lat, -90.0)
+    max_lat = min(lat + d_lat, 90.0)
+
+    # El ancho en longitud crece con la latitud: se usa la más alejada del ecuador
+    cos_lat = cos(radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-9:
+        return BoundingBox(min_lat, max_lat, -180.0, 180.0)
+
+    d_lon = d_lat / cos_lat
+    min_lon = lng - d_lon
+    max_lon = lng + d_lon
+    if min_lon < -180.0 or max_lon > 180.0:
+        # La caja cruza el antimeridiano: se toma todo el rango de longitudes
+        return BoundingBox(min_lat, max_lat, -180.0, 180.0)
+
+    return BoundingBox(min_lat, max_lat, min_lon, max_lon)
+
+
+def _uses_rtree(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_spatial_index(engine: Engine) -> None:
+    """
+    Crea la tabla R*Tree si no existe y agrega los reportes que aún no estén
+    indexados (p. ej. los creados antes de que existiera el índice).
+    """
+    if not _uses_rtree(engine):
+        return
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} "
+                "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+            )
+        )
+        conn.execute(
+            text(
+                f"INSERT INTO {RTREE_TABLE} (id, min_lat, max_lat, min_lon, max_lon) "
+                "SELECT id, latitude, latitude, longitude, longitude FROM reports "
+                f"WHERE id NOT IN (SELECT id FROM {RTREE_TABLE})"
+            )
+        )
+
+
+def _index_report(connection: Connection, report: models.Report) -> None:
+    index_report_points(
+        connection, [{"id": report.id, "latitude": report.latitude, "longitude": report.longitude}]
+    )
+
+
+def index_report_points(connection: Connection, rows: Iterable[dict]) -> None:
+    """
+    Indexa reportes insertados sin pasar por el ORM (p. ej. `bulk_insert_mappings`,
+    que no dispara `after_insert`). Cada fila necesita `id`, `latitude` y `longitude`.
+    """
+    params = [{"id": row["id"], "lat": row["latitude"], "lon": row["longitude"]} for row in rows]
+    if not params or not _uses_rtree(connection):
+        return
+    connection.execute(
+        text(
+            f"INSERT OR REPLACE INTO {RTREE_TABLE} (id, min_lat, max_lat, min_lon, max_lon) "
+            "VALUES (:id, :lat, :lat, :lon, :lon)"
+        ),
+        params,
+    )
+
+
+@event.listens_for(models.Report, "after_insert")
+def _report_inserted(mapper, connection: Connection, target: models.Report) -> None:
+    if _uses_rtree(connection):
+        _index_report(connection, target)
+
+
+def reports_in_box(db: Session, box: BoundingBox) -> Query:
+    """
+    Query de reportes cuya ubicación cae dentro de la caja (prefiltro en SQL).
+    """
+    query = db.query(models.Report)
+
+    if _uses_rtree(db.get_bind()):
+        candidate_ids = text(
+            f"SELECT id FROM {RTREE_TABLE} "
+            "WHERE max_lat >= :min_lat AND min_lat <= :max_lat "
+            "AND max_lon >= :min_lon AND min_lon <= :max_lon"
+        ).bindparams(**box._asdict()).columns(column("id", Integer))
+        return query.filter(models.Report.id.in_(candidate_ids))
+
+    return query.filter(
+        models.Report.latitude.between(box.min_lat, box.max_lat),
+        models.Report.longitude.between(box.min_lon, box.max_lon),
+    )
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Distancia Haversine (km) desde un punto a un arreglo de puntos.
+    Todas las coordenadas en radianes.
+    """
+    d_lat = lats - lat
+    d_lon = lons - lng
+    a = np.sin(d_lat / 2.0) ** 2 + np.cos(lat) * np.cos(lats) * np.sin(d_lon / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def reports_within_radius(
+    db: Session,
+    lat: float,
+    lng: float,
+    radius_km: float,
+    limit: Optional[int] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Retorna `(report_id, distancia_km)` de los reportes dentro del radio, del
+    más cercano al más lejano. Los candidatos salen del prefiltro por caja en
+    SQL (`reports_in_box`); Haversine se calcula sobre ellos en una sola pasada
+    de NumPy y, con `limit`, solo se ordenan los k más cercanos.
+    """
+    rows = (
+        reports_in_box(db, bounding_box(lat, lng, radius_km))
+        .with_entities(models.Report.id, models.Report.latitude, models.Report.longitude)
+        .all()
+    )
+    if not rows:
+        return []
+
+    data = np.array(rows, dtype=np.float64)
+    ids = data[:, 0].astype(np.int64)
+    distances = haversine_km(radians(lat), radians(lng), np.radians(data[:, 1]), np.radians(data[:, 2]))
+    inside = distances <= radius_km
+    ids = ids[inside]
+    distances = distances[inside]
+
+    if limit is not None and len(distances) > limit:
+        top = np.argpartition(distances, limit - 1)[:limit]
+        ids = ids[top]
+        distances = distances[top]
+
+    order = np.argsort(distances, kind="stable")
+    return list(zip(ids[order].tolist(), distances[order].tolist()))
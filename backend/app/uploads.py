@@ -0,0 +1,156 @@
+# backend/app/uploads.py
+"""
+Guardado de archivos subidos (reportes, evidencias de operarios y noticias).
+
+Hay dos topes de tamaño:
+
+- `UploadSizeLimitMiddleware` limita el cuerpo completo de cada petición
+  (MAX_REQUEST_MB) mientras se recibe: rechaza con 413 por `Content-Length`
+  antes de leer nada y, si no viene, corta al superar el tope. Es necesario
+  porque Starlette vuelca todo el multipart a temporales antes de que el
+  endpoint vea el primer archivo.
+- `receive_upload` limita cada archivo (MAX_UPLOAD_MB) al copiarlo desde
+  ese temporal.
+
+El archivo se copia por bloques de `CHUNK_SIZE`. Las escrituras y el hash
+SHA-256 corren en el threadpool para no bloquear el event loop, y el archivo
+se escribe primero en un temporal que luego se renombra (ver
+`blob_store.py`), de modo que nunca queda a medias con el nombre definitivo.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "100"))
+MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+# Cuerpo completo de una petición (varios archivos + campos del formulario)
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_MB", str(4 * MAX_UPLOAD_MB))) * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ReceivedUpload:
+    tmp_path: Path
+    media_type: str
+    extension: str
+    size: int
+    sha256: str
+
+
+def file_extension(upload: UploadFile) -> str:
+    _, ext = os.path.splitext(upload.filename or "")
+    return ext or ""
+
+
+def media_type_for(upload: UploadFile) -> str:
+    if upload.content_type and upload.content_type.startswith("video/"):
+        return "video"
+    return "image"
+
+
+def _write_chunk(buffer: BinaryIO, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+def _finish(buffer: BinaryIO) -> None:
+    buffer.flush()
+    os.fsync(buffer.fileno())
+    buffer.close()
+
+
+def _discard(buffer: BinaryIO, tmp_path: Path) -> None:
+    buffer.close()
+    tmp_path.unlink(missing_ok=True)
+
+
+def _request_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"La petición supera el tamaño máximo de {MAX_REQUEST_BYTES // (1024 * 1024)} MB.",
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Limita el cuerpo de las peticiones a MAX_REQUEST_BYTES mientras se recibe.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+            error = _request_too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > MAX_REQUEST_BYTES:
+                    # FastAPI propaga la HTTPException del parseo del cuerpo como 413
+                    raise _request_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def receive_upload(upload: UploadFile, dest_dir: Path) -> ReceivedUpload:
+    """
+    Copia `upload` a un archivo temporal dentro de `dest_dir` y retorna su ruta,
+    tamaño y hash. Lanza 413 si el archivo supera MAX_UPLOAD_BYTES (sin dejar
+    rastro en disco). Quien llama decide el nombre final con `os.replace`.
+    """
+    tmp_path = dest_dir / f".upload_{uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    size = 0
+
+    buffer = await run_in_threadpool(tmp_path.open, "wb")
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=(
+                        f"El archivo '{upload.filename}' supera el tamaño máximo "
+                        f"de {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+                    ),
+                )
+            await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+
+        await run_in_threadpool(_finish, buffer)
+    except BaseException:
+        await run_in_threadpool(_discard, buffer, tmp_path)
+        raise
+
+    return ReceivedUpload(
+        tmp_path=tmp_path,
+        media_type=media_type_for(upload),
+        extension=file_extension(upload).lower(),
+        size=size,
+        sha256=hasher.hexdigest(),
+    )
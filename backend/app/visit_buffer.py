@@ -0,0 +1,272 @@
+# backend/app/visit_buffer.py
+"""
+Buffer de escritura para los pings de visitantes (`/api/analytics/visits`).
+
+Cada visita solo actualiza `Visitor.last_seen_at`, así que en vez de hacer
+SELECT + INSERT/UPDATE + commit por petición, las visitas se acumulan en
+memoria (primera y última vez vista por `device_token`) y se escriben en
+lote con un upsert cada `VISIT_FLUSH_SECONDS` o al juntar
+`VISIT_FLUSH_MAX_EVENTS` tokens distintos. Al apagar el servidor se hace
+un último flush.
+
+`is_new` se responde con el conjunto de tokens conocidos, que se carga de
+la tabla `visitors` la primera vez que se usa.
+
+El total de visitantes es un contador en memoria: parte de un COUNT,
+suma uno por cada token nuevo y se reconcilia con la tabla cada
+`VISIT_RECONCILE_SECONDS` (por si otro proceso insertó visitantes).
+Además, cada día UTC tiene un sketch HyperLogLog (persistido en
+`visitor_daily_sketches`) para contar visitantes únicos por día, semana
+o mes sin recorrer la tabla.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+from .hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = float(os.getenv("VISIT_FLUSH_SECONDS", "10"))
+FLUSH_MAX_EVENTS = int(os.getenv("VISIT_FLUSH_MAX_EVENTS", "500"))
+RECONCILE_SECONDS = float(os.getenv("VISIT_RECONCILE_SECONDS", "300"))
+
+# ventana -> cantidad de días (terminando hoy) que se unen
+WINDOW_DAYS = {"day": 1, "week": 7, "month": 30}
+SKETCH_RETENTION_DAYS = max(WINDOW_DAYS.values())
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class VisitBuffer:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # token -> (first_seen_at, last_seen_at) pendientes de escribir
+        self._pending: Dict[str, Tuple[datetime, datetime]] = {}
+        # tokens de `_pending` que aún no existen en la tabla
+        self._pending_new: Set[str] = set()
+        self._known: Optional[Set[str]] = None
+        self._total = 0
+        self._last_reconcile = time.monotonic()
+        # día UTC -> sketch de visitantes únicos; `_dirty_days` falta persistir
+        self._sketches: Dict[date, HyperLogLog] = {}
+        self._dirty_days: Set[date] = set()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- ciclo de vida ----
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="visit-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(FLUSH_SECONDS)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self._last_reconcile >= RECONCILE_SECONDS:
+                    self.reconcile()
+            except Exception:
+                logger.exception("Error escribiendo el buffer de visitas")
+
+    # ---- registro ----
+
+    def _ensure_loaded(self) -> None:
+        # Se llama con `_lock` tomado
+        if self._known is not None:
+            return
+        since = datetime.utcnow().date() - timedelta(days=SKETCH_RETENTION_DAYS - 1)
+        db = SessionLocal()
+        try:
+            self._known = {token for (token,) in db.query(models.Visitor.device_token)}
+            self._total = len(self._known)
+            for row in db.query(models.VisitorDailySketch).filter(
+                models.VisitorDailySketch.day >= since
+            ):
+                self._sketches[row.day] = HyperLogLog(row.precision, row.registers)
+        finally:
+            db.close()
+
+    def record(self, token: str, now: Optional[datetime] = None) -> bool:
+        """
+        Registra una visita y retorna True si el token no se había visto antes.
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            self._ensure_loaded()
+
+            is_new = token not in self._known
+            if is_new:
+                self._known.add(token)
+                self._pending_new.add(token)
+                self._total += 1
+
+            day = now.date()
+            if day not in self._sketches:
+                self._sketches[day] = HyperLogLog()
+            self._sketches[day].add(token)
+            self._dirty_days.add(day)
+
+            first_seen = self._pending[token][0] if token in self._pending else now
+            self._pending[token] = (first_seen, now)
+            full = len(self._pending) >= FLUSH_MAX_EVENTS
+
+        if full:
+            self._wakeup.set()
+        return is_new
+
+    # ---- conteos ----
+
+    def total_count(self) -> int:
+        """
+        Total de visitantes (contador mantenido, sin COUNT por petición).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._total
+
+    def unique_count(self, window: str, today: Optional[date] = None) -> int:
+        """
+        Visitantes únicos aproximados de la ventana (`day`, `week` o `month`).
+        """
+        today = today or datetime.utcnow().date()
+        days = [today - timedelta(days=offset) for offset in range(WINDOW_DAYS[window])]
+        with self._lock:
+            self._ensure_loaded()
+            sketches = [self._sketches[day] for day in days if day in self._sketches]
+            merged = HyperLogLog.union(sketches)
+        return merged.count()
+
+    def reconcile(self) -> None:
+        """
+        Ajusta el contador con la tabla y descarta los sketches vencidos.
+        """
+        db = SessionLocal()
+        try:
+            stored = db.query(func.count(models.Visitor.id)).scalar()
+        finally:
+            db.close()
+
+        oldest = datetime.utcnow().date() - timedelta(days=SKETCH_RETENTION_DAYS - 1)
+        with self._lock:
+            self._total = stored + len(self._pending_new)
+            for day in [day for day in self._sketches if day < oldest]:
+                if day not in self._dirty_days:
+                    del self._sketches[day]
+            self._last_reconcile = time.monotonic()
+
+    # ---- escritura ----
+
+    def flush(self) -> int:
+        """
+        Escribe las visitas pendientes en un solo lote. Retorna cuántos
+        tokens escribió; si falla, las visitas vuelven al buffer.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            new_tokens, self._pending_new = self._pending_new, set()
+            sketches = {
+                day: HyperLogLog(self._sketches[day].precision, self._sketches[day].to_bytes())
+                for day in self._dirty_days
+            }
+            self._dirty_days = set()
+        if not batch and not sketches:
+            return 0
+
+        db = SessionLocal()
+        try:
+            if batch:
+                self._write(db, batch)
+            self._write_sketches(db, sketches)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for token, (first_seen, last_seen) in batch.items():
+                    if token in self._pending:
+                        last_seen = max(last_seen, self._pending[token][1])
+                    self._pending[token] = (first_seen, last_seen)
+                self._pending_new |= new_tokens
+                self._dirty_days |= set(sketches)
+            raise
+        finally:
+            db.close()
+
+        # Incorporar lo que otros procesos hayan registrado en los mismos días
+        with self._lock:
+            for day, sketch in sketches.items():
+                if day in self._sketches:
+                    self._sketches[day].merge(sketch)
+        return len(batch)
+
+    def _write(self, db: Session, batch: Dict[str, Tuple[datetime, datetime]]) -> None:
+        insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        if insert is None:
+            self._write_fallback(db, batch)
+            return
+
+        rows = [
+            {"device_token": token, "first_seen_at": first_seen, "last_seen_at": last_seen}
+            for token, (first_seen, last_seen) in batch.items()
+        ]
+        stmt = insert(models.Visitor)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[models.Visitor.device_token],
+                set_={"last_seen_at": stmt.excluded.last_seen_at},
+            ),
+            rows,
+        )
+
+    def _write_sketches(self, db: Session, sketches: Dict[date, HyperLogLog]) -> None:
+        for day, sketch in sketches.items():
+            row = db.get(models.VisitorDailySketch, day)
+            if row is None:
+                row = models.VisitorDailySketch(day=day, precision=sketch.precision)
+                db.add(row)
+            elif row.precision == sketch.precision:
+                sketch.merge(HyperLogLog(row.precision, row.registers))
+            row.registers = sketch.to_bytes()
+            row.updated_at = datetime.utcnow()
+
+    def _write_fallback(self, db: Session, batch: Dict[str, Tuple[datetime, datetime]]) -> None:
+        # Motores sin upsert: un UPDATE por token y INSERT de los que no existían
+        for token, (first_seen, last_seen) in batch.items():
+            result = db.execute(
+                update(models.Visitor)
+                .where(models.Visitor.device_token == token)
+                .values(last_seen_at=last_seen)
+            )
+            if result.rowcount == 0:
+                db.add(
+                    models.Visitor(
+                        device_token=token,
+                        first_seen_at=first_seen,
+                        last_seen_at=last_seen,
+                    )
+                )
+
+
+visit_buffer = VisitBuffer()
@@ -0,0 +1,238 @@
+# backend/benchmarks/__init__.py
+"""
+Benchmarks de la API. Se corren desde `backend/`:
+
+    python -m benchmarks.upload_concurrency
+
+Cada benchmark usa una base SQLite nueva en un directorio temporal (o la de
+BENCH_DATABASE_URL, p. ej. un PostgreSQL de pruebas) y una carpeta de media
+temporal, así que no toca `app.db` ni las carpetas de media de la app. Por
+eso este módulo fija DATABASE_URL antes de importar `app`.
+
+Los resultados se imprimen como tabla; los números de referencia quedan en
+los mensajes de commit que introducen cada benchmark.
+"""
+import atexit
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="tic-bench-"))
+MEDIA_DIR = BENCH_DIR / "media"
+MEDIA_DIR.mkdir()
+atexit.register(shutil.rmtree, BENCH_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{BENCH_DIR / 'bench.db'}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+# Centro de las coordenadas sintéticas (Pereira)
+CENTER = (4.8133, -75.6961)
+SEED_CHUNK = 20_000
+# Código de los OTP sembrados con `seed_otps`
+BENCH_OTP = "123456"
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    p50 / p95 / máximo en milisegundos de una lista de duraciones en segundos.
+    """
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max": ordered[-1] * 1000,
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[object]]) -> None:
+    cells = [[f"{value:,.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[idx]) for row in cells)) for idx, header in enumerate(headers)]
+    print("  ".join(str(header).rjust(width) for header, width in zip(headers, widths)))
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def synthetic_points(count: int, spread_deg: float, seed: int = 7):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    lats = CENTER[0] + rng.uniform(-spread_deg, spread_deg, count)
+    lons = CENTER[1] + rng.uniform(-spread_deg, spread_deg, count)
+    return lats, lons
+
+
+def seed_reports(
+    total: int,
+    spread_deg: float = 5.0,
+    comments_per_report: int = 0,
+    words: Sequence[str] = ("hueco", "luminaria", "basura", "semáforo", "andén", "alcantarilla"),
+) -> None:
+    """
+    Agrega `total` reportes sintéticos (con sus filas en el R*Tree y en FTS5)
+    usando inserts por lotes. Los ids se asignan aquí para no depender de
+    `RETURNING`.
+    """
+    from sqlalchemy import func, insert
+
+    from app import models
+    from app.db import SessionLocal
+    from app.search import SEARCH_TABLE, index_report_texts
+    from app.spatial import index_report_points
+
+    lats, lons = synthetic_points(total, spread_deg)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        first_id = (db.query(func.max(models.Report.id)).scalar() or 0) + 1
+        first_comment = (db.query(func.max(models.ReportComment.id)).scalar() or 0) + 1
+        for start in range(0, total, SEED_CHUNK):
+            reports = [
+                {
+                    "id": first_id + idx,
+                    "public_id": f"bench-{first_id + idx}",
+                    "citizen_email": "bench@example.com",
+                    "latitude": float(lats[idx]),
+                    "longitude": float(lons[idx]),
+                    "description": f"Reporte {idx} de {words[idx % len(words)]}",
+                    "status": models.ReportStatus.NUEVO,
+                    "created_at": now - timedelta(seconds=total - idx),
+                    "updated_at": now - timedelta(seconds=total - idx),
+                }
+                for idx in range(start, min(start + SEED_CHUNK, total))
+            ]
+            db.execute(insert(models.Report), reports)
+            connection = db.connection()
+            index_report_points(connection, reports)
+            index_report_texts(connection, reports)
+
+            if comments_per_report:
+                comments = [
+                    {
+                        "id": first_comment + (report["id"] - first_id) * comments_per_report + offset,
+                        "report_id": report["id"],
+                        "author": "operario",
+                        "content": f"Seguimiento {offset} {words[(report['id'] + offset) % len(words)]} cuadrilla",
+                        "created_at": now,
+                    }
+                    for report in reports
+                    for offset in range(comments_per_report)
+                ]
+                db.execute(insert(models.ReportComment), comments)
+                if connection.dialect.name == "sqlite":
+                    connection.exec_driver_sql(
+                        f"INSERT INTO {SEARCH_TABLE} (content, report_id, comment_id) "
+                        "SELECT content, report_id, id FROM report_comments WHERE id >= ?",
+                        (comments[0]["id"],),
+                    )
+            db.commit()
+
+
+def seed_otps(count: int, database_url: Optional[str] = None, prefix: str = "ciudadano") -> List[str]:
+    """
+    Crea `count` códigos OTP vigentes (`BENCH_OTP`, uno por correo) en la base
+    indicada (por defecto la del benchmark) y retorna los correos. Cada
+    `POST /api/reports/` consume uno.
+    """
+    from sqlalchemy import create_engine, insert
+
+    from app import models
+
+    now = datetime.utcnow()
+    emails = [f"{prefix}-{idx}-{now.timestamp():.0f}@example.com" for idx in range(count)]
+    engine = create_engine(database_url or os.environ["DATABASE_URL"])
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(models.EmailOTP),
+                [
+                    {"email": email, "otp_code": BENCH_OTP, "expires_at": now + timedelta(hours=1)}
+                    for email in emails
+                ],
+            )
+    finally:
+        engine.dispose()
+    return emails
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(extra_env: Dict[str, str] = None) -> Iterator[str]:
+    """
+    Levanta la app con uvicorn en otro proceso (`benchmarks.server`) sobre la
+    misma base y retorna su URL base.
+    """
+    port = _free_port()
+    env = {
+        **os.environ,
+        # El proceso hijo vuelve a importar este módulo: que use la misma base
+        "BENCH_DATABASE_URL": os.environ["DATABASE_URL"],
+        "BENCH_MEDIA_DIR": str(MEDIA_DIR),
+        **(extra_env or {}),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.server", str(port)],
+        cwd=Path(__file__).resolve().parents[1],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("El servidor del benchmark no arrancó")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def create_operator(username: str = "bench", password: str = "bench") -> None:
+    from app import models
+    from app.db import SessionLocal
+    from app.security import hash_password
+
+    with SessionLocal() as db:
+        if not db.query(models.SystemUser).filter(models.SystemUser.username == username).first():
+            db.add(models.SystemUser(name="Benchmark", username=username, password_hash=hash_password(password)))
+            db.commit()
+
+
+def login(client, url: str, username: str = "bench", password: str = "bench") -> Dict[str, str]:
+    response = client.post(f"{url}/api/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def schema_ready() -> None:
+    """
+    Crea el esquema, el R*Tree y la tabla FTS5 de la base del benchmark.
+    """
+    import app.main  # noqa: F401
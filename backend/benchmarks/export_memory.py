@@ -0,0 +1,120 @@
+# backend/benchmarks/export_memory.py
+"""
+Memoria del servidor mientras `GET /api/reports/export` transmite todos los
+reportes (NDJSON y CSV), a medida que la base crece hasta 1M de reportes con
+un comentario cada uno.
+
+El servidor corre en otro proceso (uvicorn); durante cada exportación se leen
+RssAnon y RssFile de `/proc/<pid>/status` cada pocos milisegundos. RssAnon es
+la memoria del proceso: si la exportación está acotada, su pico queda igual
+con 10 mil que con 1M de filas. RssFile crece con las páginas de la base que
+SQLite lee con mmap (hasta SQLITE_MMAP_SIZE) y el sistema puede liberarlas.
+Solo Linux.
+
+    python -m benchmarks.export_memory [--reports 10000 100000 1000000]
+"""
+import argparse
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+from . import create_operator, login, print_table, running_server, schema_ready, seed_reports
+
+SAMPLE_SECONDS = 0.02
+
+
+def server_pid(url: str) -> int:
+    """
+    Pid del proceso `benchmarks.server` que escucha en el puerto de `url`.
+    """
+    port = str(urlparse(url).port)
+    for proc in Path("/proc").iterdir():
+        try:
+            args = (proc / "cmdline").read_bytes().split(b"\0")
+        except OSError:
+            continue
+        if b"benchmarks.server" in args and port.encode() in args:
+            return int(proc.name)
+    raise RuntimeError("No se encontró el proceso del servidor")
+
+
+def rss_mb(pid: int) -> dict:
+    """
+    RssAnon (memoria propia del proceso) y RssFile (páginas de archivos
+    mapeados, como la base con `mmap_size`) en MB.
+    """
+    fields = {}
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        name, _, value = line.partition(":")
+        if name in ("RssAnon", "RssFile"):
+            fields[name] = int(value.split()[0]) / 1024
+    return fields
+
+
+def export(client: httpx.Client, url: str, headers: dict, pid: int, export_format: str) -> tuple:
+    """
+    Descarga la exportación completa. Retorna (MB recibidos, segundos, RSS
+    antes y picos durante la descarga de RssAnon y RssFile en MB).
+    """
+    before = rss_mb(pid)["RssAnon"]
+    peak = {"RssAnon": before, "RssFile": 0.0}
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.is_set():
+            for name, value in rss_mb(pid).items():
+                peak[name] = max(peak[name], value)
+            time.sleep(SAMPLE_SECONDS)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    received = 0
+    start = time.perf_counter()
+    try:
+        with client.stream(
+            "GET", f"{url}/api/reports/export", params={"format": export_format}, headers=headers
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                received += len(chunk)
+    finally:
+        done.set()
+        sampler.join()
+    return received / 1024 / 1024, time.perf_counter() - start, before, peak["RssAnon"], peak["RssFile"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv"])
+    args = parser.parse_args()
+
+    schema_ready()
+    create_operator()
+    rows = []
+    seeded = 0
+    with running_server() as url, httpx.Client(timeout=None) as client:
+        pid = server_pid(url)
+        headers = login(client, url)
+        for total in sorted(args.reports):
+            start = time.perf_counter()
+            seed_reports(total - seeded, comments_per_report=1)
+            seeded = total
+            print(f"{total:,} reportes en {time.perf_counter() - start:.1f} s", flush=True)
+            for export_format in args.formats:
+                size, elapsed, before, anon, mapped = export(client, url, headers, pid, export_format)
+                rows.append((total, export_format, size, elapsed, total / elapsed, before, anon, mapped))
+                print(f"{total:,} {export_format}: pico RssAnon {anon:.1f} MB", flush=True)
+
+    print("GET /api/reports/export, RSS del servidor")
+    print_table(
+        ("reportes", "formato", "MB enviados", "s", "reportes/s", "anon antes MB", "anon pico MB", "archivo pico MB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# backend/benchmarks/nearby.py
+"""
+Latencia de `GET /api/reports/nearby` a medida que crece la tabla, contra el
+recorrido completo original (`db.query(Report).all()` + Haversine escalar
+por fila).
+
+Alrededor del centro hay siempre los mismos reportes (`--local`, dentro de
+1 km); el resto se reparte en ±5° (unos 1.100 km), así que el número de
+resultados se mantiene casi fijo y solo cambia el tamaño de la tabla.
+
+    python -m benchmarks.nearby [--sizes 10000 100000 1000000]
+"""
+import argparse
+import math
+import time
+
+from . import CENTER, print_table, schema_ready, seed_reports, time_calls
+
+RADIUS_KM = 1.0
+
+
+def full_scan(db, lat: float, lng: float, radius_km: float) -> list:
+    """
+    Versión anterior a user-001: carga todos los reportes y calcula
+    Haversine con `math` fila por fila.
+    """
+    from app import models
+
+    def distance(lat2: float, lon2: float) -> float:
+        d_lat = math.radians(lat2 - lat)
+        d_lon = math.radians(lon2 - lng)
+        a = (
+            math.sin(d_lat / 2) ** 2
+            + math.cos(math.radians(lat)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2
+        )
+        return 6371.0 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return [
+        report for report in db.query(models.Report).all() if distance(report.latitude, report.longitude) <= radius_km
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--local", type=int, default=200, help="Reportes a menos de 1 km del centro")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--scan-repeat", type=int, default=3, help="Repeticiones del recorrido completo")
+    args = parser.parse_args()
+
+    schema_ready()
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.main import app
+    from app.spatial import reports_within_radius
+
+    client = TestClient(app)
+    params = {"lat": CENTER[0], "lng": CENTER[1], "radius_km": RADIUS_KM}
+
+    seed_reports(args.local, spread_deg=0.005)
+    seeded = args.local
+    rows = []
+    for size in sorted(args.sizes):
+        start = time.perf_counter()
+        seed_reports(size - seeded, spread_deg=5.0)
+        seeded = size
+        print(f"{size:,} reportes sembrados en {time.perf_counter() - start:.1f} s", flush=True)
+
+        results = len(client.get("/api/reports/nearby", params=params).json())
+        endpoint = time_calls(lambda: client.get("/api/reports/nearby", params=params).raise_for_status(), args.repeat)
+        with SessionLocal() as db:
+            candidates = time_calls(lambda: reports_within_radius(db, CENTER[0], CENTER[1], RADIUS_KM), args.repeat)
+            scan = time_calls(lambda: full_scan(db, CENTER[0], CENTER[1], RADIUS_KM), args.scan_repeat, warmup=0)
+        rows.append((size, results, candidates["p50"], endpoint["p50"], endpoint["p95"], scan["p50"]))
+
+    print(f"nearby, radio {RADIUS_KM:g} km (p50/p95 en ms)")
+    print_table(
+        ("reportes", "resultados", "R*Tree+NumPy p50", "endpoint p50", "endpoint p95", "recorrido completo p50"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# backend/benchmarks/report_submissions.py
+"""
+Reportes creados por segundo con N ciudadanos enviando `POST /api/reports/`
+a la vez, sin archivos y con varios videos cada uno, más las sentencias SQL y
+los commits que cuesta un envío.
+
+Cada envío consume su propio OTP (sembrado con `seed_otps`) y sube archivos
+de contenido distinto, así que ninguno se deduplica.
+
+    python -m benchmarks.report_submissions [--concurrency 1 4 16] [--files 0 3]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+from sqlalchemy import event
+
+from . import BENCH_OTP, CENTER, MEDIA_DIR, percentiles, print_table, running_server, schema_ready, seed_otps
+
+FILE_KB = 256
+
+
+def report_form(email: str, idx: int) -> dict:
+    return {
+        "latitude": CENTER[0],
+        "longitude": CENTER[1],
+        "description": f"Reporte concurrente {idx}",
+        "email": email,
+        "otp_code": BENCH_OTP,
+    }
+
+
+def videos(count: int) -> list:
+    return [("files", (f"video{idx}.mp4", os.urandom(FILE_KB * 1024), "video/mp4")) for idx in range(count)]
+
+
+async def _submit_all(url: str, emails, files: int, concurrency: int):
+    samples, errors = [], []
+    pending = iter(enumerate(emails))
+
+    async def citizen(client: httpx.AsyncClient):
+        for idx, email in pending:
+            payload = videos(files)
+            start = time.perf_counter()
+            response = await client.post(f"{url}/api/reports/", data=report_form(email, idx), files=payload)
+            samples.append(time.perf_counter() - start)
+            if response.status_code != 201:
+                errors.append(response.status_code)
+
+    async with httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=concurrency)) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(citizen(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return len(emails) / elapsed, percentiles(samples), len(errors)
+
+
+def statements_per_submission(files: int) -> tuple:
+    """
+    Sentencias y commits de un envío, medidos en proceso con TestClient.
+    """
+    from fastapi.testclient import TestClient
+
+    from app import blob_store
+    from app.db import async_engine
+    from app.main import app
+
+    blob_store.BASE_DIR = MEDIA_DIR
+    statements, commits = [], []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def record_commit(conn):
+        commits.append(1)
+
+    (email,) = seed_otps(1, prefix=f"conteo-{files}")
+    target = async_engine.sync_engine
+    event.listen(target, "before_cursor_execute", record_statement)
+    event.listen(target, "commit", record_commit)
+    try:
+        response = TestClient(app).post("/api/reports/", data=report_form(email, 0), files=videos(files))
+        response.raise_for_status()
+    finally:
+        event.remove(target, "before_cursor_execute", record_statement)
+        event.remove(target, "commit", record_commit)
+    return len(statements), len(commits)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--files", type=int, nargs="+", default=[0, 3])
+    parser.add_argument("--submissions", type=int, default=300, help="Envíos por fila")
+    args = parser.parse_args()
+
+    schema_ready()
+    rows = []
+    with running_server() as url:
+        for files in args.files:
+            for concurrency in args.concurrency:
+                emails = seed_otps(args.submissions, prefix=f"c{concurrency}-f{files}")
+                rate, stats, errors = asyncio.run(_submit_all(url, emails, files, concurrency))
+                rows.append((files, concurrency, rate, stats["p50"], stats["p95"], errors))
+                print(f"{files} archivos x{concurrency}: {rate:,.0f} reportes/s", flush=True)
+
+    print(f"POST /api/reports/, {args.submissions} envíos por fila, archivos de {FILE_KB} KB")
+    print_table(("archivos", "ciudadanos", "reportes/s", "p50 ms", "p95 ms", "errores"), rows)
+
+    print("Costo de un envío")
+    print_table(
+        ("archivos", "sentencias", "commits"),
+        [(files, *statements_per_submission(files)) for files in args.files],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# backend/benchmarks/search.py
+"""
+Latencia de `GET /api/reports/search` con FTS5 a medida que crece el número
+de comentarios, contra el respaldo con `LIKE` que usa `search_report_ids`
+en motores sin FTS5 (descripción y comentarios con `ilike`, por fecha).
+
+Cada reporte tiene `--comments-per-report` comentarios; todos contienen
+"cuadrilla" y las palabras de descripciones y comentarios rotan entre seis
+términos, así que hay consultas con muchas coincidencias, con pocas
+("99993", el número de una descripción) y sin resultados tras filtrar por
+estado.
+
+    python -m benchmarks.search [--comments 100000 1000000]
+"""
+import argparse
+import time
+from unittest import mock
+
+from . import CENTER, print_table, schema_ready, seed_reports, time_calls
+
+QUERIES = [
+    ("alcantarilla", {}),
+    ("cuadrilla", {}),
+    ("99993", {}),
+    ("hueco", {"status_filter": "finalizado"}),
+    ("luminaria", {"lat": CENTER[0], "lng": CENTER[1], "radius_km": 1}),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--comments-per-report", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--like-repeat", type=int, default=3, help="Repeticiones del respaldo con LIKE")
+    args = parser.parse_args()
+
+    schema_ready()
+    from fastapi.testclient import TestClient
+
+    from app import models, search
+    from app.db import SessionLocal
+    from app.main import app
+
+    client = TestClient(app)
+    rows = []
+    seeded = 0
+    for comments in sorted(args.comments):
+        reports = comments // args.comments_per_report
+        start = time.perf_counter()
+        seed_reports(reports - seeded, spread_deg=0.05, comments_per_report=args.comments_per_report)
+        seeded = reports
+        print(f"{reports:,} reportes / {comments:,} comentarios en {time.perf_counter() - start:.1f} s", flush=True)
+
+        for q, filters in QUERIES:
+            params = {"q": q, **filters}
+            results = len(client.get("/api/reports/search", params=params).json()["items"])
+            fts = time_calls(lambda: client.get("/api/reports/search", params=params).raise_for_status(), args.repeat)
+
+            status = models.ReportStatus(filters["status_filter"]) if "status_filter" in filters else None
+            near = (filters["lat"], filters["lng"], filters["radius_km"]) if "lat" in filters else None
+            with SessionLocal() as db, mock.patch.object(search, "_uses_fts", return_value=False):
+                like = time_calls(
+                    lambda: search.search_report_ids(db, q, status=status, near=near, limit=21),
+                    args.like_repeat,
+                    warmup=1,
+                )
+            label = q + "".join(f" {key}={value}" for key, value in filters.items() if key != "lng")
+            rows.append((comments, label, results, fts["p50"], fts["p95"], like["p50"]))
+
+    print("search, primera página (p50/p95 en ms)")
+    print_table(("comentarios", "consulta", "resultados", "FTS5 p50", "FTS5 p95", "LIKE p50"), rows)
+
+
+if __name__ == "__main__":
+    main()
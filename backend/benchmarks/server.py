@@ -0,0 +1,22 @@
+# backend/benchmarks/server.py
+"""
+Servidor uvicorn para los benchmarks HTTP (lo lanza `running_server`).
+Usa la base de DATABASE_URL y guarda la media en BENCH_MEDIA_DIR.
+"""
+import os
+import sys
+from pathlib import Path
+
+import uvicorn
+
+from app import blob_store
+from app.main import app
+
+
+def main() -> None:
+    blob_store.BASE_DIR = Path(os.environ["BENCH_MEDIA_DIR"])
+    uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/benchmarks/upload_concurrency.py
+"""
+Latencia de `GET /api/reports/nearby` mientras otros clientes suben videos
+de 50 MB en paralelo (POST /api/news/). Si las subidas bloquearan el event
+loop, la latencia de nearby crecería con el número de subidas.
+
+    python -m benchmarks.upload_concurrency [--reports 10000] [--uploads 0 2 4 8]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from . import (
+    CENTER,
+    create_operator,
+    login,
+    percentiles,
+    print_table,
+    running_server,
+    schema_ready,
+    seed_reports,
+)
+
+UPLOAD_MB = 50
+
+
+async def _upload_loop(client: httpx.AsyncClient, url: str, headers, payload: bytes, stop: asyncio.Event, done):
+    while not stop.is_set():
+        response = await client.post(
+            f"{url}/api/news/",
+            data={"title": "Video de prueba"},
+            files=[("files", ("video.mp4", payload, "video/mp4"))],
+            headers=headers,
+        )
+        response.raise_for_status()
+        done.append(1)
+
+
+async def _measure(url: str, headers, uploads: int, payload: bytes, probes: int):
+    params = {"lat": CENTER[0], "lng": CENTER[1], "radius_km": 2}
+    async with httpx.AsyncClient(timeout=None) as client:
+        for _ in range(3):
+            (await client.get(f"{url}/api/reports/nearby", params=params)).raise_for_status()
+        stop = asyncio.Event()
+        done = []
+        workers = [
+            asyncio.create_task(_upload_loop(client, url, headers, payload, stop, done)) for _ in range(uploads)
+        ]
+        # Deja que las subidas alcancen a empezar a transmitir
+        await asyncio.sleep(0.5 if uploads else 0)
+        samples = []
+        for _ in range(probes):
+            start = time.perf_counter()
+            response = await client.get(f"{url}/api/reports/nearby", params=params)
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+        stop.set()
+        await asyncio.gather(*workers)
+    return percentiles(samples), len(done)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=10_000)
+    parser.add_argument("--uploads", type=int, nargs="+", default=[0, 2, 4, 8])
+    parser.add_argument("--probes", type=int, default=50)
+    args = parser.parse_args()
+
+    schema_ready()
+    seed_reports(args.reports, spread_deg=0.2)
+    create_operator()
+    payload = b"\0" * (UPLOAD_MB * 1024 * 1024)
+
+    rows = []
+    with running_server() as url:
+        headers = login(httpx, url)
+        for uploads in args.uploads:
+            stats, completed = asyncio.run(_measure(url, headers, uploads, payload, args.probes))
+            rows.append((uploads, completed, stats["p50"], stats["p95"], stats["max"]))
+
+    print(f"nearby (radio 2 km, {args.reports:,} reportes) con subidas de {UPLOAD_MB} MB en paralelo")
+    print_table(("subidas", "completadas", "p50 ms", "p95 ms", "max ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+# backend/import_reports.py
+"""
+Importación masiva de reportes históricos desde CSV o NDJSON.
+
+    python import_reports.py reportes.csv --media-dir /ruta/a/imagenes
+
+Columnas (CSV) o claves (NDJSON):
+
+- latitude, longitude, description: obligatorias.
+- status: nuevo / en_progreso / reasignado / finalizado (por defecto nuevo).
+- created_at, updated_at: ISO 8601 (por defecto, ahora y created_at).
+- citizen_email, public_id: opcionales.
+- media: rutas relativas a --media-dir; en CSV separadas por ";", en NDJSON una lista.
+
+El archivo se lee en streaming y se procesa en lotes: se validan las filas,
+los archivos se copian al almacén de media (nombre por contenido, como
+`blob_store.py`) en procesos en paralelo, y los reportes y su media se
+insertan con `bulk_insert_mappings` en una transacción por lote. Como la
+inserción en lote no dispara los eventos del ORM, el mismo lote actualiza
+explícitamente el índice espacial, la búsqueda, los rollups y el registro
+de cambios.
+
+Después de cada lote se guarda un checkpoint (`<archivo>.checkpoint.json`);
+al volver a ejecutar se continúa desde ahí. El `public_id` por defecto se
+deriva del archivo y el número de fila, así que las filas de un lote que
+alcanzó a confirmarse sin checkpoint no se duplican. Las filas inválidas
+se escriben en `<archivo>.rechazados.ndjson`, incluidas las que repiten un
+`public_id` del mismo lote o uno que ya existe en la base con otros datos.
+
+Los reportes importados aparecen de inmediato en las búsquedas por radio
+(el lote actualiza el R*Tree), y en los tiles al vencer
+`TILE_CACHE_TTL_SECONDS`. No se generan derivados de las imágenes.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mimetypes
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parent  # backend/
+load_dotenv(BASE_DIR / ".env")
+
+from app import models
+from app.blob_store import MediaStore, store_dir
+from app.change_feed import record_imported_reports as record_imported_changes
+from app.db import Base, SessionLocal, engine
+from app.migrations import run_migrations
+from app.report_rollups import ensure_rollups, record_imported_reports as record_imported_rollups
+from app.search import ensure_search_index, index_report_texts
+from app.spatial import ensure_spatial_index, index_report_points
+
+DEFAULT_BATCH_SIZE = 1000
+COPY_CHUNK_SIZE = 1024 * 1024
+# Espacio de nombres de los public_id derivados del archivo y la fila
+IMPORT_NAMESPACE = uuid.UUID("8f0d5e0c-3b5f-4c1e-9a53-2f4c1d7e6a90")
+
+Row = Tuple[int, dict]
+
+
+def copy_media(src: str, dest_dir: str) -> Tuple[str, str, int, bool]:
+    """
+    Copia un archivo al almacén con nombre `<sha256><ext>` y retorna
+    (file_name, sha256, tamaño, creado). `creado` es False si ese contenido
+    ya estaba en el almacén. Corre en los procesos del pool.
+    """
+    tmp_path = Path(dest_dir) / f".import_{uuid.uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(src, "rb") as source, open(tmp_path, "wb") as target:
+            for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                target.write(chunk)
+                size += len(chunk)
+        sha256 = hasher.hexdigest()
+        file_name = f"{sha256}{os.path.splitext(src)[1]}"
+        final_path = Path(dest_dir) / file_name
+        if final_path.exists():
+            # Mismo contenido ya guardado: se reutiliza el archivo
+            tmp_path.unlink()
+            return file_name, sha256, size, False
+        os.replace(tmp_path, final_path)
+        return file_name, sha256, size, True
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def media_type_for_path(path: str) -> str:
+    guessed, _ = mimetypes.guess_type(path)
+    return "video" if guessed and guessed.startswith("video/") else "image"
+
+
+# ---- Lectura y validación ----
+
+def read_rows(path: Path, file_format: str) -> Iterator[Row]:
+    """
+    Filas del archivo con su número (desde 1), sin cargarlo completo.
+    """
+    with path.open(newline="", encoding="utf-8-sig") as source:
+        if file_format == "csv":
+            for number, raw in enumerate(csv.DictReader(source), start=1):
+                yield number, raw
+            return
+        number = 0
+        for line in source:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                raw = json.loads(line)
+            except ValueError as exc:
+                raw = {"__error__": f"JSON inválido: {exc}"}
+            yield number, raw if isinstance(raw, dict) else {"__error__": "La línea no es un objeto JSON"}
+
+
+def _batches(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    batch: List[Row] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _parse_datetime(value, default: datetime) -> datetime:
+    if value in (None, ""):
+        return default
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        # La BD guarda UTC sin zona horaria
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _media_paths(value) -> List[str]:
+    if value in (None, ""):
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [item.strip() for item in str(value).split(";") if item.strip()]
+
+
+def _text(raw: dict, key: str) -> str:
+    """
+    Valor de texto de la fila. En NDJSON puede venir como número (se
+    convierte); un objeto o lista no es válido.
+    """
+    value = raw.get(key)
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"El campo {key} debe ser texto")
+    return str(value).strip()
+
+
+def validate_row(number: int, raw: dict, source_id: str, now: datetime) -> dict:
+    """
+    Convierte una fila del archivo en los campos del reporte. Lanza
+    ValueError con el motivo si la fila no es válida.
+    """
+    if "__error__" in raw:
+        raise ValueError(raw["__error__"])
+
+    latitude = float(raw.get("latitude"))
+    longitude = float(raw.get("longitude"))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Coordenadas fuera de rango")
+
+    description = _text(raw, "description")
+    if not description:
+        raise ValueError("Falta la descripción")
+
+    status_value = _text(raw, "status").lower() or models.ReportStatus.NUEVO.value
+    status = models.ReportStatus(status_value)
+
+    created_at = _parse_datetime(raw.get("created_at"), now)
+    updated_at = _parse_datetime(raw.get("updated_at"), created_at)
+    email = _text(raw, "citizen_email").lower() or None
+    public_id = _text(raw, "public_id") or uuid.uuid5(
+        IMPORT_NAMESPACE, f"{source_id}:{number}"
+    ).hex
+
+    return {
+        "public_id": public_id,
+        "citizen_email": email,
+        "latitude": latitude,
+        "longitude": longitude,
+        "description": description,
+        "status": status,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "media": _media_paths(raw.get("media")),
+    }
+
+
+# ---- Checkpoint ----
+
+def load_checkpoint(path: Path, source: Path) -> int:
+    if not path.exists():
+        return 0
+    data = json.loads(path.read_text())
+    if data.get("source") != str(source.resolve()):
+        sys.exit(f"El checkpoint {path} es de otro archivo ({data.get('source')}). Usa --restart.")
+    return int(data["rows"])
+
+
+def save_checkpoint(path: Path, source: Path, rows: int) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"source": str(source.resolve()), "rows": rows}))
+    os.replace(tmp_path, path)
+
+
+# ---- Importación por lote ----
+
+class BatchResult:
+    def __init__(self) -> None:
+        self.imported = 0
+        self.skipped = 0
+        self.rejected: List[dict] = []
+
+
+def _copy_batch_media(pool: Executor, media_paths: List[List[str]]) -> Dict[str, Tuple[str, str, int, bool]]:
+    """
+    Copia (en paralelo) cada archivo distinto del lote. Retorna ruta -> blob;
+    los archivos que fallaron quedan fuera y la fila se rechaza.
+    """
+    dest_dir = str(store_dir(MediaStore.REPORTS))
+    paths = sorted({path for paths in media_paths for path in paths})
+    futures = {path: pool.submit(copy_media, path, dest_dir) for path in paths}
+    copied = {}
+    for path, future in futures.items():
+        try:
+            copied[path] = future.result()
+        except OSError:
+            continue
+    return copied
+
+
+def _remove_created(copied: Dict[str, Tuple[str, str, int, bool]], keep: Set[str]) -> None:
+    """
+    Borra los archivos que escribió el lote y no quedaron referenciados por
+    ninguna fila importada (su fila se rechazó o el lote se revirtió).
+    """
+    directory = store_dir(MediaStore.REPORTS)
+    for file_name in {file_name for file_name, _, _, created in copied.values() if created} - keep:
+        (directory / file_name).unlink(missing_ok=True)
+
+
+def _register_blobs(db, media_rows: List[dict], copied: Dict[str, Tuple[str, str, int, bool]]) -> None:
+    """
+    Crea o suma referencias a los `MediaBlob` del lote (una consulta y un
+    UPDATE por blob ya existente).
+    """
+    references: Dict[str, int] = {}
+    blobs: Dict[str, Tuple[str, int]] = {}
+    for path in (row.pop("path") for row in media_rows):
+        file_name, sha256, size, _ = copied[path]
+        references[sha256] = references.get(sha256, 0) + 1
+        blobs[sha256] = (file_name, size)
+
+    existing = {
+        blob.sha256: blob
+        for blob in db.query(models.MediaBlob).filter(
+            models.MediaBlob.store == MediaStore.REPORTS.value,
+            models.MediaBlob.sha256.in_(list(references)),
+        )
+    }
+    for sha256, blob in existing.items():
+        blob.ref_count = models.MediaBlob.ref_count + references[sha256]
+    db.bulk_insert_mappings(
+        models.MediaBlob,
+        [
+            {
+                "store": MediaStore.REPORTS.value,
+                "sha256": sha256,
+                "file_name": blobs[sha256][0],
+                "size_bytes": blobs[sha256][1],
+                "ref_count": count,
+                "created_at": datetime.utcnow(),
+            }
+            for sha256, count in references.items()
+            if sha256 not in existing
+        ],
+    )
+
+
+def _already_imported(current, report: dict) -> bool:
+    return (
+        current.latitude == report["latitude"]
+        and current.longitude == report["longitude"]
+        and current.description == report["description"]
+    )
+
+
+def import_batch(
+    batch: List[Row], source_id: str, media_dir: Path, pool: Executor
+) -> BatchResult:
+    result = BatchResult()
+    now = datetime.utcnow()
+
+    valid: List[Tuple[int, dict, dict]] = []
+    for number, raw in batch:
+        try:
+            valid.append((number, raw, validate_row(number, raw, source_id, now)))
+        except (TypeError, ValueError) as exc:
+            result.rejected.append({"row": number, "error": str(exc), "data": raw})
+
+    # Un public_id repetido dentro del lote: se conserva la primera fila
+    first_row: Dict[str, int] = {}
+    unique: List[Tuple[int, dict, dict]] = []
+    for number, raw, report in valid:
+        public_id = report["public_id"]
+        if public_id in first_row:
+            result.rejected.append(
+                {"row": number, "error": f"public_id repetido (fila {first_row[public_id]})", "data": raw}
+            )
+            continue
+        first_row[public_id] = number
+        unique.append((number, raw, report))
+
+    db = SessionLocal()
+    copied: Dict[str, Tuple[str, str, int, bool]] = {}
+    try:
+        existing = {
+            row.public_id: row
+            for row in db.query(
+                models.Report.public_id,
+                models.Report.latitude,
+                models.Report.longitude,
+                models.Report.description,
+            ).filter(models.Report.public_id.in_(list(first_row)))
+        }
+        pending: List[Tuple[int, dict, dict]] = []
+        for number, raw, report in unique:
+            current = existing.get(report["public_id"])
+            if current is None:
+                pending.append((number, raw, report))
+            elif _already_imported(current, report):
+                # Fila ya importada (p. ej. un lote confirmado antes de guardar el checkpoint)
+                result.skipped += 1
+            else:
+                result.rejected.append({"row": number, "error": "El public_id ya existe", "data": raw})
+
+        # Se revisan las rutas antes de copiar: una fila con un archivo
+        # faltante no alcanza a copiar los demás
+        checked: List[Tuple[int, dict, dict, List[str]]] = []
+        for number, raw, report in pending:
+            paths = [str(media_dir / item) for item in report.pop("media")]
+            missing = [path for path in paths if not os.path.isfile(path)]
+            if missing:
+                result.rejected.append({"row": number, "error": f"No existe {missing[0]}", "data": raw})
+                continue
+            checked.append((number, raw, report, paths))
+
+        copied = _copy_batch_media(pool, [paths for _, _, _, paths in checked])
+        reports: List[dict] = []
+        media_paths: List[List[str]] = []
+        for number, raw, report, paths in checked:
+            failed = [path for path in paths if path not in copied]
+            if failed:
+                result.rejected.append({"row": number, "error": f"No se pudo copiar {failed[0]}", "data": raw})
+                continue
+            reports.append(report)
+            media_paths.append(paths)
+        _remove_created(copied, {copied[path][0] for paths in media_paths for path in paths})
+
+        if reports:
+            # return_defaults: los ids generados quedan en cada dict para la media
+            db.bulk_insert_mappings(models.Report, reports, return_defaults=True)
+            media_rows = [
+                {
+                    "report_id": report["id"],
+                    "path": path,
+                    "file_name": copied[path][0],
+                    "media_type": media_type_for_path(path),
+                    "order": order,
+                }
+                for report, paths in zip(reports, media_paths)
+                for order, path in enumerate(paths, start=1)
+            ]
+            if media_rows:
+                _register_blobs(db, media_rows, copied)
+                db.bulk_insert_mappings(models.ReportMedia, media_rows)
+
+            connection = db.connection()
+            index_report_points(connection, reports)
+            index_report_texts(connection, reports)
+            record_imported_rollups(db, reports)
+            record_imported_changes(db, reports)
+
+        db.commit()
+        result.imported = len(reports)
+    except BaseException:
+        db.rollback()
+        _remove_created(copied, set())
+        raise
+    finally:
+        db.close()
+    return result
+
+
+# ---- CLI ----
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Importa reportes históricos desde CSV o NDJSON.")
+    parser.add_argument("source", type=Path, help="Archivo .csv o .ndjson")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Por defecto, según la extensión")
+    parser.add_argument("--media-dir", type=Path, help="Carpeta base de las rutas de media (por defecto, la del archivo)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Procesos para copiar media")
+    parser.add_argument("--restart", action="store_true", help="Ignora el checkpoint y empieza desde la primera fila")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    source: Path = args.source
+    file_format = args.format or ("csv" if source.suffix.lower() == ".csv" else "ndjson")
+    media_dir: Path = args.media_dir or source.resolve().parent
+    checkpoint_path = source.with_name(source.name + ".checkpoint.json")
+    rejected_path = source.with_name(source.name + ".rechazados.ndjson")
+
+    # Mismo arranque que main.py, por si la base es nueva
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    ensure_spatial_index(engine)
+    ensure_search_index(engine)
+    with SessionLocal() as db:
+        ensure_rollups(db)
+
+    start_row = 0 if args.restart else load_checkpoint(checkpoint_path, source)
+    if start_row:
+        print(f"Continuando desde la fila {start_row + 1}")
+
+    rows = (row for row in read_rows(source, file_format) if row[0] > start_row)
+    totals = {"imported": 0, "skipped": 0, "rejected": 0}
+    processed = 0
+    started = time.monotonic()
+
+    # "spawn", igual que el pool de derivados: no hereda conexiones abiertas
+    with ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool, rejected_path.open("a", encoding="utf-8") as rejected_file:
+        for batch in _batches(rows, args.batch_size):
+            result = import_batch(batch, source.stem, media_dir, pool)
+            for item in result.rejected:
+                rejected_file.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+            rejected_file.flush()
+            save_checkpoint(checkpoint_path, source, batch[-1][0])
+
+            processed += len(batch)
+            totals["imported"] += result.imported
+            totals["skipped"] += result.skipped
+            totals["rejected"] += len(result.rejected)
+            rate = processed / max(time.monotonic() - started, 1e-6)
+            print(
+                f"Fila {batch[-1][0]}: {totals['imported']} importados, "
+                f"{totals['skipped']} ya existían, {totals['rejected']} rechazados "
+                f"({rate:,.0f} filas/s)",
+                flush=True,
+            )
+
+    elapsed = time.monotonic() - started
+    print(f"Listo: {processed} filas en {elapsed:.1f} s.")
+    if totals["rejected"]:
+        print(f"Filas rechazadas en {rejected_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# backend/tests/conftest.py
+"""
+Fixtures comunes: una base SQLite temporal (se fija antes de importar la
+app), el cliente HTTP y un contador de sentencias SQL.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+_TMP_DIR = tempfile.mkdtemp(prefix="tic-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_TMP_DIR) / 'test.db'}"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import blob_store, models
+from app.db import SessionLocal, engine
+from app.main import app
+from app.security import hash_password
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Las pruebas `@pytest.mark.anyio` corren solo sobre asyncio (como uvicorn)
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Sin `with`: no se arrancan los workers de correo ni de visitas
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    with SessionLocal() as session:
+        session.add(models.SystemUser(name="Operario", username="operario", password_hash=hash_password("clave")))
+        session.commit()
+    response = client.post("/api/auth/login", json={"username": "operario", "password": "clave"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    """
+    Carpetas de media en un directorio temporal (no se tocan las de la app).
+    """
+    monkeypatch.setattr(blob_store, "BASE_DIR", tmp_path)
+    return tmp_path
+
+
+def stored_files(root: Path) -> List[str]:
+    return sorted(path.name for path in root.rglob("*") if path.is_file())
+
+
+@pytest.fixture
+def count_statements():
+    """
+    Context manager que registra las sentencias ejecutadas por `engine`.
+    """
+
+    @contextmanager
+    def counter(target=engine):
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(target, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(target, "before_cursor_execute", record)
+
+    return counter
+
+
+def add_report(
+    db,
+    latitude: float = 4.81,
+    longitude: float = -75.69,
+    description: str = "Hueco en la vía",
+    media: int = 1,
+    comments: int = 0,
+) -> models.Report:
+    """
+    Inserta un reporte con `media` archivos y `comments` comentarios (cada
+    uno con una evidencia).
+    """
+    report = models.Report(
+        public_id=uuid4().hex,
+        citizen_email="ciudadano@example.com",
+        latitude=latitude,
+        longitude=longitude,
+        description=description,
+        status=models.ReportStatus.NUEVO,
+        created_at=datetime.utcnow() - timedelta(seconds=1),
+    )
+    report.media = [
+        models.ReportMedia(file_name=f"{uuid4().hex}.jpg", media_type="image", order=idx)
+        for idx in range(1, media + 1)
+    ]
+    for idx in range(comments):
+        comment = models.ReportComment(author="operario", content=f"Comentario {idx}")
+        comment.media = [models.ReportCommentMedia(file_name=f"{uuid4().hex}.jpg", media_type="image", order=1)]
+        report.comments.append(comment)
+    db.add(report)
+    db.commit()
+    return report
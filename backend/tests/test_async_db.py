@@ -0,0 +1,117 @@
+# backend/tests/test_async_db.py
+"""
+Acceso asíncrono (`get_async_db`): driver aiosqlite derivado de DATABASE_URL
+u otro fijado con ASYNC_DATABASE_URL, y endpoints que no retienen una
+conexión mientras reciben archivos.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.api import news as news_api
+from app.api import reports as reports_api
+from app.db import async_engine, engine, get_async_db
+
+from .conftest import add_report
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.anyio
+async def test_get_async_db_uses_aiosqlite():
+    if engine.dialect.name != "sqlite":
+        pytest.skip("La prueba usa la base SQLite de las pruebas")
+    sessions = get_async_db()
+    db = await sessions.__anext__()
+    try:
+        assert isinstance(db, AsyncSession)
+        assert db.get_bind().dialect.driver == "aiosqlite"
+        assert (await db.execute(text("SELECT 1"))).scalar() == 1
+    finally:
+        await sessions.aclose()
+    assert async_engine.pool.checkedout() == 0
+
+
+def test_async_database_url_overrides_driver(tmp_path):
+    script = """
+import asyncio, json
+from sqlalchemy import text
+from app.db import async_engine, get_async_db
+
+async def main():
+    async for db in get_async_db():
+        await db.execute(text("CREATE TABLE ping (value INTEGER)"))
+        await db.execute(text("INSERT INTO ping VALUES (7)"))
+        await db.commit()
+        return (await db.execute(text("SELECT value FROM ping"))).scalar()
+
+print(json.dumps({"url": async_engine.url.render_as_string(), "value": asyncio.run(main())}))
+"""
+    env = {
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'sync.db'}",
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'async.db'}",
+        "PATH": "",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    assert result == {"url": env["ASYNC_DATABASE_URL"], "value": 7}
+    # La base síncrona no se tocó
+    assert (tmp_path / "async.db").exists() and not (tmp_path / "sync.db").exists()
+
+
+def track_connections_during_staging(monkeypatch, module):
+    """
+    Registra cuántas conexiones del motor asíncrono están tomadas mientras
+    el endpoint recibe los archivos.
+    """
+    checked_out = []
+    real_stage = module.stage_uploads
+
+    async def stage(uploads, store):
+        checked_out.append(async_engine.pool.checkedout())
+        return await real_stage(uploads, store)
+
+    monkeypatch.setattr(module, "stage_uploads", stage)
+    return checked_out
+
+
+def test_add_comment_releases_connection_while_staging(client, auth_headers, media_root, db, monkeypatch):
+    checked_out = track_connections_during_staging(monkeypatch, reports_api)
+    report = add_report(db)
+    response = client.post(
+        f"/api/reports/{report.public_id}/comments",
+        data={"content": "Se adjunta evidencia"},
+        files=[("evidences", ("e.jpg", b"evidencia", "image/jpeg"))],
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    assert checked_out == [0]
+
+
+def test_update_news_releases_connection_while_staging(client, auth_headers, media_root, db, monkeypatch):
+    checked_out = track_connections_during_staging(monkeypatch, news_api)
+    news = models.News(title="Corte de agua", description="Sector norte")
+    news.media = [models.NewsMedia(file_name="previo.mp4", media_type="video", order=1)]
+    db.add(news)
+    db.commit()
+
+    response = client.put(
+        f"/api/news/{news.id}",
+        data={"title": "Corte de agua (actualizado)"},
+        files=[("files", ("nuevo.mp4", b"video-nuevo", "video/mp4"))],
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert checked_out == [0]
+    body = response.json()
+    # Sin `description` en el formulario se conserva la anterior
+    assert (body["title"], body["description"]) == ("Corte de agua (actualizado)", "Sector norte")
+    assert [item["order"] for item in body["media"]] == [1, 2]
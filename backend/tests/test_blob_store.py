@@ -0,0 +1,108 @@
+# backend/tests/test_blob_store.py
+"""
+Almacén direccionado por contenido: limpieza de archivos tras un rollback
+cuando otra petición registra los mismos bytes, y recolección de blobs sin
+referencias junto con sus derivados.
+"""
+import hashlib
+import threading
+from uuid import uuid4
+
+import pytest
+
+from app import models
+from app.blob_store import MediaStore, collect_garbage, discard_staged, link_staged, store_dir
+from app.db import SessionLocal
+from app.uploads import ReceivedUpload
+
+from .conftest import stored_files
+
+
+@pytest.fixture(autouse=True)
+def sqlite_only(db):
+    if db.get_bind().dialect.name != "sqlite":
+        pytest.skip("La espera por el lock de escritura se prueba sobre SQLite")
+
+
+def staged_copy(content: bytes) -> ReceivedUpload:
+    directory = store_dir(MediaStore.REPORTS)
+    tmp_path = directory / f".{uuid4().hex}.part"
+    tmp_path.write_bytes(content)
+    return ReceivedUpload(
+        tmp_path=tmp_path,
+        media_type="image",
+        extension=".jpg",
+        size=len(content),
+        sha256=hashlib.sha256(content).hexdigest(),
+    )
+
+
+def test_discard_removes_file_without_blob(media_root, db):
+    content = uuid4().bytes
+    received = staged_copy(content)
+    link_staged(db, MediaStore.REPORTS, received)
+    db.rollback()
+
+    discard_staged(db, MediaStore.REPORTS, [received])
+    assert stored_files(media_root) == []
+
+
+def test_discard_waits_for_concurrent_link_of_same_content(media_root, db):
+    content = uuid4().bytes
+    ours = staged_copy(content)
+    link_staged(db, MediaStore.REPORTS, ours)
+    db.rollback()
+
+    # Otra petición registra los mismos bytes y aún no hace commit
+    other = SessionLocal()
+    theirs = link_staged(other, MediaStore.REPORTS, staged_copy(content))
+    discarding = threading.Thread(target=discard_staged, args=(db, MediaStore.REPORTS, [ours]))
+    discarding.start()
+    discarding.join(timeout=0.3)
+    assert discarding.is_alive()
+
+    other.commit()
+    other.close()
+    discarding.join(timeout=5)
+    assert not discarding.is_alive()
+    assert stored_files(media_root) == [theirs.file_name]
+
+
+def add_variants(db, store: MediaStore, file_name: str) -> list:
+    stem = file_name.rsplit(".", 1)[0]
+    db.add_all(
+        models.MediaVariant(
+            store=store.value,
+            source_file_name=file_name,
+            variant=variant,
+            file_name=f"{stem}_{variant}.webp",
+            width=10,
+            height=10,
+        )
+        for variant in ("thumb", "medium")
+    )
+    # El derivado `webp` está en disco pero su fila aún no se registró
+    names = [f"{stem}_{variant}.webp" for variant in ("thumb", "medium", "webp")]
+    for name in names:
+        (store_dir(store) / name).write_bytes(b"webp")
+    return names
+
+
+def test_collect_garbage_removes_blob_and_derivatives(media_root, db):
+    orphan = link_staged(db, MediaStore.REPORTS, staged_copy(uuid4().bytes))
+    kept = link_staged(db, MediaStore.REPORTS, staged_copy(uuid4().bytes))
+    add_variants(db, MediaStore.REPORTS, orphan.file_name)
+    kept_variants = add_variants(db, MediaStore.REPORTS, kept.file_name)
+    db.query(models.MediaBlob).filter(models.MediaBlob.sha256 == orphan.sha256).update({"ref_count": 0})
+    db.commit()
+
+    assert collect_garbage(db) >= 1
+    assert stored_files(media_root) == sorted([kept.file_name, *kept_variants])
+    assert db.query(models.MediaBlob).filter(models.MediaBlob.sha256 == orphan.sha256).count() == 0
+    remaining = {
+        variant.source_file_name
+        for variant in db.query(models.MediaVariant).filter(
+            models.MediaVariant.source_file_name.in_([orphan.file_name, kept.file_name])
+        )
+    }
+    assert remaining == {kept.file_name}
@@ -0,0 +1,100 @@
+# backend/tests/test_change_feed.py
+"""
+Feed incremental de cambios (`/api/reports/changes`): el token de la última
+página trae solo lo posterior, en orden, y en PostgreSQL los registros
+toman el advisory lock de transacción.
+"""
+import base64
+from types import SimpleNamespace
+
+from app import models
+from app.change_feed import (
+    _CHANGE_LOG_LOCK,
+    decode_change_token,
+    encode_change_token,
+    record_change,
+    record_imported_reports,
+)
+
+from .conftest import add_report
+
+
+def latest_token(client) -> str:
+    token, has_more = None, True
+    while has_more:
+        body = client.get("/api/reports/changes", params={"since": token, "limit": 5000}).json()
+        token, has_more = body["next_token"], body["has_more"]
+    return token
+
+
+def test_token_round_trip(client):
+    assert decode_change_token(encode_change_token(42)) == 42
+    assert decode_change_token(None) == 0
+    for invalid in ("no-es-un-token", base64.urlsafe_b64encode(b"cursor|5").decode()):
+        assert client.get("/api/reports/changes", params={"since": invalid}).status_code == 400
+
+
+def test_changes_after_token_in_order(client, db, auth_headers):
+    token = latest_token(client)
+    report = add_report(db)
+    record_change(db, report, models.ReportChangeType.CREADO)
+    db.commit()
+    client.post(f"/api/reports/{report.public_id}/comments", data={"content": "Visita técnica"}, headers=auth_headers)
+    client.patch(f"/api/reports/{report.public_id}/status", json={"status": "finalizado"}, headers=auth_headers)
+
+    first = client.get("/api/reports/changes", params={"since": token, "limit": 2}).json()
+    assert first["has_more"] is True
+    assert [item["type"] for item in first["items"]] == ["report_created", "comment_added"]
+    assert first["items"][0]["latitude"] == report.latitude
+    assert first["items"][1]["comment"]["content"] == "Visita técnica"
+
+    rest = client.get("/api/reports/changes", params={"since": first["next_token"]}).json()
+    assert rest["has_more"] is False
+    assert [(item["type"], item["status"]) for item in rest["items"]] == [("status_changed", "finalizado")]
+    assert {item["public_id"] for item in first["items"] + rest["items"]} == {report.public_id}
+
+    # Sin cambios nuevos el token se mantiene
+    empty = client.get("/api/reports/changes", params={"since": rest["next_token"]}).json()
+    assert (empty["items"], empty["next_token"]) == ([], rest["next_token"])
+
+
+class PostgresSession:
+    """
+    Sesión mínima que se presenta como PostgreSQL y registra las sentencias.
+    """
+
+    def __init__(self) -> None:
+        self.statements = []
+        self.added = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    def bulk_insert_mappings(self, mapper, mappings):
+        self.added.extend(mappings)
+
+
+def test_postgresql_writes_take_the_advisory_lock(db):
+    session = PostgresSession()
+    report = models.Report(public_id="abc", status=models.ReportStatus.NUEVO)
+    record_change(session, report, models.ReportChangeType.CREADO)
+    assert session.statements == [("SELECT pg_advisory_xact_lock(:key)", {"key": _CHANGE_LOG_LOCK})]
+
+    record_imported_reports(session, [])
+    assert len(session.statements) == 1
+    record_imported_reports(session, [{"id": 1, "status": "nuevo", "created_at": None}])
+    assert len(session.statements) == 2 and len(session.added) == 2
+
+
+def test_sqlite_writes_skip_the_advisory_lock(db, count_statements):
+    report = add_report(db)
+    with count_statements() as statements:
+        record_change(db, report, models.ReportChangeType.ESTADO)
+        db.commit()
+    assert not [statement for statement in statements if "advisory" in statement]
@@ -0,0 +1,63 @@
+# backend/tests/test_conditional.py
+"""
+GET condicional de reportes y noticias: If-None-Match y las distintas
+formas válidas de If-Modified-Since.
+"""
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+import pytest
+
+from app import models
+
+from .conftest import add_report
+
+
+def http_date(value: datetime, zone: str) -> str:
+    # format_datetime de una fecha sin zona produce el sufijo `-0000`
+    text = format_datetime(value)
+    return text if zone == "-0000" else text.replace("-0000", zone)
+
+
+@pytest.fixture
+def news(db):
+    item = models.News(title="Cierre de vía", description="Mantenimiento", updated_at=datetime.utcnow())
+    db.add(item)
+    db.commit()
+    return item
+
+
+@pytest.mark.parametrize("zone", ["GMT", "-0000", "+0000"])
+def test_report_if_modified_since_forms(client, db, zone):
+    report = add_report(db)
+    url = f"/api/reports/{report.public_id}"
+
+    later = http_date(report.updated_at + timedelta(minutes=1), zone)
+    assert client.get(url, headers={"If-Modified-Since": later}).status_code == 304
+
+    earlier = http_date(report.updated_at - timedelta(minutes=1), zone)
+    assert client.get(url, headers={"If-Modified-Since": earlier}).status_code == 200
+
+
+@pytest.mark.parametrize("zone", ["GMT", "-0000"])
+def test_news_if_modified_since_forms(client, news, zone):
+    url = f"/api/news/{news.id}"
+    later = http_date(news.updated_at + timedelta(minutes=1), zone)
+    assert client.get(url, headers={"If-Modified-Since": later}).status_code == 304
+
+
+def test_invalid_if_modified_since_is_ignored(client, db):
+    report = add_report(db)
+    response = client.get(f"/api/reports/{report.public_id}", headers={"If-Modified-Since": "ayer"})
+    assert response.status_code == 200
+
+
+def test_if_none_match_takes_precedence(client, db):
+    report = add_report(db)
+    url = f"/api/reports/{report.public_id}"
+    etag = client.get(url).headers["etag"]
+    later = http_date(report.updated_at + timedelta(minutes=1), "GMT")
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    # Un ETag distinto manda aunque If-Modified-Since diga que no cambió
+    assert client.get(url, headers={"If-None-Match": 'W/"otro"', "If-Modified-Since": later}).status_code == 200
@@ -0,0 +1,73 @@
+# backend/tests/test_create_report.py
+"""
+Creación de reportes: el OTP se verifica antes de recibir archivos, y el
+consumo del OTP, el reporte y su media se confirman en un único commit con
+un INSERT en lote para la media.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import models
+from app.api import reports as reports_api
+from app.db import async_engine
+
+from .conftest import stored_files
+
+EMAIL = "ciudadano@example.com"
+
+
+@pytest.fixture
+def otp(db):
+    db.query(models.EmailOTP).filter(models.EmailOTP.email == EMAIL).delete()
+    db.add(models.EmailOTP(email=EMAIL, otp_code="123456", expires_at=datetime.utcnow() + timedelta(minutes=3)))
+    db.commit()
+    return "123456"
+
+
+def report_form(otp_code: str) -> dict:
+    return {
+        "latitude": 6.25,
+        "longitude": -75.56,
+        "description": "Semáforo dañado",
+        "email": EMAIL,
+        "otp_code": otp_code,
+    }
+
+
+def videos(count: int):
+    return [("files", (f"{idx}.mp4", f"video-{idx}".encode(), "video/mp4")) for idx in range(count)]
+
+
+def test_invalid_otp_rejected_before_receiving_files(client, otp, media_root, monkeypatch):
+    async def fail_stage(*args, **kwargs):
+        raise AssertionError("No se deben recibir archivos sin un OTP válido")
+
+    monkeypatch.setattr(reports_api, "stage_uploads", fail_stage)
+    response = client.post("/api/reports/", data=report_form("000000"), files=videos(2))
+    assert response.status_code == 400
+    assert stored_files(media_root) == []
+
+
+def test_create_report_single_commit_and_batched_media(client, otp, media_root, count_statements, db):
+    commits = []
+
+    def record_commit(conn):
+        commits.append(conn)
+
+    event.listen(async_engine.sync_engine, "commit", record_commit)
+    try:
+        with count_statements(async_engine.sync_engine) as statements:
+            response = client.post("/api/reports/", data=report_form(otp), files=videos(3))
+    finally:
+        event.remove(async_engine.sync_engine, "commit", record_commit)
+
+    assert response.status_code == 201
+    assert [item["order"] for item in response.json()["media"]] == [1, 2, 3]
+    assert len(stored_files(media_root)) == 3
+    assert len(commits) == 1
+    media_inserts = [sql for sql in statements if sql.startswith("INSERT INTO report_media")]
+    assert len(media_inserts) == 1
+    # El OTP es de un solo uso
+    assert db.query(models.EmailOTP).filter(models.EmailOTP.email == EMAIL).count() == 0
@@ -0,0 +1,185 @@
+# backend/tests/test_email_outbox.py
+"""
+Worker de la cola de correos: reclamo de lotes con UPDATE condicional,
+reintentos con backoff y reutilización de la conexión SMTP (con un SMTP
+falso en lugar de un servidor real).
+"""
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import email_outbox, models
+from app.db import SessionLocal
+from app.email_outbox import EmailOutboxWorker
+
+
+class FakeSMTP:
+    def __init__(self, opened: list) -> None:
+        self.sent = []
+        self.noop_error = None
+        self.send_error = None
+        self.closed = False
+        opened.append(self)
+
+    def noop(self):
+        if self.noop_error:
+            raise self.noop_error
+        return (250, b"OK")
+
+    def send_message(self, message):
+        if self.send_error:
+            raise self.send_error
+        self.sent.append(message["To"])
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    connections = []
+    monkeypatch.setattr(email_outbox, "open_smtp_connection", lambda: FakeSMTP(connections))
+    return connections
+
+
+@pytest.fixture(autouse=True)
+def empty_outbox(db):
+    # Otras pruebas dejan correos en cola (comentarios, OTP)
+    db.query(models.EmailOutbox).delete()
+    db.commit()
+
+
+def enqueue(db, count: int = 1, **fields) -> list:
+    items = [
+        models.EmailOutbox(to_email=f"c{idx}@example.com", subject="Asunto", body="Cuerpo", **fields)
+        for idx in range(count)
+    ]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+
+def outbox(*ids: int) -> list:
+    with SessionLocal() as session:
+        return (
+            session.query(models.EmailOutbox)
+            .filter(models.EmailOutbox.id.in_(ids))
+            .order_by(models.EmailOutbox.id)
+            .all()
+        )
+
+
+def test_batches_reuse_one_connection(db, opened):
+    worker = EmailOutboxWorker()
+    first = enqueue(db, 2)
+    assert worker.process_batch() == 2
+    second = enqueue(db, 1)
+    assert worker.process_batch() == 1
+
+    assert len(opened) == 1
+    assert opened[0].sent == ["c0@example.com", "c1@example.com", "c0@example.com"]
+    assert {item.status for item in outbox(*first, *second)} == {models.EmailOutboxStatus.ENVIADO}
+
+
+@pytest.mark.parametrize("error", [smtplib.SMTPServerDisconnected("cerrada"), ConnectionResetError("reset")])
+def test_dropped_connection_is_reopened(db, opened, error):
+    worker = EmailOutboxWorker()
+    enqueue(db)
+    worker.process_batch()
+    opened[0].noop_error = error
+
+    ids = enqueue(db)
+    assert worker.process_batch() == 1
+    assert len(opened) == 2 and opened[0].closed
+    assert outbox(*ids)[0].status == models.EmailOutboxStatus.ENVIADO
+
+
+def test_failed_send_backs_off_and_gives_up(db, opened, monkeypatch):
+    monkeypatch.setattr(email_outbox, "MAX_ATTEMPTS", 2)
+    worker = EmailOutboxWorker()
+    (item_id,) = enqueue(db)
+
+    def failing_connection():
+        connection = FakeSMTP(opened)
+        connection.send_error = smtplib.SMTPRecipientsRefused({})
+        return connection
+
+    monkeypatch.setattr(email_outbox, "open_smtp_connection", failing_connection)
+    before = datetime.utcnow()
+    worker.process_batch()
+    (item,) = outbox(item_id)
+    assert (item.status, item.attempts) == (models.EmailOutboxStatus.PENDIENTE, 1)
+    assert item.next_attempt_at >= before + email_outbox._backoff(1)
+    assert item.locked_until is None
+    # La conexión se cierra tras un error SMTP
+    assert opened[0].closed
+
+    # Antes de que venza el backoff no se vuelve a intentar
+    assert worker.process_batch() == 0
+
+    with SessionLocal() as session:
+        session.query(models.EmailOutbox).filter(models.EmailOutbox.id == item_id).update(
+            {models.EmailOutbox.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        session.commit()
+    worker.process_batch()
+    (item,) = outbox(item_id)
+    assert (item.status, item.attempts) == (models.EmailOutboxStatus.FALLIDO, 2)
+
+
+def test_backoff_grows_and_is_capped():
+    delays = [email_outbox._backoff(attempt).total_seconds() for attempt in range(1, 10)]
+    assert delays[:4] == [10, 20, 40, 80]
+    assert max(delays) == email_outbox.BACKOFF_MAX_SECONDS
+
+
+def test_expired_email_is_not_sent(db, opened):
+    ids = enqueue(db, expires_at=datetime.utcnow() - timedelta(minutes=1))
+    EmailOutboxWorker().process_batch()
+    assert outbox(*ids)[0].status == models.EmailOutboxStatus.EXPIRADO
+    assert opened == []
+
+
+def test_claimed_batch_is_not_claimed_by_another_worker(db):
+    ids = enqueue(db, 3)
+    first, second = EmailOutboxWorker(), EmailOutboxWorker()
+    with SessionLocal() as session_a, SessionLocal() as session_b:
+        claimed = first._claim_batch(session_a)
+        assert [item.id for item in claimed] == ids
+        assert second._claim_batch(session_b) == []
+
+        # Vencido el plazo del reclamo, otro worker puede tomar el lote
+        session_a.query(models.EmailOutbox).filter(models.EmailOutbox.id.in_(ids)).update(
+            {models.EmailOutbox.locked_until: datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False
+        )
+        session_a.commit()
+        assert [item.id for item in second._claim_batch(session_b)] == ids
+
+
+def test_claim_update_skips_rows_taken_between_select_and_update(db, monkeypatch):
+    ids = enqueue(db, 2)
+    first, second = EmailOutboxWorker(), EmailOutboxWorker()
+    real_or = email_outbox.or_
+    raced = []
+
+    def or_then_race(*clauses):
+        # `or_` se arma una vez para el SELECT y otra para el UPDATE: justo
+        # antes del UPDATE, otro worker reclama el primer correo
+        if len(raced) == 1:
+            with SessionLocal() as other:
+                other.query(models.EmailOutbox).filter(models.EmailOutbox.id == ids[0]).update(
+                    {
+                        models.EmailOutbox.claimed_by: second._worker_id,
+                        models.EmailOutbox.locked_until: datetime.utcnow() + timedelta(minutes=2),
+                    }
+                )
+                other.commit()
+        raced.append(1)
+        return real_or(*clauses)
+
+    monkeypatch.setattr(email_outbox, "or_", or_then_race)
+    with SessionLocal() as session:
+        claimed = first._claim_batch(session)
+    assert [item.id for item in claimed] == ids[1:]
+    assert outbox(ids[0])[0].claimed_by == second._worker_id
@@ -0,0 +1,94 @@
+# backend/tests/test_hyperloglog.py
+"""
+Conteo de visitantes: sketches HyperLogLog diarios (error acotado, unión
+para semana/mes, persistencia) y total mantenido sin COUNT por petición.
+"""
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.hyperloglog import HyperLogLog
+from app.visit_buffer import VisitBuffer
+
+
+def sketch_of(values) -> HyperLogLog:
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize("distinct", [100, 5_000, 50_000])
+def test_estimate_is_within_error_bound(distinct):
+    values = [f"device-{idx}" for idx in range(distinct)]
+    # Los repetidos no cambian el conteo
+    sketch = sketch_of(values + values[: distinct // 2])
+    assert sketch.count() == pytest.approx(distinct, rel=0.05)
+
+
+def test_union_counts_overlap_once():
+    monday = sketch_of(f"device-{idx}" for idx in range(0, 3_000))
+    tuesday = sketch_of(f"device-{idx}" for idx in range(2_000, 5_000))
+    assert HyperLogLog.union([monday, tuesday]).count() == pytest.approx(5_000, rel=0.05)
+
+    restored = HyperLogLog(monday.precision, monday.to_bytes())
+    assert restored.count() == monday.count()
+
+
+def test_invalid_sketches_are_rejected():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=3)
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=10, registers=bytes(10))
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(11))
+
+
+def test_windows_union_daily_sketches(db):
+    buffer = VisitBuffer()
+    today = date(2031, 3, 31)
+    tokens = [uuid4().hex for _ in range(300)]
+    for offset, chunk in ((0, tokens[:100]), (3, tokens[50:200]), (20, tokens[200:])):
+        moment = datetime.combine(today - timedelta(days=offset), datetime.min.time())
+        for token in chunk:
+            buffer.record(token, now=moment)
+
+    assert buffer.unique_count("day", today=today) == pytest.approx(100, rel=0.05)
+    assert buffer.unique_count("week", today=today) == pytest.approx(200, rel=0.05)
+    assert buffer.unique_count("month", today=today) == pytest.approx(300, rel=0.05)
+
+
+def test_daily_sketch_is_persisted_and_merged(db):
+    before = VisitBuffer().unique_count("day")
+    first, second = VisitBuffer(), VisitBuffer()
+    for idx in range(200):
+        # Dos procesos que ven visitantes en parte repetidos
+        first.record(f"hll-{idx}-{before}")
+        second.record(f"hll-{idx + 100}-{before}")
+    first.flush()
+    second.flush()
+
+    assert VisitBuffer().unique_count("day") - before == pytest.approx(300, abs=20)
+
+
+def test_total_is_maintained_and_reconciled(client, db, monkeypatch, count_statements):
+    buffer = VisitBuffer()
+    monkeypatch.setattr("app.api.analytics.visit_buffer", buffer)
+    total = client.get("/api/analytics/visits/count").json()["total"]
+
+    for _ in range(3):
+        buffer.record(uuid4().hex)
+    with count_statements() as statements:
+        body = client.get("/api/analytics/visits/count").json()
+    assert body == {"total": total + 3, "window": "total", "approximate": False}
+    assert statements == []
+
+    # Otro proceso guarda visitantes: la reconciliación los suma
+    other = VisitBuffer()
+    other.record(uuid4().hex)
+    other.flush()
+    buffer.reconcile()
+    assert buffer.total_count() == total + 4
+
+    assert client.get("/api/analytics/visits/count", params={"window": "week"}).json()["approximate"] is True
@@ -0,0 +1,183 @@
+# backend/tests/test_import_reports.py
+"""
+Herramienta de importación masiva (`import_reports.py`): validación de
+filas, reanudación desde el checkpoint y conteo de referencias de la media.
+"""
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+import import_reports
+from app import models
+
+from .conftest import stored_files
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    # main() usa procesos "spawn"; en las pruebas basta con hilos
+    monkeypatch.setattr(
+        import_reports, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)
+    )
+
+
+def row(public_id: str, **fields) -> dict:
+    return {
+        "latitude": 4.81,
+        "longitude": -75.69,
+        "description": "Hueco histórico",
+        "public_id": public_id,
+        # Fecha histórica: no desplaza a los reportes recientes de otras pruebas
+        "created_at": "2020-01-15T10:00:00",
+        **fields,
+    }
+
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_ndjson(path, rows) -> None:
+    path.write_text("".join(json.dumps(item) + "\n" for item in rows), encoding="utf-8")
+
+
+def imported(db, *public_ids: str):
+    return db.query(models.Report).filter(models.Report.public_id.in_(public_ids)).all()
+
+
+@pytest.mark.parametrize(
+    "raw, error",
+    [
+        ({"latitude": 4.8, "longitude": -75.6}, "Falta la descripción"),
+        ({"latitude": 95, "longitude": -75.6, "description": "x"}, "Coordenadas fuera de rango"),
+        ({"latitude": "norte", "longitude": -75.6, "description": "x"}, "could not convert"),
+        ({"latitude": 4.8, "longitude": -75.6, "description": {"texto": "x"}}, "description debe ser texto"),
+        ({"latitude": 4.8, "longitude": -75.6, "description": "x", "status": "cerrado"}, "is not a valid"),
+        ({"latitude": 4.8, "longitude": -75.6, "description": "x", "status": 5}, "is not a valid"),
+    ],
+)
+def test_validate_row_rejects(raw, error):
+    with pytest.raises(ValueError, match=error):
+        import_reports.validate_row(1, raw, "fuente", datetime.utcnow())
+
+
+def test_validate_row_coerces_non_string_values():
+    report = import_reports.validate_row(
+        1, {"latitude": "4.8", "longitude": -75.6, "description": 123, "public_id": 42}, "fuente", datetime.utcnow()
+    )
+    assert (report["description"], report["public_id"], report["status"]) == ("123", "42", models.ReportStatus.NUEVO)
+
+
+def test_import_batch_rejects_bad_rows_and_keeps_the_rest(media_root, pool, db, tmp_path):
+    batch = list(
+        enumerate(
+            [
+                row("imp-ok-1"),
+                row("imp-bad-1", description={"texto": "objeto"}),
+                row("imp-bad-2", status=7),
+                row("imp-ok-1"),
+                row("imp-ok-2", description=2024),
+            ],
+            start=1,
+        )
+    )
+    result = import_reports.import_batch(batch, "lote", tmp_path, pool)
+
+    assert result.imported == 2
+    assert [item["row"] for item in result.rejected] == [2, 3, 4]
+    assert "public_id repetido (fila 1)" in result.rejected[2]["error"]
+    assert {report.public_id for report in imported(db, "imp-ok-1", "imp-ok-2")} == {"imp-ok-1", "imp-ok-2"}
+
+
+def test_import_batch_skips_already_imported_and_rejects_conflicts(media_root, pool, db, tmp_path):
+    import_reports.import_batch([(1, row("imp-dup"))], "lote", tmp_path, pool)
+    result = import_reports.import_batch(
+        [(1, row("imp-dup")), (2, row("imp-dup", description="Otro texto"))], "lote", tmp_path, pool
+    )
+    assert (result.imported, result.skipped) == (0, 1)
+    assert result.rejected[0]["row"] == 2
+
+
+def test_media_ref_counts_and_no_orphans_for_rejected_rows(media_root, pool, db, tmp_path):
+    media_dir = tmp_path / "origen"
+    media_dir.mkdir()
+    (media_dir / "a.jpg").write_bytes(b"imagen-a")
+    (media_dir / "copia-a.jpg").write_bytes(b"imagen-a")
+    (media_dir / "b.jpg").write_bytes(b"imagen-b")
+
+    result = import_reports.import_batch(
+        [
+            (1, row("imp-media-1", media=["a.jpg", "copia-a.jpg"])),
+            (2, row("imp-media-2", media=["a.jpg"])),
+            # b.jpg existe pero la fila se rechaza por el archivo faltante
+            (3, row("imp-media-3", media=["b.jpg", "falta.jpg"])),
+        ],
+        "lote",
+        media_dir,
+        pool,
+    )
+    assert result.imported == 2
+    assert "falta.jpg" in result.rejected[0]["error"]
+
+    blobs = (
+        db.query(models.MediaBlob)
+        .filter(models.MediaBlob.sha256.in_([sha256(b"imagen-a"), sha256(b"imagen-b")]))
+        .all()
+    )
+    assert [(blob.sha256, blob.ref_count) for blob in blobs] == [(sha256(b"imagen-a"), 3)]
+    assert stored_files(media_root / "media") == [blobs[0].file_name]
+
+    # Otro lote con el mismo contenido suma referencias al blob existente
+    import_reports.import_batch([(1, row("imp-media-4", media=["copia-a.jpg"]))], "lote", media_dir, pool)
+    db.refresh(blobs[0])
+    assert blobs[0].ref_count == 4
+
+
+def test_failed_batch_removes_copied_files(media_root, pool, db, tmp_path, monkeypatch):
+    (tmp_path / "c.jpg").write_bytes(b"imagen-c")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("falla al registrar")
+
+    monkeypatch.setattr(import_reports, "record_imported_changes", fail)
+    with pytest.raises(RuntimeError):
+        import_reports.import_batch([(1, row("imp-fail", media=["c.jpg"]))], "lote", tmp_path, pool)
+    assert stored_files(media_root / "media") == []
+    assert imported(db, "imp-fail") == []
+
+
+def test_main_resumes_from_checkpoint(media_root, thread_pool, db, tmp_path, monkeypatch):
+    source = tmp_path / "historico.ndjson"
+    write_ndjson(source, [row(f"imp-resume-{idx}") for idx in range(1, 6)])
+
+    real_import_batch = import_reports.import_batch
+    calls = []
+
+    def crash_on_second_batch(batch, *args):
+        calls.append([number for number, _ in batch])
+        if len(calls) == 2:
+            raise RuntimeError("corte")
+        return real_import_batch(batch, *args)
+
+    monkeypatch.setattr(import_reports, "import_batch", crash_on_second_batch)
+    with pytest.raises(RuntimeError):
+        import_reports.main([str(source), "--batch-size", "2"])
+    checkpoint = json.loads(source.with_name("historico.ndjson.checkpoint.json").read_text())
+    assert checkpoint["rows"] == 2
+
+    monkeypatch.setattr(import_reports, "import_batch", real_import_batch)
+    import_reports.main([str(source), "--batch-size", "2"])
+
+    assert calls == [[1, 2], [3, 4]]
+    ids = [f"imp-resume-{idx}" for idx in range(1, 6)]
+    assert sorted(report.public_id for report in imported(db, *ids)) == ids
+    assert json.loads(source.with_name("historico.ndjson.checkpoint.json").read_text())["rows"] == 5
@@ -0,0 +1,83 @@
+# backend/tests/test_map_tiles.py
+"""
+Clusters por tile (`/api/reports/tiles/{z}/{x}/{y}`): bordes de Web Mercator,
+resumen desde el rollup en zooms bajos y caché de tiles.
+"""
+import pytest
+
+from app import map_tiles, models
+from app.map_tiles import ROLLUP_MAX_ZOOM, build_tile, tile_cache, tile_for_point
+from app.report_rollups import rebuild_rollups
+
+from .conftest import add_report
+
+ZOOM = ROLLUP_MAX_ZOOM + 2
+
+
+def total_in_tile(db, z, lat, lon) -> int:
+    return build_tile(db, *tile_for_point(z, lat, lon))["total"]
+
+
+@pytest.mark.parametrize(
+    "lat, lon",
+    [(89.5, 10.0), (-89.5, 10.0), (85.06, -30.0), (-85.06, -30.0), (12.0, 180.0), (-10.0, -180.0)],
+)
+def test_points_beyond_mercator_edges_are_counted_in_their_tile(db, lat, lon):
+    before = total_in_tile(db, ZOOM, lat, lon)
+    add_report(db, latitude=lat, longitude=lon)
+    assert total_in_tile(db, ZOOM, lat, lon) == before + 1
+
+
+def test_report_clusters_in_high_zoom_tile(db):
+    first = add_report(db, latitude=40.41680, longitude=-3.70380)
+    add_report(db, latitude=40.41690, longitude=-3.70370)
+    alone = add_report(db, latitude=40.41600, longitude=-3.69500)
+    db.query(models.Report).filter(models.Report.id == first.id).update({"status": models.ReportStatus.FINALIZADO})
+    db.commit()
+
+    tile = build_tile(db, *tile_for_point(14, 40.4168, -3.7038))
+    clusters = {cluster["count"]: cluster for cluster in tile["clusters"]}
+    assert clusters[2]["status_counts"] == {"finalizado": 1, "nuevo": 1}
+    assert clusters[2]["latitude"] == pytest.approx(40.41685)
+    assert clusters[2]["public_id"] is None
+    assert clusters[1]["public_id"] == alone.public_id
+
+
+def test_low_zoom_tiles_come_from_rollups(db, count_statements):
+    rebuild_rollups(db)
+    db.commit()
+    with count_statements() as statements:
+        world = build_tile(db, 0, 0, 0)
+    assert world["total"] == db.query(models.Report).count()
+    assert len(statements) == 1
+    assert "report_grid_counts" in statements[0] and "FROM reports" not in statements[0]
+
+    # Las celdas del rollup se reparten entre los tiles sin duplicarse
+    quadrants = sum(build_tile(db, 1, x, y)["total"] for x in (0, 1) for y in (0, 1))
+    assert quadrants == world["total"]
+
+
+def test_tile_endpoint_caches_until_a_report_changes(client, db, monkeypatch):
+    lat, lon = 19.4326, -99.1332
+    z, x, y = tile_for_point(ZOOM, lat, lon)
+    add_report(db, latitude=lat, longitude=lon)
+    tile_cache.invalidate_point(lat, lon)
+
+    calls = []
+    real_build = map_tiles.build_tile
+
+    def counting_build(*args):
+        calls.append(args[1:])
+        return real_build(*args)
+
+    monkeypatch.setattr(map_tiles, "build_tile", counting_build)
+    url = f"/api/reports/tiles/{z}/{x}/{y}"
+    first = client.get(url).json()
+    assert client.get(url).json() == first
+    assert len(calls) == 1
+
+    tile_cache.invalidate_point(lat, lon)
+    client.get(url)
+    assert len(calls) == 2
+
+    assert client.get(f"/api/reports/tiles/1/2/0").status_code == 400
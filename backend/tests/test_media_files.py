@@ -0,0 +1,112 @@
+# backend/tests/test_media_files.py
+"""
+Caché HTTP de los montajes de media (`MediaFiles`): ETag fuerte, archivos
+inmutables direccionados por contenido, 304 y rangos de bytes.
+"""
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app as main_app
+from app.media_files import IMMUTABLE_CACHE, REVALIDATE_CACHE, ZEROCOPY_EXTENSION, MediaFiles
+
+CONTENT = b"0123456789" * 10
+
+
+@pytest.fixture
+def media_app(media_root):
+    app = FastAPI()
+    app.mount("/media", MediaFiles(directory=media_root), name="media")
+    return app
+
+
+@pytest.fixture
+def media_client(media_app):
+    return TestClient(media_app)
+
+
+@pytest.fixture
+def blob_name(media_root) -> str:
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    (media_root / f"{digest}.mp4").write_bytes(CONTENT)
+    return f"{digest}.mp4"
+
+
+def test_media_mounts_use_media_files():
+    mounts = {
+        route.path: route.app
+        for route in main_app.routes
+        if getattr(route, "path", "").startswith("/media")
+    }
+    assert set(mounts) == {"/media", "/media-operator", "/media-news"}
+    assert all(isinstance(mounted, MediaFiles) for mounted in mounts.values())
+
+
+def test_hashed_blob_is_immutable_with_digest_etag(media_client, blob_name):
+    response = media_client.get(f"/media/{blob_name}")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{blob_name[:64]}"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+    assert response.headers["accept-ranges"] == "bytes"
+
+    cached = media_client.get(f"/media/{blob_name}", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_derivative_etag_includes_variant(media_client, media_root, blob_name):
+    derivative = f"{blob_name[:64]}_thumb.webp"
+    (media_root / derivative).write_bytes(b"webp")
+    response = media_client.get(f"/media/{derivative}")
+    assert response.headers["etag"] == f'"{blob_name[:64]}_thumb"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+
+
+def test_legacy_name_is_revalidated(media_client, media_root):
+    (media_root / "reporte_1.jpg").write_bytes(CONTENT)
+    response = media_client.get("/media/reporte_1.jpg")
+    assert response.headers["cache-control"] == REVALIDATE_CACHE
+    assert response.headers["etag"].endswith(f'-{len(CONTENT):x}"')
+
+
+def test_byte_range(media_client, blob_name):
+    response = media_client.get(f"/media/{blob_name}", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.content == CONTENT[10:20]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "range_header, status, offset, count",
+    [(None, 200, 0, len(CONTENT)), ("bytes=-5", 206, len(CONTENT) - 5, 5), ("bytes=90-", 206, 90, 10)],
+)
+async def test_zerocopy_send_when_server_supports_it(media_app, blob_name, range_header, status, offset, count):
+    headers = [(b"range", range_header.encode())] if range_header else []
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": f"/media/{blob_name}",
+        "raw_path": f"/media/{blob_name}".encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "extensions": {ZEROCOPY_EXTENSION: {}},
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == ZEROCOPY_EXTENSION:
+            message = {**message, "file": message["file"].name}
+        sent.append(message)
+
+    await media_app(scope, receive, send)
+    start, body = sent
+    assert start["status"] == status
+    assert (body["type"], body["offset"], body["count"]) == (ZEROCOPY_EXTENSION, offset, count)
@@ -0,0 +1,104 @@
+# backend/tests/test_media_transactions.py
+"""
+Los archivos subidos se registran en la misma transacción que sus filas de
+media: si la transacción se revierte no quedan archivos ni blobs huérfanos.
+"""
+import pytest
+
+from app import models
+from app.api import news as news_api
+from app.api import reports as reports_api
+
+from .conftest import add_report, stored_files
+
+
+def video(name: str, content: bytes):
+    return ("files", (name, content, "video/mp4"))
+
+
+def fail_after_linking(monkeypatch, module):
+    real_link = module.link_staged
+    calls = []
+
+    def link_then_fail(db, store, received):
+        blob = real_link(db, store, received)
+        calls.append(blob)
+        if len(calls) == 2:
+            raise RuntimeError("falla después de registrar los blobs")
+        return blob
+
+    monkeypatch.setattr(module, "link_staged", link_then_fail)
+
+
+def blob_count(db) -> int:
+    return db.query(models.MediaBlob).count()
+
+
+def test_create_news_stores_media_in_one_commit(client, auth_headers, media_root, db):
+    response = client.post(
+        "/api/news/",
+        data={"title": "Jornada de limpieza"},
+        files=[video("a.mp4", b"video-a"), video("b.mp4", b"video-b")],
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    assert [item["order"] for item in response.json()["media"]] == [1, 2]
+    assert len(stored_files(media_root)) == 2
+
+
+def test_create_news_rollback_leaves_no_files(client, auth_headers, media_root, db, monkeypatch):
+    fail_after_linking(monkeypatch, news_api)
+    before = blob_count(db)
+    with pytest.raises(RuntimeError):
+        client.post(
+            "/api/news/",
+            data={"title": "Noticia que falla"},
+            files=[video("c.mp4", b"video-c"), video("d.mp4", b"video-d")],
+            headers=auth_headers,
+        )
+    assert stored_files(media_root) == []
+    assert blob_count(db) == before
+    assert db.query(models.News).filter(models.News.title == "Noticia que falla").count() == 0
+
+
+def test_update_news_rejected_content_stores_nothing(client, auth_headers, media_root):
+    news_id = client.post("/api/news/", data={"title": "Sin media", "description": "Texto"}, headers=auth_headers).json()["id"]
+    response = client.put(f"/api/news/{news_id}", data={"title": "Sin media", "description": " "}, headers=auth_headers)
+    assert response.status_code == 400
+    assert stored_files(media_root) == []
+
+
+def test_update_news_rollback_leaves_no_files(client, auth_headers, media_root, db, monkeypatch):
+    news_id = client.post("/api/news/", data={"title": "Editable", "description": "Texto"}, headers=auth_headers).json()["id"]
+    fail_after_linking(monkeypatch, news_api)
+    before = blob_count(db)
+    with pytest.raises(RuntimeError):
+        client.put(
+            f"/api/news/{news_id}",
+            data={"title": "Editable"},
+            files=[video("e.mp4", b"video-e"), video("f.mp4", b"video-f")],
+            headers=auth_headers,
+        )
+    assert stored_files(media_root) == []
+    assert blob_count(db) == before
+
+
+def test_add_comment_rollback_leaves_no_files(client, auth_headers, media_root, db, monkeypatch):
+    public_id = add_report(db).public_id
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("falla al encolar el correo")
+
+    # La evidencia ya quedó registrada cuando falla el resto de la transacción
+    monkeypatch.setattr(reports_api, "queue_comment_notification_email", fail)
+    before = blob_count(db)
+    with pytest.raises(RuntimeError):
+        client.post(
+            f"/api/reports/{public_id}/comments",
+            data={"content": "Revisado"},
+            files=[("evidences", ("g.mp4", b"video-g", "video/mp4"))],
+            headers=auth_headers,
+        )
+    assert stored_files(media_root) == []
+    assert blob_count(db) == before
+    assert db.query(models.ReportComment).filter(models.ReportComment.content == "Revisado").count() == 0
@@ -0,0 +1,113 @@
+# backend/tests/test_migrations.py
+"""
+Migraciones versionadas: se aplican una vez y en orden sobre una base
+existente, cada una en su transacción, y una versión que otro proceso ya
+registró se omite.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import migrations, models
+from app.db import Base
+from app.migrations import VERSION_TABLE, Migration, run_migrations
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """
+    Base separada con el esquema de los modelos y dos reportes previos al
+    registro de cambios.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            models.Report.__table__.insert(),
+            [
+                {
+                    "public_id": public_id,
+                    "citizen_email": "c@example.com",
+                    "latitude": 4.8,
+                    "longitude": -75.6,
+                    "description": "Hueco",
+                    "status": models.ReportStatus.NUEVO,
+                    "created_at": created_at,
+                }
+                for public_id, created_at in (("b", datetime(2020, 2, 1)), ("a", datetime(2020, 1, 1)))
+            ],
+        )
+    yield engine
+    engine.dispose()
+
+
+def versions(engine) -> list:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT version FROM {VERSION_TABLE} ORDER BY version"))
+        return [version for (version,) in rows]
+
+
+def add_migration(monkeypatch, migration: Migration) -> None:
+    monkeypatch.setattr(migrations, "MIGRATIONS", [*migrations.MIGRATIONS, migration])
+
+
+def test_pending_migrations_run_once_in_order(legacy_engine):
+    expected = sorted(migration.version for migration in migrations.MIGRATIONS)
+    assert run_migrations(legacy_engine) == expected
+    assert run_migrations(legacy_engine) == []
+    assert versions(legacy_engine) == expected
+
+    indexes = {index["name"] for index in inspect(legacy_engine).get_indexes("news")}
+    assert {"ix_news_start_date", "ix_news_end_date"} <= indexes
+    assert "ix_news_start_date_end_date" not in indexes
+
+    # El registro de cambios arranca con la creación de los reportes existentes, en orden
+    with legacy_engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT reports.public_id, report_changes.change_type FROM report_changes "
+                "JOIN reports ON reports.id = report_changes.report_id ORDER BY report_changes.id"
+            )
+        ).all()
+    assert rows == [("a", "CREADO"), ("b", "CREADO")]
+
+
+def test_failed_migration_is_rolled_back_and_retried(legacy_engine, monkeypatch):
+    run_migrations(legacy_engine)
+    next_version = max(versions(legacy_engine)) + 1
+    attempts = []
+
+    def upgrade(conn):
+        conn.execute(text("UPDATE reports SET description = 'migrada'"))
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("falla a mitad de la migración")
+
+    add_migration(monkeypatch, Migration(next_version, "Prueba", upgrade))
+    with pytest.raises(RuntimeError):
+        run_migrations(legacy_engine)
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT DISTINCT description FROM reports")).scalars().all() == ["Hueco"]
+    assert next_version not in versions(legacy_engine)
+
+    assert run_migrations(legacy_engine) == [next_version]
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT DISTINCT description FROM reports")).scalars().all() == ["migrada"]
+
+
+def test_version_registered_by_another_process_is_skipped(legacy_engine, monkeypatch):
+    run_migrations(legacy_engine)
+    next_version = max(versions(legacy_engine)) + 1
+
+    def upgrade(conn):
+        # Otro proceso termina la misma migración antes del INSERT de esta
+        with legacy_engine.begin() as other:
+            other.execute(
+                text(f"INSERT INTO {VERSION_TABLE} VALUES (:version, 'Prueba', :now)"),
+                {"version": next_version, "now": datetime.utcnow()},
+            )
+
+    add_migration(monkeypatch, Migration(next_version, "Prueba", upgrade))
+    assert run_migrations(legacy_engine) == []
+    assert versions(legacy_engine)[-1] == next_version
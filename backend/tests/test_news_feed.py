@@ -0,0 +1,105 @@
+# backend/tests/test_news_feed.py
+"""
+Feed público de noticias: vigencia filtrada en SQL y páginas en caché hasta
+el próximo límite de vigencia o hasta que se crea/edita una noticia.
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.news_feed import NewsFeedCache, news_feed_cache, next_boundary
+
+
+@pytest.fixture(autouse=True)
+def empty_feed_cache():
+    news_feed_cache.clear()
+
+
+def add_news(db, title: str, start=None, end=None) -> models.News:
+    news = models.News(title=title, description="Texto", start_date=start, end_date=end)
+    db.add(news)
+    db.commit()
+    return news
+
+
+def feed_titles(client) -> list:
+    response = client.get("/api/news/", params={"limit": 100})
+    assert response.status_code == 200
+    return [item["title"] for item in response.json()["items"]]
+
+
+def test_cached_page_expires_at_boundary():
+    cache = NewsFeedCache(max_age_seconds=60)
+    now = datetime(2030, 1, 1, 12, 0)
+    boundary = now + timedelta(seconds=5)
+    cache.put("page", "contenido", now, boundary, cache.generation)
+
+    assert cache.get("page", now + timedelta(seconds=4)) == "contenido"
+    assert cache.get("page", boundary) is None
+
+    cache.put("page", "contenido", now, None, cache.generation)
+    assert cache.get("page", now + timedelta(seconds=59)) == "contenido"
+    assert cache.get("page", now + timedelta(seconds=60)) is None
+
+
+def test_page_computed_before_invalidation_is_not_stored():
+    cache = NewsFeedCache()
+    now = datetime(2030, 1, 1)
+    generation = cache.generation
+    cache.clear()
+    cache.put("page", "obsoleta", now, None, generation)
+    assert cache.get("page", now) is None
+
+
+def test_next_boundary_is_first_future_start_or_end(db):
+    now = datetime.utcnow()
+    # Límites lejanos que otras pruebas no usan
+    starts = now + timedelta(days=3000)
+    add_news(db, "Futura", start=starts, end=starts + timedelta(days=1))
+    ends = now + timedelta(days=2000)
+    add_news(db, "Por vencer", start=now - timedelta(days=1), end=ends)
+
+    boundary = next_boundary(db, now + timedelta(days=1500))
+    assert boundary == ends + timedelta(microseconds=1)
+    assert next_boundary(db, ends + timedelta(seconds=1)) == starts
+
+
+def test_feed_only_lists_active_news(client, db):
+    now = datetime.utcnow()
+    add_news(db, "Vigente", start=now - timedelta(days=1), end=now + timedelta(days=1))
+    add_news(db, "Vencida", end=now - timedelta(minutes=1))
+    add_news(db, "Programada", start=now + timedelta(days=1))
+
+    titles = feed_titles(client)
+    assert "Vigente" in titles
+    assert "Vencida" not in titles and "Programada" not in titles
+    all_titles = [item["title"] for item in client.get("/api/news/", params={"only_active": False, "limit": 100}).json()["items"]]
+    assert {"Vencida", "Programada"} <= set(all_titles)
+
+
+def test_feed_is_served_from_cache_until_news_changes(client, db, auth_headers, count_statements):
+    first = feed_titles(client)
+    with count_statements() as statements:
+        assert feed_titles(client) == first
+    assert statements == []
+
+    # Escrita sin pasar por la API: el caché todavía no la ve
+    add_news(db, "Sin invalidar")
+    assert "Sin invalidar" not in feed_titles(client)
+
+    response = client.post("/api/news/", data={"title": "Publicada por API", "description": "Texto"}, headers=auth_headers)
+    assert response.status_code == 201
+    titles = feed_titles(client)
+    assert {"Sin invalidar", "Publicada por API"} <= set(titles)
+
+
+def test_feed_entry_expires_when_news_becomes_active(client, db):
+    starts = datetime.utcnow() + timedelta(milliseconds=300)
+    add_news(db, "Empieza pronto", start=starts)
+    assert "Empieza pronto" not in feed_titles(client)
+
+    # Sin invalidar el caché, la página se recalcula al pasar el límite
+    time.sleep((starts - datetime.utcnow()).total_seconds() + 0.05)
+    assert "Empieza pronto" in feed_titles(client)
@@ -0,0 +1,80 @@
+# backend/tests/test_query_counts.py
+"""
+Cantidad de sentencias SQL por endpoint de lectura de reportes: debe ser fija
+sin importar cuántos reportes, medios y comentarios se retornen (sin N+1).
+"""
+import pytest
+
+from app.spatial import RTREE_TABLE
+
+from .conftest import add_report
+
+# SELECT de reportes + media + derivados + comentarios + media de comentarios + derivados
+DETAIL_STATEMENTS = 6
+# SELECT de reportes + media + derivados
+SUMMARY_STATEMENTS = 3
+
+
+@pytest.fixture(scope="module")
+def reports(client):
+    from app.db import SessionLocal
+
+    with SessionLocal() as session:
+        return [
+            add_report(session, latitude=-33.45 + idx * 0.001, longitude=-70.66, media=2, comments=3).public_id
+            for idx in range(12)
+        ]
+
+
+@pytest.mark.parametrize("limit", [1, 10])
+def test_list_reports_statement_count(client, count_statements, reports, limit):
+    with count_statements() as statements:
+        response = client.get("/api/reports/", params={"limit": limit})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == limit
+    assert len(statements) == DETAIL_STATEMENTS
+
+
+@pytest.mark.parametrize("limit", [1, 10])
+def test_summary_statement_count(client, count_statements, reports, limit):
+    with count_statements() as statements:
+        response = client.get("/api/reports/summary", params={"limit": limit})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == limit
+    assert len(statements) == SUMMARY_STATEMENTS
+
+
+@pytest.mark.parametrize("limit", [1, 10])
+def test_nearby_statement_count(client, count_statements, reports, limit):
+    params = {"lat": -33.45, "lng": -70.66, "radius_km": 5, "limit": limit}
+    with count_statements() as statements:
+        response = client.get("/api/reports/nearby", params=params)
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+
+    # Candidatos: una sola consulta, prefiltrada por el R*Tree
+    candidates = [statement for statement in statements if RTREE_TABLE in statement]
+    assert len(candidates) == 1
+    # Carga del detalle de los k más cercanos
+    assert len(statements) - len(candidates) == DETAIL_STATEMENTS
+
+
+def test_get_report_statement_count_is_constant(client, count_statements, db, reports):
+    counts = []
+    for comments in (1, 8):
+        public_id = add_report(db, comments=comments, media=3).public_id
+        with count_statements() as statements:
+            response = client.get(f"/api/reports/{public_id}")
+        assert response.status_code == 200
+        assert len(response.json()["comments"]) == comments
+        counts.append(len(statements))
+    # Consulta liviana del ETag + carga del detalle
+    assert counts == [1 + DETAIL_STATEMENTS] * 2
+
+
+def test_get_report_not_modified_skips_loading(client, count_statements, reports):
+    etag = client.get(f"/api/reports/{reports[0]}").headers["etag"]
+    with count_statements() as statements:
+        response = client.get(f"/api/reports/{reports[0]}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(statements) == 1
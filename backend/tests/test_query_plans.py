@@ -0,0 +1,65 @@
+# backend/tests/test_query_plans.py
+"""
+Planes de ejecución (EXPLAIN QUERY PLAN, SQLite) de las consultas frecuentes:
+deben usar los índices declarados en `models.py` / `migrations.py`.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects import sqlite
+
+from app import models
+from app.news_feed import active_news_filter
+
+
+def query_plan(db, query) -> str:
+    statement = query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}").all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.fixture(autouse=True)
+def sqlite_only(db):
+    if db.get_bind().dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN es específico de SQLite")
+
+
+def test_active_news_feed_walks_created_at_index(db):
+    now = datetime.utcnow()
+    query = (
+        db.query(models.News)
+        .filter(active_news_filter(now))
+        .order_by(models.News.created_at.desc(), models.News.id.desc())
+        .limit(21)
+    )
+    plan = query_plan(db, query)
+    assert "USING INDEX ix_news_created_at" in plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+
+@pytest.mark.parametrize(
+    "column, index",
+    [(models.News.start_date, "ix_news_start_date"), (models.News.end_date, "ix_news_end_date")],
+)
+def test_next_news_boundary_uses_index(db, column, index):
+    query = db.query(func.min(column)).filter(column > datetime.utcnow())
+    assert f"SEARCH news USING COVERING INDEX {index}" in query_plan(db, query)
+
+
+def test_report_listing_uses_status_created_at_index(db):
+    query = (
+        db.query(models.Report)
+        .filter(models.Report.status == models.ReportStatus.NUEVO)
+        .filter(tuple_(models.Report.created_at, models.Report.id) < tuple_(datetime.utcnow(), 10**9))
+        .order_by(models.Report.created_at.desc(), models.Report.id.desc())
+        .limit(21)
+    )
+    plan = query_plan(db, query)
+    assert "ix_reports_status_created_at_id" in plan
+    assert "USE TEMP B-TREE" not in plan
+
+
+def test_comment_loading_uses_report_id_index(db):
+    query = db.query(models.ReportComment).filter(models.ReportComment.report_id.in_([1, 2, 3]))
+    assert "ix_report_comments_report_id_created_at" in query_plan(db, query)
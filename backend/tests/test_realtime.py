@@ -0,0 +1,116 @@
+# backend/tests/test_realtime.py
+"""
+Eventos en tiempo real: reparto del broker en proceso entre suscriptores,
+canales de cada evento y formato SSE del stream.
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app import models, realtime
+from app.realtime import (
+    ALL_REPORTS_CHANNEL,
+    InProcessBroker,
+    ReportEvents,
+    report_channel,
+    report_events,
+    status_channel,
+)
+
+from .conftest import add_report
+
+
+async def subscribed(broker: InProcessBroker, channel: str):
+    subscription = broker.subscribe(channel)
+    pending = asyncio.ensure_future(subscription.__anext__())
+    # Hasta el primer `await` la suscripción no queda registrada
+    await asyncio.sleep(0)
+    return subscription, pending
+
+
+@pytest.mark.anyio
+async def test_broker_fans_out_to_every_subscriber_of_the_channel():
+    broker = InProcessBroker()
+    first, first_next = await subscribed(broker, "reports")
+    second, second_next = await subscribed(broker, "reports")
+    other, other_next = await subscribed(broker, "status:nuevo")
+
+    # Se publica desde el threadpool, como en los endpoints `def`
+    publisher = threading.Thread(target=broker.publish, args=("reports", "hola"))
+    publisher.start()
+    publisher.join()
+
+    assert await asyncio.wait_for(first_next, 1) == "hola"
+    assert await asyncio.wait_for(second_next, 1) == "hola"
+    await asyncio.sleep(0.01)
+    assert not other_next.done()
+
+    other_next.cancel()
+    await asyncio.gather(other_next, return_exceptions=True)
+    for subscription in (first, second, other):
+        await subscription.aclose()
+    assert broker._subscribers == {}
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_drops_oldest_messages(monkeypatch):
+    monkeypatch.setattr(realtime, "SUBSCRIBER_QUEUE_SIZE", 2)
+    broker = InProcessBroker()
+    subscription, pending = await subscribed(broker, "reports")
+    for message in ("uno", "dos", "tres"):
+        broker.publish("reports", message)
+    await asyncio.sleep(0.01)
+
+    assert await pending == "dos"
+    assert await subscription.__anext__() == "tres"
+    await subscription.aclose()
+
+
+class RecordingBroker:
+    def __init__(self) -> None:
+        self.published = []
+
+    def publish(self, channel: str, message: str) -> None:
+        self.published.append((channel, json.loads(message)))
+
+
+def test_status_change_is_published_to_every_channel(client, db, auth_headers, monkeypatch):
+    broker = RecordingBroker()
+    monkeypatch.setattr(report_events, "broker", broker)
+    report = add_report(db)
+
+    response = client.patch(
+        f"/api/reports/{report.public_id}/status",
+        json={"status": "en_progreso"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert [channel for channel, _ in broker.published] == [
+        report_channel(report.public_id),
+        status_channel(models.ReportStatus.EN_PROGRESO),
+        ALL_REPORTS_CHANNEL,
+        status_channel(models.ReportStatus.NUEVO),
+    ]
+    event = broker.published[0][1]
+    assert (event["type"], event["public_id"], event["status"]) == ("status_changed", report.public_id, "en_progreso")
+    assert event["data"]["old_status"] == "nuevo"
+
+
+@pytest.mark.anyio
+async def test_stream_formats_events_and_heartbeats(monkeypatch):
+    monkeypatch.setattr(realtime, "HEARTBEAT_SECONDS", 0.05)
+    events = ReportEvents(InProcessBroker())
+    stream = events.stream("reports")
+
+    assert await stream.__anext__() == ": conectado\n\n"
+    assert await asyncio.wait_for(stream.__anext__(), 1) == ": ping\n\n"
+
+    events.broker.publish("reports", json.dumps({"type": "report_created", "public_id": "abc"}))
+    chunk = await asyncio.wait_for(stream.__anext__(), 1)
+    assert chunk.startswith("event: report_created\ndata: ")
+    assert json.loads(chunk.split("data: ", 1)[1]) == {"type": "report_created", "public_id": "abc"}
+
+    await stream.aclose()
+    assert events.broker._subscribers == {}
@@ -0,0 +1,21 @@
+# backend/tests/test_report_export.py
+"""
+Exportación CSV: el texto que empieza como fórmula no se ejecuta al abrir el
+archivo en una hoja de cálculo.
+"""
+import csv
+import io
+
+from .conftest import add_report
+
+
+def test_csv_export_neutralizes_formulas(client, auth_headers, db):
+    report = add_report(db, description="=HYPERLINK(\"http://example.com\")", longitude=-75.5)
+    response = client.get("/api/reports/export", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.text.lstrip("\ufeff"))))
+    row = next(row for row in rows if row["public_id"] == report.public_id)
+    assert row["description"] == "'=HYPERLINK(\"http://example.com\")"
+    # Los números negativos no son texto del usuario y se exportan tal cual
+    assert row["longitude"] == "-75.5"
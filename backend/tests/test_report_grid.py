@@ -0,0 +1,26 @@
+# backend/tests/test_report_grid.py
+"""
+La grilla de `/api/analytics/reports/grid` usa las mismas celdas que los
+rollups, también cuando el recuadro cae justo en un borde de celda.
+"""
+from app.report_rollups import grid_cell, record_report_created
+
+from .conftest import add_report
+
+
+def test_grid_bounds_match_rollup_cells_at_edges(client, db):
+    # 0.06 // 0.01 == 5.0 pero floor(0.06 / 0.01) == 6
+    report = add_report(db, latitude=0.06, longitude=0.06)
+    record_report_created(db, report)
+    db.commit()
+    cell = grid_cell(0.06, 0.06)
+
+    response = client.get(
+        "/api/analytics/reports/grid",
+        params={"min_lat": 0.06, "max_lat": 0.06, "min_lon": 0.06, "max_lon": 0.06},
+    )
+    assert response.status_code == 200
+    cells = response.json()["cells"]
+    assert len(cells) == 1
+    assert cells[0]["total"] == 1
+    assert cells[0]["min_lat"] == round(cell[0] * 0.01, 6)
@@ -0,0 +1,54 @@
+# backend/tests/test_search.py
+"""
+Búsqueda de texto completo (`/api/reports/search`): en SQLite pasa por la
+tabla FTS5, que se alimenta al insertar reportes y comentarios.
+"""
+import pytest
+
+from app import models
+from app.search import SEARCH_TABLE, fts_query
+
+from .conftest import add_report
+
+
+@pytest.fixture(autouse=True)
+def sqlite_only(db):
+    if db.get_bind().dialect.name != "sqlite":
+        pytest.skip("FTS5 es específico de SQLite")
+
+
+def search_ids(client, q: str, **params):
+    response = client.get("/api/reports/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()["items"]]
+
+
+def test_fts_query_quotes_tokens_as_prefixes():
+    assert fts_query('alcantarilla "rota" OR') == '"alcantarilla"* "rota"* "OR"*'
+    assert fts_query("¿?") is None
+
+
+def test_search_matches_description_prefix_without_accents(client, db):
+    report = add_report(db, description="Alcantarilla destapada en el andén")
+    assert search_ids(client, "alcantar anden") == [report.id]
+
+
+def test_search_matches_comments(client, db):
+    report = add_report(db, description="Poste inclinado")
+    report.comments.append(models.ReportComment(author="operario", content="Cuadrilla de electrificadora asignada"))
+    db.commit()
+    assert search_ids(client, "electrificadora") == [report.id]
+
+
+def test_search_ranks_by_relevance(client, db):
+    weak = add_report(db, description="Luminaria apagada y un charco pequeño en la esquina del parque")
+    strong = add_report(db, description="Luminaria apagada")
+    assert search_ids(client, "luminaria") == [strong.id, weak.id]
+
+
+def test_search_runs_through_fts(client, db, count_statements):
+    add_report(db, description="Baranda oxidada")
+    with count_statements() as statements:
+        search_ids(client, "baranda")
+    assert any(f"{SEARCH_TABLE} MATCH" in statement for statement in statements)
+    assert not any("LIKE" in statement.upper() for statement in statements)
@@ -0,0 +1,76 @@
+# backend/tests/test_session_cache.py
+"""
+Caché de sesiones de `get_current_user`: LRU con TTL, sin consultas a la BD
+para tokens en caché e invalidación del token anterior al iniciar sesión.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.security import SessionCache, SessionUser, hash_password, session_cache
+
+
+def session_user(token: str, expires_in: timedelta = timedelta(hours=1)) -> SessionUser:
+    return SessionUser(
+        id=1,
+        name="Operario",
+        username="operario",
+        session_token=token,
+        session_expires_at=datetime.utcnow() + expires_in,
+    )
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SessionCache(max_entries=2, ttl_seconds=60)
+    cache.put(session_user("a"))
+    cache.put(session_user("b"))
+    assert cache.get("a") is not None
+    cache.put(session_user("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_with_ttl_or_session():
+    cache = SessionCache(max_entries=10, ttl_seconds=0)
+    cache.put(session_user("ttl"))
+    assert cache.get("ttl") is None
+
+    cache = SessionCache(max_entries=10, ttl_seconds=60)
+    cache.put(session_user("vencida", expires_in=timedelta(seconds=-1)))
+    assert cache.get("vencida") is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.fixture
+def supervisor(db):
+    # Usuario propio: `auth_headers` comparte la sesión de "operario" entre pruebas
+    if not db.query(models.SystemUser).filter(models.SystemUser.username == "supervisor").count():
+        db.add(models.SystemUser(name="Supervisor", username="supervisor", password_hash=hash_password("clave")))
+        db.commit()
+
+
+def login(client) -> dict:
+    response = client.post("/api/auth/login", json={"username": "supervisor", "password": "clave"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_cached_session_skips_the_database(client, supervisor, count_statements):
+    headers = login(client)
+    with count_statements() as statements:
+        assert client.get("/api/auth/session-cache", headers=headers).status_code == 200
+    assert not [statement for statement in statements if "system_users" in statement]
+
+
+def test_login_invalidates_previous_token(client, supervisor):
+    old_headers = login(client)
+    old_token = old_headers["Authorization"].split()[1]
+    assert session_cache.get(old_token) is not None
+
+    new_headers = login(client)
+    assert session_cache.get(old_token) is None
+    assert client.get("/api/auth/session-cache", headers=old_headers).status_code == 401
+    assert client.get("/api/auth/session-cache", headers=new_headers).status_code == 200
@@ -0,0 +1,105 @@
+# backend/tests/test_spatial.py
+"""
+Prefiltro espacial: en SQLite `reports_in_box` consulta la tabla R*Tree, que
+se mantiene al día al insertar reportes, y las búsquedas por radio descartan
+las esquinas de la caja con Haversine.
+"""
+from math import asin, cos, radians, sin, sqrt
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+
+from app.spatial import EARTH_RADIUS_KM, RTREE_TABLE, bounding_box, reports_in_box, reports_within_radius
+
+from .conftest import add_report
+
+
+@pytest.fixture(autouse=True)
+def sqlite_only(db):
+    if db.get_bind().dialect.name != "sqlite":
+        pytest.skip("La tabla R*Tree es específica de SQLite")
+
+
+def test_inserted_report_is_indexed_in_rtree(db):
+    report = add_report(db, latitude=6.2442, longitude=-75.5812)
+    row = db.execute(
+        text(f"SELECT min_lat, max_lat, min_lon, max_lon FROM {RTREE_TABLE} WHERE id = :id"),
+        {"id": report.id},
+    ).one()
+    # El R*Tree guarda float32: la caja puede redondear hacia afuera
+    assert row.min_lat == pytest.approx(6.2442, abs=1e-5)
+    assert row.max_lat == pytest.approx(6.2442, abs=1e-5)
+    assert row.min_lon == pytest.approx(-75.5812, abs=1e-5)
+    assert row.max_lon == pytest.approx(-75.5812, abs=1e-5)
+
+
+def test_reports_in_box_uses_rtree(db):
+    inside = add_report(db, latitude=-33.45, longitude=-70.66)
+    outside = add_report(db, latitude=-33.60, longitude=-70.66)
+    box = bounding_box(-33.45, -70.66, 5)
+
+    query = reports_in_box(db, box)
+    statement = query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    plan = "\n".join(
+        row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}").all()
+    )
+    assert f"SCAN {RTREE_TABLE} VIRTUAL TABLE INDEX" in plan
+
+    ids = {report.id for report in query}
+    assert inside.id in ids
+    assert outside.id not in ids
+
+
+def test_search_radius_drops_box_corners(client, db):
+    center = add_report(db, latitude=-12.05, longitude=-77.04, description="Semáforo dañado centro")
+    # Dentro de la caja de 5 km pero a ~6.4 km del centro (esquina)
+    corner = add_report(db, latitude=-12.09, longitude=-77.08, description="Semáforo dañado esquina")
+
+    response = client.get(
+        "/api/reports/search",
+        params={"q": "semáforo dañado", "lat": -12.05, "lng": -77.04, "radius_km": 5},
+    )
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()["items"]]
+    assert center.id in ids
+    assert corner.id not in ids
+
+
+def scalar_haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    d_lat = radians(lat2 - lat1)
+    d_lon = radians(lon2 - lon1)
+    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def test_reports_within_radius_matches_brute_force(db):
+    center = (10.40, -75.50)
+    rng = np.random.default_rng(3)
+    points = center + rng.uniform(-0.05, 0.05, size=(60, 2))
+    reports = [add_report(db, latitude=float(lat), longitude=float(lon), media=0) for lat, lon in points]
+
+    expected = sorted(
+        (distance, report.id)
+        for report in reports
+        if (distance := scalar_haversine_km(*center, report.latitude, report.longitude)) <= 3
+    )
+    nearest = reports_within_radius(db, *center, 3)
+    assert [report_id for report_id, _ in nearest] == [report_id for _, report_id in expected]
+    assert [distance for _, distance in nearest] == pytest.approx([distance for distance, _ in expected])
+
+    # Con límite: los k más cercanos, en orden
+    top = reports_within_radius(db, *center, 3, limit=5)
+    assert top == nearest[:5]
+
+
+def test_nearby_endpoint_returns_closest_first(client, db):
+    far = add_report(db, latitude=-0.2200, longitude=-78.5100)
+    near = add_report(db, latitude=-0.2201, longitude=-78.5000)
+    response = client.get("/api/reports/nearby", params={"lat": -0.22, "lng": -78.50, "radius_km": 2})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [near.id, far.id]
+
+    response = client.get("/api/reports/nearby", params={"lat": -0.22, "lng": -78.50, "radius_km": 2, "limit": 1})
+    assert [item["id"] for item in response.json()] == [near.id]
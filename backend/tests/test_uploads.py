@@ -0,0 +1,115 @@
+# backend/tests/test_uploads.py
+"""
+Topes de tamaño de las subidas (por petición y por archivo) y escritura
+atómica del archivo recibido.
+"""
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app import models, uploads
+
+from .conftest import add_report, stored_files
+
+
+def evidence(name: str, content: bytes):
+    return ("evidences", (name, content, "image/jpeg"))
+
+
+def comment_count(db) -> int:
+    return db.query(models.ReportComment).count()
+
+
+@pytest.fixture
+def report(db):
+    return add_report(db)
+
+
+def test_request_over_cap_is_rejected_by_content_length(client, auth_headers, media_root, db, report, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_REQUEST_BYTES", 1024)
+    before = comment_count(db)
+    response = client.post(
+        f"/api/reports/{report.public_id}/comments",
+        data={"content": "Evidencia pesada"},
+        files=[evidence("grande.jpg", b"x" * 4096)],
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
+    assert stored_files(media_root) == []
+    assert comment_count(db) == before
+
+
+def test_request_over_cap_without_content_length_is_cut(client, auth_headers, media_root, db, report, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_REQUEST_BYTES", 1024)
+    boundary = "limite"
+    chunks = [
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"content\"\r\n\r\nTexto\r\n".encode(),
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"evidences\"; filename=\"a.jpg\"\r\n"
+        "Content-Type: image/jpeg\r\n\r\n".encode(),
+        *[b"x" * 512] * 8,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ]
+    response = client.post(
+        f"/api/reports/{report.public_id}/comments",
+        # Un generador se envía con Transfer-Encoding: chunked, sin Content-Length
+        content=iter(chunks),
+        headers={**auth_headers, "Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    assert response.status_code == 413
+    assert stored_files(media_root) == []
+
+
+def test_file_over_cap_is_rejected_without_leftovers(client, auth_headers, media_root, db, report, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 1024)
+    before = comment_count(db)
+    response = client.post(
+        f"/api/reports/{report.public_id}/comments",
+        data={"content": "Dos evidencias"},
+        files=[evidence("ok.jpg", b"a" * 512), evidence("grande.jpg", b"b" * 2048)],
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
+    assert stored_files(media_root) == []
+    assert comment_count(db) == before
+
+
+@pytest.mark.anyio
+async def test_receive_upload_writes_temp_file_with_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 4)
+    content = b"contenido de prueba"
+    received = await uploads.receive_upload(
+        UploadFile(io.BytesIO(content), filename="Foto.JPG", headers={"content-type": "image/jpeg"}), tmp_path
+    )
+    # El archivo queda con nombre temporal; el definitivo lo pone `link_staged`
+    assert received.tmp_path.parent == tmp_path
+    assert received.tmp_path.name.endswith(".part")
+    assert received.tmp_path.read_bytes() == content
+    assert received.sha256 == hashlib.sha256(content).hexdigest()
+    assert (received.size, received.extension, received.media_type) == (len(content), ".jpg", "image")
+
+
+class _BrokenFile(io.BytesIO):
+    def read(self, size=-1):
+        if self.tell() >= 4:
+            raise OSError("conexión cortada")
+        return super().read(size)
+
+
+@pytest.mark.anyio
+async def test_receive_upload_failure_removes_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 4)
+    with pytest.raises(OSError):
+        await uploads.receive_upload(UploadFile(_BrokenFile(b"12345678"), filename="a.jpg"), tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.anyio
+async def test_receive_upload_over_cap_removes_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", 4)
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 6)
+    with pytest.raises(HTTPException) as error:
+        await uploads.receive_upload(UploadFile(io.BytesIO(b"12345678"), filename="a.jpg"), tmp_path)
+    assert error.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,96 @@
+# backend/tests/test_visit_buffer.py
+"""
+Buffer de visitas: los pings se acumulan en memoria y se escriben en un
+solo upsert por flush; si la escritura falla, vuelven al buffer.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app import models, visit_buffer as visit_buffer_module
+from app.visit_buffer import VisitBuffer
+
+
+def visitors(db, *tokens: str) -> dict:
+    db.expire_all()
+    rows = db.query(models.Visitor).filter(models.Visitor.device_token.in_(tokens))
+    return {row.device_token: (row.first_seen_at, row.last_seen_at) for row in rows}
+
+
+def test_visits_are_written_in_one_batch(db, count_statements):
+    buffer = VisitBuffer()
+    first, second = uuid4().hex, uuid4().hex
+    start = datetime(2030, 5, 1, 8, 0)
+    assert buffer.record(first, now=start) is True
+    assert buffer.record(first, now=start + timedelta(minutes=5)) is False
+    assert buffer.record(second, now=start + timedelta(minutes=1)) is True
+    assert visitors(db, first, second) == {}
+
+    with count_statements() as statements:
+        assert buffer.flush() == 2
+    assert len([statement for statement in statements if "INTO visitors" in statement]) == 1
+    assert visitors(db, first, second) == {
+        first: (start, start + timedelta(minutes=5)),
+        second: (start + timedelta(minutes=1), start + timedelta(minutes=1)),
+    }
+    assert buffer.flush() == 0
+
+    # Un token ya guardado solo adelanta `last_seen_at`
+    assert buffer.record(first, now=start + timedelta(hours=1)) is False
+    buffer.flush()
+    assert visitors(db, first)[first] == (start, start + timedelta(hours=1))
+
+
+def test_known_tokens_are_loaded_from_the_table(db):
+    token = uuid4().hex
+    buffer = VisitBuffer()
+    buffer.record(token)
+    buffer.flush()
+    assert VisitBuffer().record(token) is False
+
+
+def test_failed_flush_keeps_visits_pending(db, monkeypatch):
+    buffer = VisitBuffer()
+    token = uuid4().hex
+    start = datetime(2030, 6, 1, 9, 0)
+    buffer.record(token, now=start)
+
+    def fail(db, batch):
+        raise RuntimeError("BD no disponible")
+
+    monkeypatch.setattr(buffer, "_write", fail)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    buffer.record(token, now=start + timedelta(minutes=2))
+    monkeypatch.undo()
+
+    assert buffer.flush() == 1
+    assert visitors(db, token) == {token: (start, start + timedelta(minutes=2))}
+
+
+def test_full_buffer_wakes_the_writer(db, monkeypatch):
+    monkeypatch.setattr(visit_buffer_module, "FLUSH_MAX_EVENTS", 2)
+    buffer = VisitBuffer()
+    buffer.record(uuid4().hex)
+    assert not buffer._wakeup.is_set()
+    buffer.record(uuid4().hex)
+    assert buffer._wakeup.is_set()
+
+
+def test_stop_flushes_pending_visits(db):
+    buffer = VisitBuffer()
+    buffer.start()
+    token = uuid4().hex
+    buffer.record(token)
+    buffer.stop()
+    assert token in visitors(db, token)
+
+
+def test_visit_endpoint_reports_new_tokens(client, db, monkeypatch):
+    buffer = VisitBuffer()
+    monkeypatch.setattr("app.api.analytics.visit_buffer", buffer)
+    token = uuid4().hex
+    assert client.post("/api/analytics/visits", json={"device_token": token}).json() == {"is_new": True}
+    assert client.post("/api/analytics/visits", json={"device_token": f" {token} "}).json() == {"is_new": False}
+    assert client.post("/api/analytics/visits", json={"device_token": " "}).status_code == 400
@@ -21,6 +21,7 @@ import {
   Typography,
 } from "@mui/material";
 import { getToken } from "../auth";
+import { applyReportEvent, subscribeToReport } from "../realtime";
 import type { Report, ReportComment, ReportStatus } from "../types";
 
 const markerIcon = new Icon({
@@ -68,6 +69,11 @@ export default function ReportDetailPage() {
     }
 
     fetchReport();
+
+    // Comentarios y cambios de estado nuevos llegan por SSE
+    return subscribeToReport(publicId, (event) =>
+      setReport((prev) => (prev ? applyReportEvent(prev, event) : prev))
+    );
   }, [publicId]);
 
   const handleStatusChange = async (event: any) => {
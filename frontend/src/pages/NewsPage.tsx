@@ -13,7 +13,7 @@ import {
   Typography,
 } from "@mui/material";
 import { Link as RouterLink } from "react-router-dom";
-import type { News } from "../types";
+import type { News, Page } from "../types";
 import { getSession, type SessionData } from "../auth";
 
 const formatDate = (value?: string | null) => {
@@ -25,8 +25,24 @@ const formatDate = (value?: string | null) => {
   });
 };
 
+const PAGE_SIZE = 20;
+
+async function fetchNewsPage(cursor: string | null): Promise<Page<News>> {
+  const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+  const res = await fetch(`/api/news/?${params.toString()}`);
+  if (!res.ok) {
+    throw new Error("No se pudieron cargar las noticias.");
+  }
+  return res.json();
+}
+
 export default function NewsPage() {
   const [news, setNews] = useState<News[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [mediaIndexes, setMediaIndexes] = useState<Record<number, number>>({});
@@ -36,12 +52,9 @@ export default function NewsPage() {
     const fetchNews = async () => {
       try {
         setLoading(true);
-        const res = await fetch("/api/news/");
-        if (!res.ok) {
-          throw new Error("No se pudieron cargar las noticias.");
-        }
-        const data: News[] = await res.json();
-        setNews(data);
+        const data = await fetchNewsPage(null);
+        setNews(data.items);
+        setNextCursor(data.next_cursor);
       } catch (err: any) {
         setError(err.message || "Error inesperado al cargar las noticias.");
       } finally {
@@ -52,6 +65,20 @@ export default function NewsPage() {
     fetchNews();
   }, []);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const data = await fetchNewsPage(nextCursor);
+      setNews((prev) => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (err: any) {
+      setError(err.message || "Error inesperado al cargar las noticias.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     const handleSessionChange = () => {
       setSession(getSession());
@@ -210,6 +237,14 @@ export default function NewsPage() {
               </Card>
             );
           })}
+
+        {!loading && nextCursor && (
+          <Box display="flex" justifyContent="center">
+            <Button variant="outlined" onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore ? "Cargando..." : "Cargar más"}
+            </Button>
+          </Box>
+        )}
       </Stack>
     </Container>
   );
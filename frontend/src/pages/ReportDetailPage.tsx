@@ -2,6 +2,7 @@ import { useEffect, useState } from "react";
 import { useParams } from "react-router-dom";
 import { MapContainer, Marker, TileLayer } from "react-leaflet";
 import { Icon } from "leaflet";
+import { applyReportEvent, subscribeToReport } from "../realtime";
 import type { Report } from "../types";
 
 const markerIcon = new Icon({
@@ -37,6 +38,11 @@ export default function ReportDetailPage() {
     }
 
     fetchReport();
+
+    // Comentarios y cambios de estado nuevos llegan por SSE
+    return subscribeToReport(publicId, (event) =>
+      setReport((prev) => (prev ? applyReportEvent(prev, event) : prev))
+    );
   }, [publicId]);
 
 
@@ -17,7 +17,7 @@ import {
   Stack,
   Typography,
 } from "@mui/material";
-import type { Report, ReportStatus } from "../types";
+import type { Page, ReportStatus, ReportSummary } from "../types";
 import { getSession } from "../auth";
 
 const statusLabels: Record<ReportStatus, string> = {
@@ -34,23 +34,39 @@ const statusColors: Record<ReportStatus, "default" | "success" | "warning" | "in
   finalizado: "success",
 };
 
+const PAGE_SIZE = 50;
+
 export default function ReportListPage() {
-  const [reports, setReports] = useState<Report[]>([]);
+  const [reports, setReports] = useState<ReportSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [hasSession, setHasSession] = useState<boolean>(!!getSession());
   const [statusFilter, setStatusFilter] = useState<ReportStatus | "all">("all");
 
+  async function fetchPage(cursor: string | null): Promise<Page<ReportSummary>> {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (statusFilter !== "all") {
+      params.set("status_filter", statusFilter);
+    }
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
+    const res = await fetch(`/api/reports/summary?${params.toString()}`);
+    if (!res.ok) {
+      throw new Error("Error al cargar reportes");
+    }
+    return res.json();
+  }
+
   useEffect(() => {
     async function fetchReports() {
       try {
         setLoading(true);
-        const res = await fetch("/api/reports/");
-        if (!res.ok) {
-          throw new Error("Error al cargar reportes");
-        }
-        const data: Report[] = await res.json();
-        setReports(data);
+        const data = await fetchPage(null);
+        setReports(data.items);
+        setNextCursor(data.next_cursor);
       } catch (err: any) {
         setError(err.message || "Error inesperado");
       } finally {
@@ -58,7 +74,21 @@ export default function ReportListPage() {
       }
     }
     fetchReports();
-  }, []);
+  }, [statusFilter]);
+
+  async function handleLoadMore() {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const data = await fetchPage(nextCursor);
+      setReports((prev) => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (err: any) {
+      setError(err.message || "Error inesperado");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
 
   useEffect(() => {
     const handleSessionChange = () => {
@@ -90,7 +120,7 @@ export default function ReportListPage() {
     return <Alert severity="error">{error}</Alert>;
   }
 
-  if (reports.length === 0) {
+  if (reports.length === 0 && statusFilter === "all") {
     return (
       <Box
         display="flex"
@@ -115,11 +145,6 @@ export default function ReportListPage() {
     );
   }
 
-  const filteredReports =
-    statusFilter === "all"
-      ? reports
-      : reports.filter((report) => report.status === statusFilter);
-
   return (
     <Box>
       <Stack
@@ -151,13 +176,13 @@ export default function ReportListPage() {
           </FormControl>
         )}
       </Stack>
-      {filteredReports.length === 0 ? (
+      {reports.length === 0 ? (
         <Typography variant="body2" color="text.secondary">
           No hay reportes para el estado seleccionado.
         </Typography>
       ) : (
         <Grid container spacing={2} justifyContent="center">
-          {filteredReports.map((r) => (
+          {reports.map((r) => (
             <Grid item xs={12} md={6} key={r.public_id}>
               <Card>
                 <CardContent>
@@ -196,6 +221,13 @@ export default function ReportListPage() {
           ))}
         </Grid>
       )}
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={3}>
+          <Button variant="outlined" onClick={handleLoadMore} disabled={loadingMore}>
+            {loadingMore ? "Cargando..." : "Cargar más"}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 }
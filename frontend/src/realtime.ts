@@ -0,0 +1,34 @@
+// frontend/src/realtime.ts
+
+import type { Report, ReportEvent } from "./types";
+
+const EVENT_TYPES: ReportEvent["type"][] = ["report_created", "comment_added", "status_changed"];
+
+/**
+ * Se suscribe a los eventos de un reporte (SSE). Retorna la función que
+ * cierra la conexión; EventSource reconecta solo si se corta.
+ */
+export function subscribeToReport(
+  publicId: string,
+  onEvent: (event: ReportEvent) => void
+): () => void {
+  const source = new EventSource(`/api/reports/${publicId}/events`);
+  const listener = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+  EVENT_TYPES.forEach((type) => source.addEventListener(type, listener));
+  return () => source.close();
+}
+
+/**
+ * Aplica un evento al reporte en pantalla sin volver a pedirlo completo.
+ */
+export function applyReportEvent(report: Report, event: ReportEvent): Report {
+  if (event.public_id !== report.public_id || event.type === "report_created") {
+    return report;
+  }
+  const { comment, updated_at } = event.data;
+  // El comentario propio ya se agregó con la respuesta del POST
+  const comments = report.comments.some((c) => c.id === comment.id)
+    ? report.comments
+    : [...report.comments, comment];
+  return { ...report, status: event.status, comments, updated_at };
+}
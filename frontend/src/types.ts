@@ -1,10 +1,19 @@
 export type ReportStatus = "nuevo" | "en_progreso" | "reasignado" | "finalizado";
 
+export interface MediaVariant {
+  variant: string; // "thumb" | "medium" | "webp"
+  file_name: string;
+  url: string;
+  width: number;
+  height: number;
+}
+
 export interface ReportMedia {
   id: number;
   file_name: string;
   media_type: string; // "image" | "video"
   order: number;
+  variants: MediaVariant[];
 }
 
 export interface ReportCommentMedia {
@@ -12,6 +21,7 @@ export interface ReportCommentMedia {
   file_name: string;
   media_type: string;
   order: number;
+  variants: MediaVariant[];
 }
 
 export interface ReportComment {
@@ -36,11 +46,60 @@ export interface Report {
   comments: ReportComment[];
 }
 
+export type ReportSummary = Omit<Report, "comments" | "citizen_email">;
+
+// SSE /api/reports/{public_id}/events y /api/reports/events
+export type ReportEvent =
+  | {
+      type: "report_created";
+      public_id: string;
+      status: ReportStatus;
+      at: string;
+      data: { latitude: number; longitude: number; description: string; created_at: string };
+    }
+  | {
+      type: "comment_added";
+      public_id: string;
+      status: ReportStatus;
+      at: string;
+      data: { comment: ReportComment; updated_at: string };
+    }
+  | {
+      type: "status_changed";
+      public_id: string;
+      status: ReportStatus;
+      at: string;
+      data: { old_status: ReportStatus; comment: ReportComment; updated_at: string };
+    };
+
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// GET /api/reports/tiles/{z}/{x}/{y}
+export interface TileCluster {
+  latitude: number; // centroide
+  longitude: number;
+  count: number;
+  status_counts: Partial<Record<ReportStatus, number>>;
+  public_id: string | null; // solo si el cluster tiene un único reporte
+}
+
+export interface Tile {
+  z: number;
+  x: number;
+  y: number;
+  total: number;
+  clusters: TileCluster[];
+}
+
 export interface NewsMedia {
   id: number;
   file_name: string;
   media_type: string;
   order: number;
+  variants: MediaVariant[];
 }
 
 export interface News {